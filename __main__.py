@@ -25,4 +25,5 @@ from app import *
 
 # Application code
 if __name__ == '__main__':
-    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT).run()
+    Invaders(width=GAME_WIDTH,height=GAME_HEIGHT,
+             tick=GAME_TICK,maxticks=MAX_TICKS_PER_FRAME).run()
@@ -13,13 +13,18 @@ import cornell
 from consts import *
 from game2d import *
 from wave import *
+from session import *
+from replay import *
 from Fonts import *
+import metrics
+import tracer
+import random
 
 
 # PRIMARY RULE: Invaders can only access attributes in wave.py via getters/setters
 # Invaders is NOT allowed to access anything in models.py
 
-class Invaders(GameApp):
+class Invaders(Session, GameApp):
     """
     The primary controller class for the Alien Invaders application
     
@@ -43,34 +48,33 @@ class Invaders(GameApp):
     
     The primary purpose of this class is to manage the game state: which is when the 
     game started, paused, completed, etc. It keeps track of that in an attribute
-    called _state.
+    called _state.  The rules for the states (the method update and its helpers) are
+    in the mixin Session (see session.py), so that a recorded game can be replayed
+    without a window.  This class decides how the game is shown: its messages are
+    GLabels and its waves are drawn.
     
     INSTANCE ATTRIBUTES:
         view:   the game view, used in drawing (see examples from class)
                 [instance of GView; it is inherited from GameApp]
         input:  the user input, used to control the ship and change state
                 [instance of GInput; it is inherited from GameApp]
-        _state: the current state of the game represented as a value from consts.py
-                [one of STATE_INACTIVE, STATE_NEWWAVE, STATE_ACTIVE, STATE_PAUSED, STATE_CONTINUE, STATE_COMPLETE]
-        _wave:  the subcontroller for a single wave, which manages the ships and aliens
-                [Wave, or None if there is no wave currently active]
-        _text:  the currently active message
-                [GLabel, or None if there is no message to display]
     
-    STATE SPECIFIC INVARIANTS: 
-        Attribute _wave is only None if _state is STATE_INACTIVE.
-        Attribute _text is only None if _state is STATE_ACTIVE.
+    The attributes for the state of the game (_state, _wave, _text, _lastkeys and the
+    seed of the session) are inherited from Session, and are listed there.  _text is
+    a GLabel, or None if there is no message to display.
     
-    For a complete description of how the states work, see the specification for the
-    method update.
-    
-    You may have more attributes if you wish (you might want an attribute to store
-    any score across multiple waves). If you add new attributes, they need to be 
-    documented here.
+    If the game is started with --record FILE (see RECORD_FILE in consts.py), the keys
+    held down in every update are recorded to FILE, which replay.py can play back.
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-        _lastkeys:  sum of the number of keys pressed in the previous frames
-                    [int >= 0]
+        _profiler: the overlay of the time of each phase of a frame, shown when
+                   PROFILER_KEY is pressed [FrameProfiler, or None if hidden]
+        _profilekey: whether PROFILER_KEY was down in the last update [bool]
+        _metrics:  the counters of the hot paths, if the game was started with --metrics
+                   or --metrics-port [Metrics, or None if nothing is counted]
+        _exports:  where the counters are sent [list of MetricsWriter and MetricsServer]
+        _tracer:   the spans of the frames, if the game was started with --trace FILE
+                   [Tracer, or None if nothing is traced]
     """
     
     # DO NOT MAKE A NEW INITIALIZER!
@@ -88,79 +92,38 @@ class Invaders(GameApp):
         invariants. When done, it sets the _state to STATE_INACTIVE and create a message 
         (in attribute _text) saying that the user should press to play a game.
         """
-        self._text = GLabel(text="Press 'S' to Play\n\n'SPACEBAR' to fire")
-        self._text.font_size = 40
-        self._text.x = GAME_WIDTH / 2
-        self._text.y = GAME_HEIGHT / 2
-        self._text.halign = 'center'
-        self._text.valign = 'middle'
-        self._text.font_name = 'Arcade.ttf'
-        
-        self._state = STATE_INACTIVE
-        self._wave = None
-        self._lastkeys = 0
+        seed = random.getrandbits(63)
+        recorder = None
+        if not (RECORD_FILE is None):
+            recorder = Recorder(RECORD_FILE, seed, self.tick)
+        self._startSession(seed, recorder)
+        self._profiler = None
+        self._profilekey = False
+        self._startMetrics()
+        self._tracer = None
+        if not (TRACE_FILE is None):
+            self._tracer = tracer.Tracer(TRACE_FILE)
+            tracer.enable(self._tracer)
+            self.probe = self._tracer
     
     
     def update(self,dt):
         """
         Animates a single frame in the game.
         
-        It is the method that does most of the work. It is NOT in charge of playing the
-        game.  That is the purpose of the class Wave. The primary purpose of this
-        game is to determine the current state, and -- if the game is active -- pass
-        the input to the Wave object _wave to play the game.
-        
-        As part of the assignment, you are allowed to add your own states. However, at
-        a minimum you must support the following states: STATE_INACTIVE, STATE_NEWWAVE,
-        STATE_ACTIVE, STATE_PAUSED, STATE_CONTINUE, and STATE_COMPLETE.  Each one of these 
-        does its own thing and might even needs its own helper.  We describe these below.
-        
-        STATE_INACTIVE: This is the state when the application first opens.  It is a 
-        paused state, waiting for the player to start the game.  It displays a simple
-        message on the screen. The application remains in this state so long as the 
-        player never presses a key.  In addition, this is the state the application
-        returns to when the game is over (all lives are lost or all aliens are dead).
-        
-        STATE_NEWWAVE: This is the state creates a new wave and shows it on the screen. 
-        The application switches to this state if the state was STATE_INACTIVE in the 
-        previous frame, and the player pressed a key. This state only lasts one animation 
-        frame before switching to STATE_ACTIVE.
-        
-        STATE_ACTIVE: This is a session of normal gameplay.  The player can move the
-        ship and fire laser bolts.  All of this should be handled inside of class Wave
-        (NOT in this class).  Hence the Wave class should have an update() method, just
-        like the subcontroller example in lecture.
-        
-        STATE_PAUSED: Like STATE_INACTIVE, this is a paused state. However, the game is
-        still visible on the screen.
-        
-        STATE_CONTINUE: This state restores the ship after it was destroyed. The 
-        application switches to this state if the state was STATE_PAUSED in the 
-        previous frame, and the player pressed a key. This state only lasts one animation 
-        frame before switching to STATE_ACTIVE.
-        
-        STATE_COMPLETE: The wave is over, and is either won or lost.
-        
-        You are allowed to add more states if you wish. Should you do so, you should 
-        describe them here.
+        Pressing PROFILER_KEY shows or hides the frame profiler; everything else is done
+        by the rules of the session (see Session.update).  If tracing is on, the update
+        is recorded as the span 'Invaders.update'.
         
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        # determine current state
-        if self._state == STATE_INACTIVE:
-            self._inactive()
-        elif self._state == STATE_NEWWAVE:
-            self._newwave()
-        elif self._state == STATE_ACTIVE:
-            self._active(dt)
-        elif self._state == STATE_CONTINUE:
-            self._continue(dt)
-        elif self._state == STATE_PAUSED:
-            self._paused()
-        elif self._state == STATE_COMPLETE:
-            self._complete()
-
+        trace = tracer.TRACER
+        if trace: trace.begin('Invaders.update')
+        self._toggleProfiler()
+        Session.update(self, dt)
+        if trace: trace.end('Invaders.update')
+    
     
     def draw(self):
         """
@@ -173,133 +136,110 @@ class Invaders(GameApp):
         Wave. In order to draw them, you either need to add getters for these attributes 
         or you need to add a draw method to class Wave.  We suggest the latter.  See 
         the example subcontroller.py from class.
+        
+        The game is updated in fixed ticks (see GAME_TICK), and the wave is drawn as
+        it is after the last tick.  The frame profiler, if it is shown, is drawn over
+        everything else.
         """
         if not (self._text is None):
             self._text.draw(self.view)
             
         if self._text is None:
             self._wave.draw(self.view) #calls draw from Wave
+        
+        if not (self._profiler is None):
+            self._profiler.draw(self.view)
     
     
-    # HELPER METHODS FOR THE STATES GO HERE
-    def _inactive(self):
-        """
-        Detects key press to start game when state is inactive
+    def on_stop(self):
         """
-        self._determineKeyInput()
+        Finishes the recording, the counters and the trace, if there are any, when the
+        window closes.
         
-        
-    def _newwave(self):
-        """
-        Changes state from newwave to active, making newwave to last one frame
+        This is a Kivy method, called when the application stops.
         """
-        self._state = STATE_ACTIVE
-        
-        
-    def _active(self, dt):
-        """
-        Performs tasks needed to be done when state becomes active.
-        
-        This methods calls the update method from Wave when there are still
-        lives available and the player ship is not destroyed. It changes the
-        state to paused if there is still lives available but the ship is
-        destroyed.
-        
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is a number (int or float)
-        """
-        if self._wave.getLives() <= 0 or self._wave.getGameOver():
-            self._state = STATE_COMPLETE
-        elif self._wave.getLives() > 0 and not (self._wave.getShip() is None):
-            self._wave.update(self.input, dt)
-        elif self._wave.getShip() is None and self._wave.getLives() > 0:
-            self._state = STATE_PAUSED
-        
+        if not (self._recorder is None):
+            self._recorder.close()
+        for export in self._exports:
+            export.close()
+        self._exports = []
+        if not (self._tracer is None):
+            tracer.enable(None)
+            self.probe = self._profiler
+            self._tracer.close()
+            self._tracer = None
     
     
-    def _paused(self):
+    # HELPER METHODS FOR SESSION
+    def _makeMessage(self, text):
         """
-        Performs tasks needed to be done when state becomes paused.
+        Returns a GLabel showing text in the middle of the window
         
-        This method creates a text message and displays it when the game
-        state becomes paused. It also resets the lastkeys count and calls the
-        key input mthod to determine if player initiated a key press to continue
-        game.
+        Parameter text: the text of the message
+        Precondition: text is a str
         """
-        self._text = GLabel(text="You lost a live.\n\nPress 'S' to continue.")
-        self._text.font_size = 40
-        self._text.x = GAME_WIDTH / 2
-        self._text.y = GAME_HEIGHT / 2
-        self._text.halign = 'center'
-        self._text.valign = 'middle'
-        self._text.font_name = 'Arcade.ttf'
-        
-        self._lastkeys = 0
-        self._determineKeyInput()
+        label = GLabel(text=text)
+        label.font_size = 40
+        label.x = GAME_WIDTH / 2
+        label.y = GAME_HEIGHT / 2
+        label.halign = 'center'
+        label.valign = 'middle'
+        label.font_name = 'Arcade.ttf'
+        return label
     
     
-    def _continue(self, dt):
+    def _makeWave(self, seed):
         """
-        Performs tasks needed to be done when state becomes continue.
+        Returns a new wave, drawn in the window
         
-        This methods changes the state from paused to active, which will ensure
-        continue only lasts for one animation frame. It then calls the update
-        method from Wave to that will create a new Ship().
-        
-        Parameter dt: The time in seconds since last update
-        Precondition: dt is a number (int or float)
+        Parameter seed: the seed of the wave
+        Precondition: seed is an int >= 0
         """
-        self._state = STATE_ACTIVE
-        self._wave.update(self.input, dt)
+        wave = Wave(seed=seed)
+        wave.setProbe(self.probe)
+        return wave
     
     
-    def _complete(self):
+    # HELPER METHODS FOR THE COUNTERS AND THE FRAME PROFILER
+    def _startMetrics(self):
         """
-        Performs tasks needed to be done when state becomes complete.
+        Starts counting the hot paths, if the game was started with --metrics FILE or
+        --metrics-port PORT (see METRICS_FILE and METRICS_PORT in consts.py).
         
-        If the player won, a congratulatory message is displayed. If the player lost,
-        an admonishing message is displayed.
+        The same counters are used by the wave (through metrics.COUNTERS) and by the
+        drawing of game2d (through GameApp.COUNTERS).
         """
-        if self._wave.getWon() == True:
-            self._text = GLabel(text="Congratulations!\nYou have won!")
-            self._text.font_size = 40
-            self._text.x = GAME_WIDTH / 2
-            self._text.y = GAME_HEIGHT / 2
-            self._text.halign = 'center'
-            self._text.valign = 'middle'
-            self._text.font_name = 'Arcade.ttf'
-        else:
-            self._text = GLabel(text="Too bad!\n\nYou have failed to\nstop the invaders!")
-            self._text.font_size = 40
-            self._text.x = GAME_WIDTH / 2
-            self._text.y = GAME_HEIGHT / 2
-            self._text.halign = 'center'
-            self._text.valign = 'middle'
-            self._text.font_name = 'Arcade.ttf'
+        self._metrics = None
+        self._exports = []
+        if METRICS_FILE is None and METRICS_PORT is None:
+            return
+        
+        self._metrics = metrics.Metrics()
+        metrics.enable(self._metrics)
+        GameApp.COUNTERS = self._metrics
+        if not (METRICS_FILE is None):
+            self._exports.append(metrics.MetricsWriter(self._metrics, METRICS_FILE))
+        if not (METRICS_PORT is None):
+            self._exports.append(metrics.MetricsServer(self._metrics, METRICS_PORT))
     
     
-    def _determineKeyInput(self):
+    def _toggleProfiler(self):
         """
-        Determines if a key was pressed in this frame and changes state accordingly.
+        Shows or hides the frame profiler when PROFILER_KEY is pressed.
         
-        This method checks for a key press of 'S' and if there is one, changes the
-        game state accordingly. A key press is when a key is pressed for
-        the first time. The state does not continue to change as the key is held
-        down.
-        
-        This method is written using the guidance of state.py source code form class.
+        The profiler times the phases of every frame (as the probe of the game) and the
+        steps of every update of the wave (as the probe of the wave).  When it is
+        hidden, nothing is timed.  If the game is traced, the probe tells both the
+        tracer and the profiler.
         """
-        current_keys = self.input.key_count
-        change = current_keys > 0 and self._lastkeys == 0 and self.input.is_key_down('s')
-
-        if change and self._state == STATE_INACTIVE:
-            # there was a click, so change state to start new game
-            self._state = STATE_NEWWAVE
-            self._text = None
-            self._wave = Wave()
-        elif change and self._state == STATE_PAUSED:
-            self._state = STATE_CONTINUE
-            self._text = None
-        if self.input.is_key_down('s'):
-            self._lastkeys += current_keys #update last_keys
-            
\ No newline at end of file
+        down = self.input.is_key_down(PROFILER_KEY)
+        if down and not self._profilekey:
+            if self._profiler is None:
+                self._profiler = FrameProfiler(size=PROFILER_FRAMES, budget=GAME_TICK,
+                                               top=GAME_HEIGHT-10)
+            else:
+                self._profiler = None
+            self.probe = tracer.combine(self._tracer, self._profiler)
+            if not (self._wave is None):
+                self._wave.setProbe(self.probe)
+        self._profilekey = down
@@ -0,0 +1,523 @@
+"""
+Batch module for Alien Invaders
+
+This module contains the class WaveBatch, which plays many independent waves of Alien
+Invaders at once.  Instead of one Wave object per game, the state of every game is
+stacked into NumPy arrays (one row per game), and each update marches, fires, moves
+and collides every game with a fixed number of array operations.  The cost of an
+update hardly grows with the number of games, so a batch of a thousand games runs
+hundreds of thousands of game updates per second on one core.
+
+The games follow the rules of wave.py exactly, in the same order.  As in a headless
+Wave (and WaveEnv, see env.py), a destroyed ship comes back on the next update, with no
+pause.  Each game has a random generator of its own, seeded as a Wave would be, so game
+i of a batch made with seed S plays out exactly like a headless Wave made with seed S+i
+and given the same keys.  Only the classic difficulty is supported.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+from env import ACTION_LEFT, ACTION_RIGHT, ACTION_FIRE
+import numpy as np
+import random
+
+# PRIMARY RULE: WaveBatch is a model, so it is not allowed to access anything in any
+# module other than consts.py (and the action bits of env.py).  It has no sprites.
+
+
+class WaveBatch(object):
+    """
+    A class representing many independent waves, stored as arrays.
+
+    Game i of a batch is row i of every per-game array.  Its aliens are on the same
+    lattice as in Formation, so only the position of its alien at (0, 0) is stored.  A
+    game has at most one player bolt (the ship cannot fire while its bolt is on
+    screen), so the player bolts are per-game arrays.  The alien bolts of every game
+    are kept together in one table, packed at the front and tagged with their game.
+
+    A game is done when it is over (as for Wave.getGameOver) or has no lives left.
+    Done games are not updated any more.
+
+    INSTANCE ATTRIBUTES:
+        _count:     the number of games [int > 0]
+        _randoms:   the random generator of each game [list of count numpy Generators]
+        _alive:     whether each alien is alive [count x rows x cols bool array]
+        _ox:        the x coordinate of the alien at (0, 0) [float array of count]
+        _oy:        the y coordinate of the alien at (0, 0) [float array of count]
+        _right:     whether the aliens march to the right [bool array of count]
+        _time:      the time since the last alien step [float array of count]
+        _step:      the alien steps since the last alien bolt [int array of count]
+        _firespeed: the alien steps between alien bolts [int array of count, each
+                    1 <= _firespeed <= BOLT_RATE]
+        _shipx:     the x coordinate of the ship [float array of count]
+        _ship:      whether the ship is on screen [bool array of count]
+        _lives:     the number of lives left [int array of count]
+        _prevkeys:  the number of keys held down in the last update [int array of count]
+        _gameover:  whether the game is over [bool array of count]
+        _won:       whether the player won [bool array of count]
+        _shot:      whether the player bolt is on screen [bool array of count]
+        _shotx:     the x coordinate of the player bolt [float array of count]
+        _shoty:     the y coordinate of the player bolt [float array of count]
+        _shotprev:  the y coordinate of the player bolt before it last moved [float
+                    array of count]
+        _bolts:     the number of alien bolts [int >= 0]
+        _bx:        the x coordinate of each alien bolt [float array, only the first
+                    _bolts entries are bolts]
+        _by:        the y coordinate of each alien bolt [float array, same length as _bx]
+        _bprev:     the y coordinate of each alien bolt before it last moved [float
+                    array, same length as _bx]
+        _bgame:     the game of each alien bolt [int array, same length as _bx]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def __len__(self):
+        """
+        Returns the number of games in the batch
+        """
+        return self._count
+
+
+    def getLives(self):
+        """
+        Returns the number of lives left in each game, as an int array
+
+        The result is the array of the batch itself, so it must not be modified.
+        """
+        return self._lives
+
+
+    def getAliveCounts(self):
+        """
+        Returns the number of living aliens in each game, as a new int array
+        """
+        return self._alive.sum(axis=(1, 2))
+
+
+    def getAlive(self):
+        """
+        Returns whether each alien is alive, as a count x rows x cols bool array
+
+        The result is the array of the batch itself, so it must not be modified.
+        """
+        return self._alive
+
+
+    def getShipX(self):
+        """
+        Returns the x coordinate of the ship in each game, as a float array
+
+        The result is the array of the batch itself, so it must not be modified.
+        """
+        return self._shipx
+
+
+    def getGameOver(self):
+        """
+        Returns whether each game is over, as a bool array
+
+        The result is the array of the batch itself, so it must not be modified.
+        """
+        return self._gameover
+
+
+    def getWon(self):
+        """
+        Returns whether the player won each game, as a bool array
+
+        The result is the array of the batch itself, so it must not be modified.
+        """
+        return self._won
+
+
+    def getDone(self):
+        """
+        Returns whether each game is done (over, or with no lives left), as a new
+        bool array
+        """
+        return self._gameover | (self._lives <= 0)
+
+
+    def getBoltCount(self):
+        """
+        Returns the number of alien bolts on screen, in every game together
+        """
+        return self._bolts
+
+
+    # INITIALIZER TO CREATE THE GAMES
+    def __init__(self, count, seed=None):
+        """
+        Initializer: creates count new games, each as a new Wave would be
+
+        Game i is seeded with seed+i, like a Wave made with seed=seed+i.
+
+        Parameter count: the number of games
+        Precondition: count is an int > 0
+
+        Parameter seed: the seed of the first game, or None to pick one at random
+        Precondition: seed is None or an int, 0 <= seed and seed+count <= 2**64
+        """
+        if seed is None:
+            seed = random.getrandbits(63)
+        assert 0 <= seed and seed+count <= 2**64, \
+            '%s is not a seed for %d games in the range 0 to 2**64-1' % (repr(seed), count)
+        self._count = count
+        self._randoms = [np.random.Generator(np.random.PCG64(seed+game))
+                         for game in range(count)]
+
+        rows = ALIEN_ROWS
+        self._alive = np.ones((count, rows, ALIENS_IN_ROW), dtype=bool)
+        self._ox = np.full(count, float(ALIEN_H_SEP + (ALIEN_WIDTH//2)))
+        self._oy = np.full(count, float(GAME_HEIGHT - (ALIEN_CEILING + (rows*ALIEN_HEIGHT) +
+                                                       ((rows-1)*ALIEN_V_SEP))))
+        self._right = np.ones(count, dtype=bool)
+        self._time = np.zeros(count)
+        self._step = np.zeros(count, dtype=int)
+        self._firespeed = np.array([int(generator.integers(1, BOLT_RATE+1))
+                                    for generator in self._randoms])
+
+        self._shipx = np.full(count, GAME_WIDTH/2)
+        self._ship = np.ones(count, dtype=bool)
+        self._lives = np.full(count, SHIP_LIVES)
+        self._prevkeys = np.zeros(count, dtype=int)
+        self._gameover = np.zeros(count, dtype=bool)
+        self._won = np.zeros(count, dtype=bool)
+
+        self._shot = np.zeros(count, dtype=bool)
+        self._shotx = np.zeros(count)
+        self._shoty = np.zeros(count)
+        self._shotprev = np.zeros(count)
+
+        self._bolts = 0
+        self._bx = np.zeros(BOLT_CAPACITY)
+        self._by = np.zeros(BOLT_CAPACITY)
+        self._bprev = np.zeros(BOLT_CAPACITY)
+        self._bgame = np.zeros(BOLT_CAPACITY, dtype=int)
+
+
+    # UPDATE METHOD TO PLAY EVERY GAME
+    def update(self, actions, dt=GAME_TICK):
+        """
+        Plays one update of every game that is not done
+
+        Each game does what Wave.update does, in the same order: check whether the game
+        is over, march the aliens (firing a bolt every few steps), move the ship and
+        fire, bring back a destroyed ship, then move the bolts, collide them and remove
+        the bolts off screen.
+
+        Parameter actions: the keys held down in each game, as in WaveEnv
+        Precondition: actions is an int array of count actions (see env.py)
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        active = ~self._gameover & (self._lives > 0)
+        active &= ~self._checkGameOver(active)
+        if not active.any():
+            return
+
+        self._moveAliens(active, dt)
+        self._moveShips(active, actions)
+
+        respawn = active & ~self._ship
+        if respawn.any():
+            self._shipx[respawn] = GAME_WIDTH/2
+            self._ship[respawn] = True
+            self._shot[respawn] = False
+            self._removeBolts(respawn[self._bgame[:self._bolts]])
+
+        moving = active & ~respawn
+        self._moveBolts(moving)
+        self._collideShots(moving)
+        self._collideShips(moving)
+        self._removeOffscreenBolts()
+
+
+    # HELPER METHODS FOR THE UPDATE
+    def _checkGameOver(self, active):
+        """
+        Returns which active games just ended, marking them over (and won if empty)
+
+        Parameter active: which games are being updated
+        Precondition: active is a bool array of count
+        """
+        rowalive = self._alive.any(axis=2)
+        empty = ~rowalive.any(axis=1)
+        lowest = np.argmax(rowalive, axis=1)
+        dipped = ~empty & (self._oy+lowest*(ALIEN_HEIGHT+ALIEN_V_SEP) <= DEFENSE_LINE)
+
+        ended = active & (empty | dipped)
+        self._gameover |= ended
+        self._won |= active & empty
+        return ended
+
+
+    def _moveAliens(self, active, dt):
+        """
+        Adds dt to the alien timers, and steps the aliens of every game whose timer is up
+
+        Parameter active: which games are being updated
+        Precondition: active is a bool array of count, and no active game is over
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._time[active] += dt
+        games = np.flatnonzero(active & (self._time > ALIEN_SPEED))
+        if len(games) == 0:
+            return
+
+        pitch = ALIEN_WIDTH+ALIEN_H_SEP
+        colalive = self._alive[games].any(axis=1)
+        cols = colalive.shape[1]
+        leftx = self._ox[games]+np.argmax(colalive, axis=1)*pitch
+        rightx = self._ox[games]+(cols-1-np.argmax(colalive[:, ::-1], axis=1))*pitch
+
+        right = self._right[games]
+        down = np.where(right, GAME_WIDTH-rightx <= ALIEN_H_SEP+ALIEN_WIDTH/2,
+                        leftx <= ALIEN_H_WALK+ALIEN_WIDTH/2)
+        walk = np.where(right, ALIEN_H_WALK, -ALIEN_H_WALK)
+        self._ox[games] += np.where(down, 0, walk)
+        self._oy[games] -= np.where(down, ALIEN_V_WALK, 0)
+        self._right[games] = right ^ down
+        self._step[games] += 1
+
+        fire = self._step[games] == self._firespeed[games]
+        if fire.any():
+            self._fireAlienBolts(games[fire], colalive[fire])
+        self._time[games] = 0
+
+
+    def _fireAlienBolts(self, games, colalive):
+        """
+        Fires a bolt from the bottom alien of a random column of each game
+
+        As in Wave, every column can be picked, and a game whose column is empty does
+        not fire.  The random numbers are drawn one game at a time, from the generator
+        of the game, in the order Wave draws them; only a few games fire in an update.
+
+        Parameter games: the games that fire
+        Precondition: games is an int array of games, none of them empty
+
+        Parameter colalive: whether each column of each game has a living alien
+        Precondition: colalive is a bool array of len(games) x cols
+        """
+        cols = np.zeros(len(games), dtype=int)
+        speeds = np.zeros(len(games), dtype=int)
+        for pos in range(len(games)):
+            generator = self._randoms[games[pos]]
+            cols[pos] = generator.integers(0, colalive.shape[1])
+            speeds[pos] = generator.integers(1, BOLT_RATE+1)
+        fire = colalive[np.arange(len(games)), cols]
+        shooters = games[fire]
+        cols = cols[fire]
+        rows = np.argmax(self._alive[shooters, :, cols], axis=1)
+
+        xs = self._ox[shooters]+cols*(ALIEN_WIDTH+ALIEN_H_SEP)
+        ys = self._oy[shooters]+rows*(ALIEN_HEIGHT+ALIEN_V_SEP)-ALIEN_HEIGHT/2
+        self._addBolts(xs, ys, shooters)
+
+        self._step[games] = 0
+        self._firespeed[games] = speeds
+
+
+    def _moveShips(self, active, actions):
+        """
+        Moves the ship of every active game, and fires where the player can
+
+        Parameter active: which games are being updated
+        Precondition: active is a bool array of count
+
+        Parameter actions: the keys held down in each game, as in WaveEnv
+        Precondition: actions is an int array of count actions (see env.py)
+        """
+        games = active & self._ship
+        left = (actions & ACTION_LEFT) != 0
+        right = (actions & ACTION_RIGHT) != 0
+        fire = (actions & ACTION_FIRE) != 0
+
+        x = self._shipx-left*SHIP_MOVEMENT+right*SHIP_MOVEMENT
+        x = np.minimum(np.maximum(x, SHIP_WIDTH/2), GAME_WIDTH-(SHIP_WIDTH/2))
+        self._shipx = np.where(games, x, self._shipx)
+
+        shoot = games & fire & (self._prevkeys == 0) & ~self._shot
+        self._shot |= shoot
+        self._shotx = np.where(shoot, self._shipx, self._shotx)
+        self._shoty = np.where(shoot, SHIP_BOTTOM+SHIP_HEIGHT/2, self._shoty)
+        self._shotprev = np.where(shoot, self._shoty, self._shotprev)
+
+        keys = left.astype(int)+right+fire
+        self._prevkeys = np.where(games, keys, self._prevkeys)
+
+
+    def _moveBolts(self, moving):
+        """
+        Moves the bolts of every game that is moving its bolts
+
+        Parameter moving: which games move their bolts
+        Precondition: moving is a bool array of count
+        """
+        shots = moving & self._shot
+        self._shotprev = np.where(shots, self._shoty, self._shotprev)
+        self._shoty = np.where(shots, self._shoty+BOLT_SPEED, self._shoty)
+
+        n = self._bolts
+        if n:
+            move = moving[self._bgame[:n]]
+            self._bprev[:n] = np.where(move, self._by[:n], self._bprev[:n])
+            self._by[:n] -= move*BOLT_SPEED
+
+
+    def _collideShots(self, moving):
+        """
+        Destroys the first alien along the path of each player bolt that hit one
+
+        This is Formation.sweep for every player bolt at once: the cells under the
+        paths of the corners of a bolt are checked in order (rows from the bottom,
+        then columns from the left), and the first living alien hit is destroyed,
+        along with the bolt.
+
+        Parameter moving: which games move their bolts
+        Precondition: moving is a bool array of count
+        """
+        games = np.flatnonzero(moving & self._shot)
+        if len(games) == 0:
+            return
+
+        hpitch = ALIEN_WIDTH+ALIEN_H_SEP
+        vpitch = ALIEN_HEIGHT+ALIEN_V_SEP
+        hw = BOLT_WIDTH/2
+        hh = BOLT_HEIGHT/2
+        aw = ALIEN_WIDTH/2.0
+        ah = ALIEN_HEIGHT/2.0
+        rows = self._alive.shape[1]
+        cols = self._alive.shape[2]
+
+        x = self._shotx[games]
+        low = np.minimum(self._shotprev[games], self._shoty[games])
+        high = np.maximum(self._shotprev[games], self._shoty[games])
+        ox = self._ox[games]
+        oy = self._oy[games]
+        row0 = np.floor((low-hh-oy)/vpitch+0.5).astype(int)
+        row1 = np.floor((high+hh-oy)/vpitch+0.5).astype(int)
+        col0 = np.floor((x-hw-ox)/hpitch+0.5).astype(int)
+        col1 = np.floor((x+hw-ox)/hpitch+0.5).astype(int)
+
+        found = np.zeros(len(games), dtype=bool)
+        hitrow = np.zeros(len(games), dtype=int)
+        hitcol = np.zeros(len(games), dtype=int)
+        for dr in range(int((BOLT_SPEED+BOLT_HEIGHT)/vpitch)+2):
+            row = row0+dr
+            for dc in range(int(BOLT_WIDTH/hpitch)+2):
+                col = col0+dc
+                ok = ~found & (row <= row1) & (col <= col1)
+                ok &= (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+                if not ok.any():
+                    continue
+                r = np.clip(row, 0, rows-1)
+                c = np.clip(col, 0, cols-1)
+                ax = ox+c*hpitch
+                ay = oy+r*vpitch
+                inx = (np.abs(x-hw-ax) < aw) | (np.abs(x+hw-ax) < aw)
+                bottom = (low-hh < ay+ah) & (high-hh > ay-ah)
+                top = (low+hh < ay+ah) & (high+hh > ay-ah)
+                hit = ok & self._alive[games, r, c] & inx & (bottom | top)
+                hitrow = np.where(hit, r, hitrow)
+                hitcol = np.where(hit, c, hitcol)
+                found |= hit
+
+        if found.any():
+            self._alive[games[found], hitrow[found], hitcol[found]] = False
+            self._shot[games[found]] = False
+
+
+    def _collideShips(self, moving):
+        """
+        Destroys the ship of every game hit by one of its alien bolts
+
+        This is ProjectileSystem.collideBox for every game at once: a bolt hits the
+        ship if it overlaps the ship anywhere along the way it moved.  The bolts are
+        not removed (the game clears them when the ship comes back).
+
+        Parameter moving: which games move their bolts
+        Precondition: moving is a bool array of count
+        """
+        n = self._bolts
+        if n == 0:
+            return
+
+        game = self._bgame[:n]
+        low = np.minimum(self._bprev[:n], self._by[:n])
+        high = np.maximum(self._bprev[:n], self._by[:n])
+        inx = np.abs(self._bx[:n]-self._shipx[game]) < SHIP_WIDTH/2.0+BOLT_WIDTH/2
+        iny = ((low-BOLT_HEIGHT/2 < SHIP_BOTTOM+SHIP_HEIGHT/2.0) &
+               (high+BOLT_HEIGHT/2 > SHIP_BOTTOM-SHIP_HEIGHT/2.0))
+        hits = inx & iny & (moving & self._ship)[game]
+        if hits.any():
+            dead = np.zeros(self._count, dtype=bool)
+            dead[game[hits]] = True
+            self._ship &= ~dead
+            self._lives -= dead
+
+
+    def _removeOffscreenBolts(self):
+        """
+        Removes every bolt that is above or below the screen
+        """
+        self._shot &= (self._shoty <= GAME_HEIGHT) & (self._shoty > 0)
+
+        n = self._bolts
+        if n:
+            y = self._by[:n]
+            out = (y > GAME_HEIGHT) | (y <= 0)
+            if out.any():
+                self._removeBolts(out)
+
+
+    def _addBolts(self, xs, ys, games):
+        """
+        Adds an alien bolt at each (xs[i], ys[i]) in game games[i]
+
+        Parameter xs: the x coordinates of the bolts
+        Precondition: xs is a float array
+
+        Parameter ys: the y coordinates of the bolts
+        Precondition: ys is a float array, the same length as xs
+
+        Parameter games: the game of each bolt
+        Precondition: games is an int array, the same length as xs
+        """
+        n = self._bolts
+        k = len(xs)
+        if n+k > len(self._bx):
+            capacity = len(self._bx)
+            while capacity < n+k:
+                capacity *= 2
+            for name in ('_bx', '_by', '_bprev', '_bgame'):
+                old = getattr(self, name)
+                new = np.zeros(capacity, dtype=old.dtype)
+                new[:n] = old[:n]
+                setattr(self, name, new)
+
+        self._bx[n:n+k] = xs
+        self._by[n:n+k] = ys
+        self._bprev[n:n+k] = ys
+        self._bgame[n:n+k] = games
+        self._bolts = n+k
+
+
+    def _removeBolts(self, mask):
+        """
+        Removes every alien bolt whose entry in mask is True
+
+        Parameter mask: which bolts to remove
+        Precondition: mask is a bool array with one entry per alien bolt
+        """
+        keep = np.flatnonzero(~mask)
+        k = len(keep)
+        self._bx[:k] = self._bx[keep]
+        self._by[:k] = self._by[keep]
+        self._bprev[:k] = self._bprev[keep]
+        self._bgame[:k] = self._bgame[keep]
+        self._bolts = k
@@ -0,0 +1,348 @@
+"""
+Benchmark script for Alien Invaders
+
+This script times the update and the drawing of a wave of Alien Invaders for formations
+of many sizes (from the classic 5 x 12 aliens up to 50 x 100) and many numbers of alien
+bolts on screen.  For each case it reports the updates per second and the percentiles of
+the time of an update, of each step of an update (the alien march, the move of the bolts,
+the collisions and the game over check) and of drawing.  It marks which cases can still
+hold 60 frames per second, writes the results to JSON, and compares them with the
+results of an earlier run to catch regressions.
+
+Run it next to __main__.py, as
+
+    python bench.py [options]
+
+As consts.py reads the first three arguments as numbers (see simulate.py), an option with
+a number among the first three arguments must be in the form --name=value.  The options
+are:
+
+    --sizes=R1xC1,R2xC2,...  the formations to time (default 5x12,10x25,20x50,35x75,50x100)
+    --bolts=N1,N2,...        the numbers of alien bolts to keep on screen (default
+                             0,100,1000,5000)
+    --ticks=T                the number of updates timed in each case (default 300)
+    --seed=S                 the seed of every wave (default 0)
+    --draw                   also time drawing (needs Kivy)
+    --out=FILE               write the results to FILE as JSON
+    --baseline=FILE          compare with the results in FILE, written by --out
+    --tolerance=X            the slowdown that counts as a regression (default 0.25)
+    --profile=NAME           time a profile of invaders.ini (see consts.py), such as
+                             --profile=stress --sizes=40x64
+    --config=FILE            read the profiles from FILE instead of invaders.ini
+
+The script exits with status 1 if any case is slower than in the baseline by more than
+the tolerance.
+
+Each formation is timed in a new process, which changes the constants in consts.py
+(the size of the formation, and of the game to fit it) before anything imports them.
+So the game is exactly as it would be with those constants, with no other change.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+import consts
+import numpy as np
+import multiprocessing
+import argparse
+import platform
+import json
+import time
+import sys
+
+# PRIMARY RULE: the benchmark must not import wave.py (or any module that imports
+# consts.py) at the top, or the constants of a case could not be changed before it.
+
+# the formations timed by default, as (rows, aliens per row)
+BENCH_SIZES = ((5, 12), (10, 25), (20, 50), (35, 75), (50, 100))
+# the numbers of alien bolts kept on screen by default
+BENCH_BOLTS = (0, 100, 1000, 5000)
+# the number of updates run before the timing starts in each case
+BENCH_WARMUP = 30
+# the percentiles reported for each timing
+BENCH_PERCENTILES = (50, 90, 99)
+# the room left above the defense line for the formation to march down in, in pixels
+BENCH_MARGIN = 300
+
+
+# HELPER FUNCTIONS FOR A CASE (RUN IN A NEW PROCESS)
+def _runSize(rows, cols, bolts, ticks, seed, draw):
+    """
+    Returns the list of the results of a formation for each number of bolts
+
+    This changes the constants of consts.py for the formation, so it must run in a new
+    process, before anything else imports consts.py.  The game is made wide and tall
+    enough for the formation to march for the whole benchmark above the defense line.
+
+    Parameter rows: the number of rows of aliens
+    Precondition: rows is an int > 0
+
+    Parameter cols: the number of aliens in each row
+    Precondition: cols is an int > 0
+
+    Parameter bolts: the numbers of alien bolts to keep on screen
+    Precondition: bolts is a list of ints >= 0
+
+    Parameter ticks: the number of updates to time
+    Precondition: ticks is an int > 0
+
+    Parameter seed: the seed of every wave
+    Precondition: seed is an int >= 0
+
+    Parameter draw: whether to time drawing as well
+    Precondition: draw is a bool
+    """
+    width = max(GAME_WIDTH, 2*ALIEN_H_SEP + cols*(ALIEN_WIDTH+ALIEN_H_SEP))
+    height = max(GAME_HEIGHT, ALIEN_CEILING + rows*(ALIEN_HEIGHT+ALIEN_V_SEP) +
+                 DEFENSE_LINE + BENCH_MARGIN)
+    consts.ALIEN_ROWS = rows
+    consts.ALIENS_IN_ROW = cols
+    consts.GAME_WIDTH = width
+    consts.GAME_HEIGHT = height
+
+    # Only now can the game be imported, with the constants above
+    import wave
+    import env
+
+    view = None
+    if draw:
+        try:
+            from game2d import GView
+            view = GView()
+        except ImportError:
+            view = None
+
+    results = []
+    for count in bolts:
+        result = {'rows': rows, 'cols': cols, 'bolts': count, 'width': width,
+                  'height': height}
+        result.update(_timeWave(wave, env, count, ticks, seed, view))
+        results.append(result)
+    return results
+
+
+def _timeWave(wave, env, bolts, ticks, seed, view):
+    """
+    Returns a dict of the timings of a wave, keeping bolts alien bolts on screen
+
+    The dict has the living 'aliens' and whether the wave 'ended' after the last
+    update, the statistics (see _summary) of the 'update', of each step of it ('march',
+    'move', 'collide', 'gameover') and of 'draw' (None for a step that never ran), and
+    'fps60', whether 99% of the updates (and draws) took less than a 60th of a second.
+
+    The steps of the update are timed by wrapping the methods of the wave.  Before each
+    update, new alien bolts are added (outside of the timing) to keep bolts on screen,
+    away from the ship so that it is not destroyed.  The player fires whenever it can.
+
+    Parameter wave: the module wave
+    Precondition: wave is the module wave.py
+
+    Parameter env: the module env
+    Precondition: env is the module env.py
+
+    Parameter bolts: the number of alien bolts to keep on screen
+    Precondition: bolts is an int >= 0
+
+    Parameter ticks: the number of updates to time
+    Precondition: ticks is an int > 0
+
+    Parameter seed: the seed of the wave
+    Precondition: seed is an int >= 0
+
+    Parameter view: the view to draw to, or None to not time drawing
+    Precondition: view is None or a GView
+    """
+    game = wave.Wave(headless=view is None, seed=seed)
+    rng = np.random.default_rng(seed)
+    input = env.ActionInput()
+    times = {}
+    for name, method in (('march', '_moveAliens'), ('move', '_moveBolts'),
+                         ('collide', '_detectCollision'), ('gameover', '_isGameOver')):
+        times[name] = []
+        setattr(game, method, _timed(getattr(game, method), times[name]))
+    times['update'] = []
+    times['draw'] = []
+
+    width = consts.GAME_WIDTH
+    height = consts.GAME_HEIGHT
+    for tick in range(BENCH_WARMUP+ticks):
+        if tick == BENCH_WARMUP:
+            for values in times.values():
+                del values[:]
+
+        missing = bolts-len(game.getBolts())+(1 if game.getBolts().hasPlayerBolt() else 0)
+        if missing > 0:
+            xs = rng.uniform(0, width/2-SHIP_WIDTH, missing)
+            xs += (rng.random(missing) < 0.5)*(width/2+SHIP_WIDTH)
+            ys = rng.uniform(DEFENSE_LINE, height, missing)
+            game.getBolts().spawnMany(xs, ys, -BOLT_SPEED)
+
+        input.setAction(env.ACTION_FIRE if tick % 2 else 0)
+        start = time.perf_counter()
+        game.update(input, GAME_TICK)
+        times['update'].append(time.perf_counter()-start)
+
+        if not (view is None):
+            start = time.perf_counter()
+            view.clear()
+            game.draw(view)
+            times['draw'].append(time.perf_counter()-start)
+
+    result = {'aliens': game.getAliens().getAliveCount(), 'ended': game.getGameOver()}
+    for name, values in times.items():
+        result[name] = _summary(values) if values else None
+    frame = np.array(times['update'])
+    if times['draw']:
+        frame += np.array(times['draw'])
+    result['fps60'] = bool(np.percentile(frame, 99) < 1.0/60)
+    return result
+
+
+def _timed(method, times):
+    """
+    Returns a function that calls method, adding how long it took to times
+
+    Parameter method: the method to time
+    Precondition: method is a bound method
+
+    Parameter times: the list to add the times to
+    Precondition: times is a list
+    """
+    def call(*args):
+        start = time.perf_counter()
+        result = method(*args)
+        times.append(time.perf_counter()-start)
+        return result
+    return call
+
+
+def _summary(values):
+    """
+    Returns a dict of the statistics of a list of times (in microseconds, and per second)
+
+    Parameter values: the times, in seconds
+    Precondition: values is a nonempty list of floats
+    """
+    values = np.array(values)*1e6
+    summary = {'mean_us': float(values.mean()), 'max_us': float(values.max()),
+               'per_second': float(1e6/values.mean())}
+    for percentile in BENCH_PERCENTILES:
+        summary['p%d_us' % percentile] = float(np.percentile(values, percentile))
+    return summary
+
+
+# HELPER FUNCTIONS FOR THE REPORT
+def _compare(results, baseline, tolerance):
+    """
+    Returns the list of the cases slower than in the baseline, as strings
+
+    The cases are compared by the median time of an update.
+
+    Parameter results: the results of this run
+    Precondition: results is a list of dicts returned by _runSize
+
+    Parameter baseline: the results of an earlier run
+    Precondition: baseline is a list of dicts returned by _runSize
+
+    Parameter tolerance: the slowdown that counts as a regression
+    Precondition: tolerance is a float >= 0
+    """
+    earlier = {}
+    for result in baseline:
+        earlier[(result['rows'], result['cols'], result['bolts'])] = result
+
+    slower = []
+    for result in results:
+        old = earlier.get((result['rows'], result['cols'], result['bolts']))
+        if old is None:
+            continue
+        ratio = result['update']['p50_us']/old['update']['p50_us']
+        result['baseline_ratio'] = ratio
+        if ratio > 1+tolerance:
+            slower.append('%dx%d with %d bolts: %.1f us, was %.1f us (%.2fx)' %
+                          (result['rows'], result['cols'], result['bolts'],
+                           result['update']['p50_us'], old['update']['p50_us'], ratio))
+    return slower
+
+
+def _printResults(results):
+    """
+    Prints a table of the results, one case per line
+
+    Parameter results: the results of this run
+    Precondition: results is a list of dicts returned by _runSize
+    """
+    print('%-8s %6s %9s %9s %9s %9s %9s %9s %9s %6s %6s' %
+          ('aliens', 'bolts', 'upd/s', 'p50 us', 'p99 us', 'march', 'move', 'collide',
+           'draw', '60fps', 'base'))
+    for result in results:
+        update = result['update']
+        draw = '-' if result['draw'] is None else '%.1f' % result['draw']['p50_us']
+        base = '-' if not ('baseline_ratio' in result) else '%.2fx' % result['baseline_ratio']
+        print('%-8s %6d %9.0f %9.1f %9.1f %9.1f %9.1f %9.1f %9s %6s %6s' %
+              ('%dx%d' % (result['rows'], result['cols']), result['bolts'],
+               update['per_second'], update['p50_us'], update['p99_us'],
+               result['march']['p50_us'], result['move']['p50_us'] if result['move'] else 0,
+               result['collide']['p50_us'] if result['collide'] else 0, draw,
+               'yes' if result['fps60'] else 'NO', base))
+
+
+def _parseArguments():
+    """
+    Returns the options of the benchmark, parsed from sys.argv
+    """
+    parser = argparse.ArgumentParser(description='Time the waves of Alien Invaders.')
+    parser.add_argument('--sizes', default=','.join('%dx%d' % size for size in BENCH_SIZES))
+    parser.add_argument('--bolts', default=','.join(str(count) for count in BENCH_BOLTS))
+    parser.add_argument('--ticks', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--draw', action='store_true')
+    parser.add_argument('--out', default=None)
+    parser.add_argument('--baseline', default=None)
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--profile', default=None)
+    parser.add_argument('--config', default=None)
+
+    # consts.py has already read the first three arguments as numbers
+    for pos in range(2, min(len(sys.argv), 4)):
+        flag = sys.argv[pos-1]
+        if (flag.startswith('--') and not ('=' in flag) and flag != '--draw' and
+            sys.argv[pos].replace('.', '', 1).isdigit()):
+            parser.error('write %s=VALUE among the first three arguments' % flag)
+    return parser.parse_args()
+
+
+# Application code
+if __name__ == '__main__':
+    args = _parseArguments()
+    sizes = [tuple(int(part) for part in size.split('x')) for size in args.sizes.split(',')]
+    bolts = [int(count) for count in args.bolts.split(',')]
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for rows, cols in sizes:
+        with context.Pool(1) as pool:
+            results.extend(pool.apply(_runSize, (rows, cols, bolts, args.ticks, args.seed,
+                                                 args.draw)))
+
+    slower = []
+    if not (args.baseline is None):
+        with open(args.baseline) as file:
+            slower = _compare(results, json.load(file)['results'], args.tolerance)
+    _printResults(results)
+
+    held = [result for result in results if result['fps60']]
+    if held:
+        largest = max(held, key=lambda result: (result['rows']*result['cols'], result['bolts']))
+        print('largest case holding 60 fps: %dx%d aliens with %d bolts' %
+              (largest['rows'], largest['cols'], largest['bolts']))
+    for line in slower:
+        print('REGRESSION ' + line)
+
+    if not (args.out is None):
+        report = {'python': platform.python_version(), 'numpy': np.__version__,
+                  'machine': platform.machine(), 'ticks': args.ticks, 'seed': args.seed,
+                  'results': results}
+        with open(args.out, 'w') as file:
+            json.dump(report, file, indent=1)
+    sys.exit(1 if slower else 0)
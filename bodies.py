@@ -0,0 +1,227 @@
+"""
+Headless models module for Alien Invaders
+
+This module contains the game rules for the ship, the aliens and the laser bolts, split
+away from how they are drawn.  The rule classes (ShipModel, AlienModel, BoltModel) are
+mixins: models.py combines them with GImage and GRectangle to make the sprites drawn in
+the game window, while this module combines ShipModel with Body, a plain rectangle that
+never creates Kivy objects or loads textures.
+
+A Wave made with headless=True uses ShipBody for its ship, so the game rules in wave.py
+can run without a window (and without Kivy installed), which is what the simulation,
+replay and training tools need.  The aliens and the bolts of every wave, drawn or not,
+are kept as arrays (see formation.py and projectiles.py), so they need no Body.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+
+# PRIMARY RULE: This module, like models.py, is not allowed to access anything in any
+# module other than consts.py.  In particular, it must never import game2d or Kivy.
+
+
+class ShipModel(object):
+    """
+    A mixin with the rules for the player ship.
+
+    The class using this mixin must provide the attributes x and y, as both GImage and
+    Body do.  The collisions of the ship are tested in ProjectileSystem.collideBox.
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getShipX(self):
+        """
+        Returns the x coordinate of Ship object
+        """
+        return self.x
+
+
+    def setShipX(self, val):
+        """
+        Sets the x coordinate of Ship object
+
+        Parameter val: value to be set as x coordinate
+        Precondition: val is a number, int or float, SHIP_WIDTH/2 <= val <= GAME_WIDTH-SHIP_WIDTH/2
+        """
+        self.x = val
+
+
+    def getShipY(self):
+        """
+        Returns the y coordinate of Ship object
+        """
+        return self.y
+
+
+    # METHOD TO MOVE THE SHIP
+    def moveShip(self, input):
+        """
+        Moves ship to left or right based on keystroke detected.
+
+        This method reads the player's key presses.The ship moves only when the
+        player presses a left or right arrow keys.
+
+        This method is written with guidance from codes in arrows.py update()
+        method from class
+
+        Parameter input: the user input, used to control the game
+        Precondition: input has a method is_key_down, like GInput
+        """
+        da = 0
+        if input.is_key_down('left'):
+            da += SHIP_MOVEMENT
+        if input.is_key_down('right'):
+            da -= SHIP_MOVEMENT
+
+        #change position
+        x = self.x - da
+        x = max(SHIP_WIDTH/2, x)
+        x = min(x, GAME_WIDTH-(SHIP_WIDTH/2))
+        self.x = x
+
+
+class AlienModel(object):
+    """
+    A mixin with the setters Formation uses to place the sprite of a single alien.
+
+    The class using this mixin must provide the attributes x and y, as GImage does.  The
+    collisions of the aliens are tested in Formation.
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def setAlienX(self, val):
+        """
+        Sets x coordinate of Alien object
+
+        Parameter val: value to be set as x coordinate
+        Precondition: val is a number, int or float, x>0 and x<GAME_WIDTH
+        """
+        self.x = val
+
+
+    def setAlienY(self, val):
+        """
+        Sets y coordinate of Alien object
+
+        Parameter val: value to be set as y coordinate
+        Precondition: val is a number, int or float, y>0 and y<GAME_HEIGHT
+        """
+        self.y = val
+
+
+class BoltModel(object):
+    """
+    A mixin with the rules for a laser bolt.
+
+    The class using this mixin must provide the attributes x and y, and must set the
+    attribute _velocity in its initializer.
+
+    INSTANCE ATTRIBUTES:
+        _velocity: The velocity in y direction [int or float]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def isPlayerBolt(self):
+        """
+        Returns True if Bolt object is fired by Player, False otherwise
+        """
+        return (self._velocity >= 0)
+
+
+    # METHODS TO REUSE THE BOLT
+    def fire(self, x, y, direction):
+        """
+        Moves this bolt to (x, y) and sets it travelling in the given direction
+
+        This lets a spent bolt be fired again instead of making a new one.  It does
+        not change the color of the bolt.
+
+        Parameter x: x coordinate of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: y coordinate of the bolt
+        Precondition: y is an int or float
+
+        Parameter direction: direction travelled by the bolt
+        Precondition direction is a str, either 'up' or 'down'
+        """
+        self.x = x
+        self.y = y
+        self._setDirection(direction)
+
+
+    # HELPER METHODS
+    def _setDirection(self, direction):
+        """
+        Sets the velocity of the bolt according to the direction it travels.
+
+        Parameter direction: direction travelled by Bolt object
+        Precondition direction is a str, either 'up' or 'down'
+        """
+        if direction == 'up':
+            self._velocity = BOLT_SPEED
+        elif direction == 'down':
+            self._velocity = -1*BOLT_SPEED
+
+
+class Body(object):
+    """
+    A class representing a plain, axis-aligned rectangle.
+
+    This is the headless stand-in for GObject.  It stores the same geometry (the center
+    and the size), but it has no drawing cache.  Drawing a Body does nothing.
+
+    INSTANCE ATTRIBUTES:
+        x:      the horizontal coordinate of the center [int or float]
+        y:      the vertical coordinate of the center [int or float]
+        width:  the horizontal width of the rectangle [int or float > 0]
+        height: the vertical height of the rectangle [int or float > 0]
+    """
+
+    # INITIALIZER
+    def __init__(self, x=0, y=0, width=1, height=1):
+        """
+        Initializer: creates a rectangle centered at (x,y)
+
+        Parameter x: The x position of the center
+        Precondition: x is an int or float
+
+        Parameter y: The y position of the center
+        Precondition: y is an int or float
+
+        Parameter width: The width of the rectangle
+        Precondition: width is an int or float > 0
+
+        Parameter height: The height of the rectangle
+        Precondition: height is an int or float > 0
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+
+    # PUBLIC METHODS
+    def draw(self, view):
+        """
+        Does nothing, as a Body is never drawn
+
+        Parameter view: the game view (unused)
+        Precondition: None
+        """
+        pass
+
+
+class ShipBody(ShipModel, Body):
+    """
+    A class to represent the game ship in a headless wave.
+    """
+
+    # INITIALIZER TO CREATE A NEW SHIP
+    def __init__(self):
+        """
+        Initializer: creates a ship using default measurements
+        """
+        super().__init__(x=GAME_WIDTH/2, y=SHIP_BOTTOM, width=SHIP_WIDTH, height=SHIP_HEIGHT)
+
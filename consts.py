@@ -10,6 +10,9 @@ we separate the constants into their own module. This allows all modules to acce
 """
 import cornell
 import sys
+import os
+import configparser
+import ast
 
 ### WINDOW CONSTANTS (all coordinates are in pixels) ###
 
@@ -72,6 +75,10 @@ BOLT_HEIGHT = 16
 BOLT_SPEED  = 10
 # the number of ALIEN STEPS (not frames) between bolts
 BOLT_RATE   = 5
+# the number of Bolt sprites made ahead for each direction when a wave starts
+BOLT_POOL_SIZE = 8
+# the number of bolts to make room for when a wave starts (more are added as needed)
+BOLT_CAPACITY  = 64
 
 
 ### GAME CONSTANTS ###
@@ -100,10 +107,14 @@ everything after the word python. So if you start the game typing
 Python puts ['breakout.py', '3', '4', '0.5'] into sys.argv. Below, we take advantage of 
 this fact to change the constants ALIEN_ROWS, ALIENS_IN_ROW, and ALIEN_SPEED.
 """
+# the names of the constants given on the command line, which win over invaders.ini below
+_GIVEN = set()
+
 try:
     rows = int(sys.argv[1])
     if rows >= 1 and rows <= 10:
         ALIEN_ROWS = rows
+        _GIVEN.add('ALIEN_ROWS')
 except:
     pass # Use original value
 
@@ -111,6 +122,7 @@ try:
     perrow = int(sys.argv[2])
     if perrow >= 1 and perrow <= 15:
         ALIENS_IN_ROW = perrow
+        _GIVEN.add('ALIENS_IN_ROW')
 except:
     pass # Use original value
 
@@ -118,7 +130,175 @@ try:
     speed = float(sys.argv[3])
     if speed > 0 and speed <= 3:
         ALIEN_SPEED = speed
+        _GIVEN.add('ALIEN_SPEED')
 except:
     pass # Use original value
 
+"""
+The option --record FILE (after any of the numbers above) records the keys pressed in
+every update of the game to FILE, to be played back with replay.py.
+"""
+try:
+    RECORD_FILE = sys.argv[sys.argv.index('--record')+1]
+except:
+    RECORD_FILE = None # Do not record
+
+"""
+The option --metrics FILE appends the counters of the hot paths (see metrics.py) to FILE
+as a line of JSON every METRICS_INTERVAL seconds, and the option --metrics-port PORT
+serves them at http://127.0.0.1:PORT/metrics.  Without either option nothing is counted.
+"""
+try:
+    METRICS_FILE = sys.argv[sys.argv.index('--metrics')+1]
+except:
+    METRICS_FILE = None # Do not write the counters
+try:
+    METRICS_PORT = int(sys.argv[sys.argv.index('--metrics-port')+1])
+except:
+    METRICS_PORT = None # Do not serve the counters
+
+"""
+The option --trace FILE writes when each phase of each frame begins and ends (see
+tracer.py) to FILE, as trace events that a trace viewer such as chrome://tracing opens.
+"""
+try:
+    TRACE_FILE = sys.argv[sys.argv.index('--trace')+1]
+except:
+    TRACE_FILE = None # Do not trace
+
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
+
+# the classic difficulty, where the aliens fire one bolt every few steps
+DIFFICULTY_CLASSIC     = 0
+# the bullet-hell difficulty, where the aliens also fire a volley every frame
+DIFFICULTY_BULLET_HELL = 1
+# the difficulty of a new wave
+DIFFICULTY = DIFFICULTY_CLASSIC
+# the number of bolts the aliens fire every frame in the bullet-hell difficulty
+HELL_BOLTS_PER_FRAME = 20
+# the number of seconds of game time in one update of the game (the ship, the aliens
+# and the bolts are updated in steps of this size, however fast the game is drawn)
+GAME_TICK = 1.0/60
+# the most updates to run for one drawn frame, before dropping time to catch up
+MAX_TICKS_PER_FRAME = 5
+# the key that shows or hides the frame profiler (the time of each phase of a frame)
+PROFILER_KEY = 'f3'
+# the number of frames the frame profiler averages over
+PROFILER_FRAMES = 120
+# the number of seconds between two lines of the counters written by --metrics
+METRICS_INTERVAL = 10.0
+# the number of frames whose times are kept for the percentiles of the counters
+METRICS_FRAMES = 1024
+# the number of seconds between two writes of the spans recorded by --trace
+TRACE_INTERVAL = 1.0
+
+
+### PROFILES FROM INVADERS.INI ###
+"""
+The file invaders.ini (next to this module) changes the constants above without any edit
+to this module.  The option profile of its section [invaders] names the profile to play
+with, and the section of each profile sets constants by name, as in
+
+    [invaders]
+    profile = big
+
+    [big]
+    ALIEN_ROWS = 20
+    ALIENS_IN_ROW = 40
+    BOLT_RATE = 2
+
+Only the constants in CONFIG_KEYS can be set.  The built-in profiles in CONFIG_PROFILES
+can be played with no section at all; a section with the same name changes them.  The
+option --profile NAME (or --profile=NAME) picks the profile instead of invaders.ini, and
+the option --config FILE (or --config=FILE) reads FILE instead of invaders.ini.  The
+numbers on the command line (see above) win over the profile.  A value must be a number
+of the same type as the constant (an int can also set a float), or the game stops with
+the name of the profile and the constant.  If a profile changes the size of an alien but
+not how far it walks, ALIEN_H_WALK and ALIEN_V_WALK are worked out again from the new
+size.
+"""
+# the constants that a profile can set
+CONFIG_KEYS = ('GAME_WIDTH', 'GAME_HEIGHT', 'SHIP_MOVEMENT', 'SHIP_LIVES', 'DEFENSE_LINE',
+               'ALIEN_WIDTH', 'ALIEN_HEIGHT', 'ALIEN_H_SEP', 'ALIEN_V_SEP', 'ALIEN_H_WALK',
+               'ALIEN_V_WALK', 'ALIEN_CEILING', 'ALIEN_ROWS', 'ALIENS_IN_ROW', 'ALIEN_SPEED',
+               'BOLT_SPEED', 'BOLT_RATE', 'BOLT_CAPACITY', 'DIFFICULTY', 'HELL_BOLTS_PER_FRAME')
+# the built-in profiles: 'classic' is the game as above, and 'stress' is a load test of
+# 2560 small aliens that march and fire quickly, which the game must keep at frame rate
+CONFIG_PROFILES = {'classic': {},
+                   'stress':  {'ALIEN_WIDTH': 8, 'ALIEN_HEIGHT': 8, 'ALIEN_H_SEP': 4,
+                               'ALIEN_V_SEP': 4, 'ALIEN_CEILING': 40, 'ALIEN_ROWS': 40,
+                               'ALIENS_IN_ROW': 64, 'ALIEN_SPEED': 0.25, 'BOLT_RATE': 1,
+                               'BOLT_CAPACITY': 1024}}
+
+def _option(name, default):
+    """
+    Returns the value of the option --name VALUE (or --name=VALUE) on the command line
+
+    Parameter name: the name of the option, without the dashes
+    Precondition: name is a str
+
+    Parameter default: the value if the option is not on the command line
+    Precondition: none
+    """
+    for pos in range(1, len(sys.argv)):
+        if sys.argv[pos] == '--'+name and pos+1 < len(sys.argv):
+            return sys.argv[pos+1]
+        elif sys.argv[pos].startswith('--'+name+'='):
+            return sys.argv[pos][len(name)+3:]
+    return default
+
+
+def _parse(name, value):
+    """
+    Returns the value a profile gives a constant, of the same type as the constant
+
+    The value is read as a Python literal, so '2.0' is the float 2.0 and not an int.
+
+    Parameter name: the name of the constant
+    Precondition: name is a str in CONFIG_KEYS
+
+    Parameter value: the value in the profile
+    Precondition: value is a str (from invaders.ini), int or float
+    """
+    kind = type(globals()[name])
+    result = value
+    if isinstance(value, str):
+        try:
+            result = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            pass
+    if kind == float and type(result) == int:
+        result = float(result)
+    if type(result) != kind:
+        raise ValueError('%s = %s in profile [%s] of %s is not %s' %
+                         (name, value, CONFIG_PROFILE, CONFIG_FILE,
+                          'an int' if kind == int else 'a number'))
+    return result
+
+
+CONFIG_FILE = _option('config', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                             'invaders.ini'))
+
+_config = configparser.ConfigParser(inline_comment_prefixes=(';', '#'))
+_config.optionxform = str.upper
+_config.read(CONFIG_FILE) # a missing file is the same as an empty one
+
+CONFIG_PROFILE = _option('profile', _config.get('invaders', 'profile', fallback='classic'))
+
+if not (CONFIG_PROFILE in CONFIG_PROFILES or _config.has_section(CONFIG_PROFILE)):
+    raise ValueError('there is no profile %r in %s' % (CONFIG_PROFILE, CONFIG_FILE))
+_profile = dict(CONFIG_PROFILES.get(CONFIG_PROFILE, {}))
+if _config.has_section(CONFIG_PROFILE):
+    _profile.update(_config.items(CONFIG_PROFILE))
+
+for _name, _value in _profile.items():
+    if not (_name in CONFIG_KEYS):
+        raise ValueError('%s cannot be set by profile %r' % (_name, CONFIG_PROFILE))
+    if _name in _GIVEN:
+        continue # Keep the number from the command line
+    globals()[_name] = _parse(_name, _value)
+
+if not ('ALIEN_H_WALK' in _profile):
+    ALIEN_H_WALK = ALIEN_WIDTH // 4
+if not ('ALIEN_V_WALK' in _profile):
+    ALIEN_V_WALK = ALIEN_HEIGHT // 2
@@ -0,0 +1,259 @@
+"""
+Environment module for Alien Invaders
+
+This module contains the class WaveEnv, which lets a program (such as a bot being
+trained) play a single wave of Alien Invaders through the reset/step interface of
+reinforcement-learning environments.  Each step takes an action (which of left, right
+and fire to press), updates a headless wave, and returns an observation of the wave,
+a reward and whether the wave is over.
+
+A WaveEnv plays the wave directly, without the states of Invaders: when the ship is
+destroyed, the next step brings back a new ship straight away (while there are lives
+left), with no pause or key press needed.  Nothing is drawn, so a step takes only as
+long as an update of the wave.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+from wave import *
+import numpy as np
+
+# PRIMARY RULE: WaveEnv can only access attributes in wave.py via getters/setters.
+# It must never import game2d or Kivy; every wave it makes is headless.
+
+# the bit of an action to press the left arrow key
+ACTION_LEFT  = 1
+# the bit of an action to press the right arrow key
+ACTION_RIGHT = 2
+# the bit of an action to press the spacebar (fire)
+ACTION_FIRE  = 4
+# the number of different actions (every combination of the bits above)
+ACTION_COUNT = 8
+
+# the reward for each alien destroyed
+ENV_ALIEN_REWARD = 1.0
+# the reward for each life lost (a penalty)
+ENV_LIFE_REWARD  = -10.0
+# the number of alien bolts nearest to the ship in an observation
+ENV_NEAREST_BOLTS = 4
+
+
+class ActionInput(object):
+    """
+    A class that stands in for GInput, pressing the keys of an action.
+
+    As in the game, the ship only fires when the spacebar is pressed after an update
+    with no keys held down at all (see Wave._createPlayerBolts).
+
+    INSTANCE ATTRIBUTES:
+        _action: the action whose keys are held down [int, 0 <= _action < ACTION_COUNT]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    @property
+    def key_count(self):
+        """
+        The number of keys held down
+        """
+        return ((self._action & ACTION_LEFT) + ((self._action & ACTION_RIGHT) >> 1) +
+                ((self._action & ACTION_FIRE) >> 2))
+
+
+    def setAction(self, action):
+        """
+        Sets the action whose keys are held down
+
+        Parameter action: the action
+        Precondition: action is an int, 0 <= action < ACTION_COUNT
+        """
+        self._action = action
+
+
+    # INITIALIZER
+    def __init__(self):
+        """
+        Initializer: creates an input with no keys held down
+        """
+        self._action = 0
+
+
+    # PUBLIC METHODS
+    def is_key_down(self, key):
+        """
+        Returns True if the key is held down, False otherwise
+
+        Parameter key: the name of the key, as for GInput
+        Precondition: key is a str
+        """
+        if key == 'left':
+            return self._action & ACTION_LEFT != 0
+        elif key == 'right':
+            return self._action & ACTION_RIGHT != 0
+        elif key == 'spacebar':
+            return self._action & ACTION_FIRE != 0
+        return False
+
+
+class WaveEnv(object):
+    """
+    A class representing a wave of Alien Invaders as an environment for bots.
+
+    An action is an int made of the bits ACTION_LEFT, ACTION_RIGHT and ACTION_FIRE
+    (0 presses nothing).  A step holds the keys of the action down for repeat updates
+    of GAME_TICK seconds each.  The reward of a step is ENV_ALIEN_REWARD for each alien
+    destroyed plus ENV_LIFE_REWARD for each life lost.  The wave is done when the
+    aliens are all destroyed, an alien reaches the defense line, the lives run out,
+    or (if there is a limit) the limit of steps is reached.
+
+    An observation is a float32 array of getObservationSize() values, each about
+    between -1 and 1:
+        the x coordinate of the ship, over GAME_WIDTH (0.5 if the ship was just
+        destroyed, where it comes back)
+        the lives left, over SHIP_LIVES
+        the x and y coordinates of the alien at (0, 0), over GAME_WIDTH and GAME_HEIGHT
+        (this places the whole formation, as the aliens march together)
+        1 if the aliens march to the right, -1 if to the left
+        1 if a player bolt is on screen (so the ship cannot fire), 0 otherwise
+        for each of the ENV_NEAREST_BOLTS alien bolts nearest to the ship, its x and y
+        distance from the ship over GAME_WIDTH and GAME_HEIGHT and 1 (or 0, 0, 0 if
+        there are fewer bolts)
+        1 for each living alien and 0 for each dead one, row by row
+
+    The same array is returned by every step, with new values, so a caller that keeps
+    an observation must copy it.
+
+    INSTANCE ATTRIBUTES:
+        _difficulty: how hard the waves are [one of DIFFICULTY_CLASSIC, DIFFICULTY_BULLET_HELL]
+        _repeat:     the number of updates in a step [int > 0]
+        _limit:      the most steps in a wave [int > 0, or None for no limit]
+        _wave:       the wave being played [Wave, or None before the first reset]
+        _input:      the stand-in for the user input [ActionInput]
+        _steps:      the number of steps since the last reset [int >= 0]
+        _obs:        the observation returned by reset and step [float32 array]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getObservationSize(self):
+        """
+        Returns the number of values in an observation
+        """
+        return 6 + 3*ENV_NEAREST_BOLTS + ALIEN_ROWS*ALIENS_IN_ROW
+
+
+    def getActionCount(self):
+        """
+        Returns the number of different actions
+        """
+        return ACTION_COUNT
+
+
+    def getWave(self):
+        """
+        Returns the wave being played, or None before the first reset
+        """
+        return self._wave
+
+
+    # INITIALIZER
+    def __init__(self, difficulty=DIFFICULTY, repeat=1, limit=None):
+        """
+        Initializer: creates an environment with no wave (call reset to make one)
+
+        Parameter difficulty: how hard the waves are
+        Precondition: difficulty is one of DIFFICULTY_CLASSIC, DIFFICULTY_BULLET_HELL
+
+        Parameter repeat: the number of updates in a step
+        Precondition: repeat is an int > 0
+
+        Parameter limit: the most steps in a wave, or None for no limit
+        Precondition: limit is None or an int > 0
+        """
+        self._difficulty = difficulty
+        self._repeat = repeat
+        self._limit = limit
+        self._wave = None
+        self._input = ActionInput()
+        self._steps = 0
+        self._obs = np.zeros(self.getObservationSize(), dtype=np.float32)
+
+
+    # PUBLIC METHODS
+    def reset(self, seed=None):
+        """
+        Returns the first observation of a new wave
+
+        Parameter seed: the seed of the wave, or None to pick one at random
+        Precondition: seed is None or an int >= 0
+        """
+        self._wave = Wave(headless=True, difficulty=self._difficulty, seed=seed)
+        self._input.setAction(0)
+        self._steps = 0
+        return self._observe()
+
+
+    def step(self, action):
+        """
+        Returns the tuple (observation, reward, done, info) after playing an action
+
+        info is a dict with the number of 'lives' left, the number of living 'aliens',
+        whether the wave was 'won', and the number of 'steps' since the last reset.
+
+        Parameter action: the keys to press
+        Precondition: action is an int, 0 <= action < ACTION_COUNT, and the wave is not
+        done
+        """
+        wave = self._wave
+        aliens = wave.getAliens()
+        count = aliens.getAliveCount()
+        lives = wave.getLives()
+
+        self._input.setAction(action)
+        for x in range(self._repeat):
+            wave.update(self._input, GAME_TICK)
+            if wave.getGameOver() or wave.getLives() <= 0:
+                break
+        self._steps += 1
+
+        reward = ((count-aliens.getAliveCount())*ENV_ALIEN_REWARD +
+                  (lives-wave.getLives())*ENV_LIFE_REWARD)
+        done = (wave.getGameOver() or wave.getLives() <= 0 or aliens.isEmpty() or
+                aliens.lowestY() <= DEFENSE_LINE or
+                (not (self._limit is None) and self._steps >= self._limit))
+        info = {'lives': wave.getLives(), 'aliens': aliens.getAliveCount(),
+                'won': aliens.isEmpty(), 'steps': self._steps}
+        return (self._observe(), reward, done, info)
+
+
+    # HELPER METHODS
+    def _observe(self):
+        """
+        Returns the observation array, filled in from the wave
+        """
+        wave = self._wave
+        aliens = wave.getAliens()
+        bolts = wave.getBolts()
+        obs = self._obs
+
+        ship = wave.getShip()
+        shipx = GAME_WIDTH/2 if ship is None else ship.getShipX()
+        obs[0] = shipx/GAME_WIDTH
+        obs[1] = wave.getLives()/SHIP_LIVES
+        obs[2] = aliens.getAlienX(0, 0)/GAME_WIDTH
+        obs[3] = aliens.getAlienY(0, 0)/GAME_HEIGHT
+        obs[4] = 1 if wave.getDirection() == 'right' else -1
+        obs[5] = 1 if bolts.hasPlayerBolt() else 0
+
+        near = obs[6:6+3*ENV_NEAREST_BOLTS].reshape(ENV_NEAREST_BOLTS, 3)
+        near[:] = 0
+        enemy = ~bolts.isPlayer()
+        if enemy.any():
+            dx = (bolts.getX()[enemy]-shipx)/GAME_WIDTH
+            dy = (bolts.getY()[enemy]-SHIP_BOTTOM)/GAME_HEIGHT
+            order = np.argsort(dx*dx+dy*dy)[:ENV_NEAREST_BOLTS]
+            near[:len(order), 0] = dx[order]
+            near[:len(order), 1] = dy[order]
+            near[:len(order), 2] = 1
+
+        obs[6+3*ENV_NEAREST_BOLTS:] = aliens.getAlive().ravel()
+        return obs
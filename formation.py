@@ -0,0 +1,587 @@
+"""
+Formation module for Alien Invaders
+
+This module contains the class Formation, which stores the grid of aliens in a wave as
+NumPy arrays (a structure of arrays) instead of a 2d list of Alien objects.  The arrays
+are the authority on where each alien is and whether it is alive, so marching the whole
+formation is a single array operation.  The Alien sprites are only brought up to date
+with the arrays when the formation is drawn.
+
+A Formation also keeps an index of the living aliens (the counts per row and column,
+the bottom row of each column, the span of living columns) that it updates whenever an
+alien dies.  As the aliens always march together, this index answers every question
+the wave asks each frame (how far the formation extends, which columns can fire, and
+whether the game is over) in constant time.
+
+A Formation can be packed into a few bytes and restored (see snapshot).  As the aliens
+always march together, the positions are stored as just the x coordinate of each column
+and the y coordinate of each row.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+import numpy as np
+import struct
+import math
+import itertools
+
+# The source of the versions of every formation (see Formation.getVersion)
+_VERSIONS = itertools.count(1)
+
+# PRIMARY RULE: Formation is a model, so it is not allowed to access anything in any
+# module other than consts.py.  The sprites are made by a factory that Wave passes in.
+
+
+class Formation(object):
+    """
+    A class representing the grid of aliens in a single wave.
+
+    Row 0 is the bottom row and column 0 is the leftmost column, as in the old 2d list
+    of aliens.  Dead aliens keep their place in the position arrays and march along with
+    the rest of the formation, so the positions always form a regular lattice.
+
+    INSTANCE ATTRIBUTES:
+        _rows:    the number of rows in the formation [int > 0]
+        _cols:    the number of aliens in each row [int > 0]
+        _x:       the x coordinate of every alien [rows x cols float array]
+        _y:       the y coordinate of every alien [rows x cols float array]
+        _alive:   whether each alien is alive [rows x cols bool array]
+        _sprites: the sprites drawn for the aliens [rectangular 2d list of Alien, with
+                  a sprite for every alien (dead aliens are not drawn), or None if the
+                  formation is not drawn]
+        _synced:  whether the sprites agree with the position arrays [bool]
+        _version: the version of the aliens, see getVersion [int > 0]
+
+    The index of living aliens is kept in plain lists, as it is only read and written
+    one element at a time:
+        _count:    the number of living aliens [int >= 0]
+        _colcount: the number of living aliens in each column [list of cols ints >= 0]
+        _rowcount: the number of living aliens in each row [list of rows ints >= 0]
+        _bottom:   the bottom living row of each column [list of cols ints, or None
+                   for an empty column]
+        _livecols: the columns with a living alien, in no particular order [list of int]
+        _slots:    the position of each column in _livecols [list of cols ints, or None
+                   for an empty column]
+        _left:     the leftmost column with a living alien [int, > _right if empty]
+        _right:    the rightmost column with a living alien [int]
+        _lowest:   the lowest row with a living alien [int, == rows if empty]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getRows(self):
+        """
+        Returns the number of rows in the formation
+        """
+        return self._rows
+
+
+    def getCols(self):
+        """
+        Returns the number of aliens in each row of the formation
+        """
+        return self._cols
+
+
+    def isAlive(self, row, col):
+        """
+        Returns True if the alien at (row, col) is alive, False otherwise
+
+        Parameter row: the row of the alien
+        Precondition: row is an int, 0 <= row < number of rows
+
+        Parameter col: the column of the alien
+        Precondition: col is an int, 0 <= col < number of columns
+        """
+        return bool(self._alive[row, col])
+
+
+    def getAlive(self):
+        """
+        Returns whether each alien is alive, as a rows x cols bool array
+
+        The result is the array of the formation itself, so it must not be modified.
+        """
+        return self._alive
+
+
+    def getVersion(self):
+        """
+        Returns a number that changes whenever the aliens move, die or are restored
+
+        Every state of every formation gets a different number, so anything computed
+        from a formation can be reused for as long as its version is the same.
+        """
+        return self._version
+
+
+    def getAliveCount(self):
+        """
+        Returns the number of living aliens in the formation
+        """
+        return self._count
+
+
+    def getLiveColumnCount(self):
+        """
+        Returns the number of columns that still have a living alien
+        """
+        return len(self._livecols)
+
+
+    def getLiveColumn(self, index):
+        """
+        Returns the column at position index among the columns with a living alien
+
+        The order of the living columns is arbitrary (it changes as columns empty), but
+        it is the same every time for the same sequence of kills.  Together with 
+        getLiveColumnCount, this picks a random nonempty column in constant time.
+
+        Parameter index: the position of the column
+        Precondition: index is an int, 0 <= index < getLiveColumnCount()
+        """
+        return self._livecols[index]
+
+
+    def getAlienX(self, row, col):
+        """
+        Returns the x coordinate of the alien at (row, col)
+
+        Parameter row: the row of the alien
+        Precondition: row is an int, 0 <= row < number of rows
+
+        Parameter col: the column of the alien
+        Precondition: col is an int, 0 <= col < number of columns
+        """
+        return float(self._x[row, col])
+
+
+    def getAlienY(self, row, col):
+        """
+        Returns the y coordinate of the alien at (row, col)
+
+        Parameter row: the row of the alien
+        Precondition: row is an int, 0 <= row < number of rows
+
+        Parameter col: the column of the alien
+        Precondition: col is an int, 0 <= col < number of columns
+        """
+        return float(self._y[row, col])
+
+
+    # INITIALIZER TO CREATE THE FORMATION
+    def __init__(self, rows, cols, factory=None):
+        """
+        Initializer: creates a full formation of aliens below the ceiling
+
+        The aliens are laid out exactly as the old 2d list of aliens was, starting
+        ALIEN_CEILING pixels below the top of the window.
+
+        Parameter rows: the number of rows of aliens
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of aliens in each row
+        Precondition: cols is an int > 0
+
+        Parameter factory: the function to make an alien sprite, or None for no sprites
+        Precondition: factory is None or a callable taking (x, y, image), like Alien
+        """
+        self._rows = rows
+        self._cols = cols
+
+        x_pos = ALIEN_H_SEP + (ALIEN_WIDTH//2)
+        y_pos = GAME_HEIGHT - (ALIEN_CEILING + (rows*ALIEN_HEIGHT) + ((rows-1)*ALIEN_V_SEP))
+        xs = x_pos + np.arange(cols, dtype=float)*(ALIEN_H_SEP + ALIEN_WIDTH)
+        ys = y_pos + np.arange(rows, dtype=float)*(ALIEN_V_SEP + ALIEN_HEIGHT)
+        self._x = np.tile(xs, (rows, 1))
+        self._y = np.tile(ys[:, np.newaxis], (1, cols))
+        self._alive = np.ones((rows, cols), dtype=bool)
+        self._buildIndex(list(range(cols)))
+
+        self._sprites = None
+        if not (factory is None):
+            self._sprites = self._createSprites(factory)
+        self._synced = True
+        self._version = next(_VERSIONS)
+
+
+    # METHODS TO MOVE AND DESTROY ALIENS
+    def march(self, dx, dy):
+        """
+        Moves every alien in the formation by (dx, dy)
+
+        Parameter dx: the horizontal distance to move
+        Precondition: dx is an int or float
+
+        Parameter dy: the vertical distance to move
+        Precondition: dy is an int or float
+        """
+        if dx:
+            self._x += dx
+        if dy:
+            self._y += dy
+        self._synced = False
+        self._version = next(_VERSIONS)
+
+
+    def kill(self, row, col):
+        """
+        Destroys the alien at (row, col)
+
+        Parameter row: the row of the alien
+        Precondition: row is an int, 0 <= row < number of rows
+
+        Parameter col: the column of the alien
+        Precondition: col is an int, 0 <= col < number of columns, and the alien
+        at (row, col) is alive
+        """
+        self._alive[row, col] = False
+        self._version = next(_VERSIONS)
+
+        self._count -= 1
+        self._rowcount[row] -= 1
+        self._colcount[col] -= 1
+        if self._colcount[col] == 0:
+            self._removeColumn(col)
+        elif self._bottom[col] == row:
+            column = self._alive[:, col]
+            while not column[row]:
+                row += 1
+            self._bottom[col] = row
+
+        while self._lowest < self._rows and self._rowcount[self._lowest] == 0:
+            self._lowest += 1
+
+
+    # METHODS TO QUERY THE FORMATION
+    def rightmostX(self):
+        """
+        Returns the x coordinate of the rightmost living alien
+
+        Precondition: at least one alien is alive
+        """
+        return float(self._x[0, self._right])
+
+
+    def leftmostX(self):
+        """
+        Returns the x coordinate of the leftmost living alien
+
+        Precondition: at least one alien is alive
+        """
+        return float(self._x[0, self._left])
+
+
+    def bottomRow(self, col):
+        """
+        Returns the row of the bottom most living alien in the column, or None
+
+        Parameter col: the column to search
+        Precondition: col is an int, 0 <= col < number of columns
+        """
+        return self._bottom[col]
+
+
+    def isEmpty(self):
+        """
+        Returns True if every alien in the formation is dead
+        """
+        return self._count == 0
+
+
+    def lowestY(self):
+        """
+        Returns the y coordinate of the lowest living alien
+
+        Precondition: at least one alien is alive
+        """
+        return float(self._y[self._lowest, 0])
+
+
+    def hit(self, x, y, half_width, half_height):
+        """
+        Returns the (row, col) of the living alien hit by a box, or None
+
+        The box is hit if one of its corners is inside the alien, which is the test the
+        alien sprites made of the bolts before the aliens were arrays.  If several aliens
+        are hit, this returns the first one in row-major order, as the old loop over the
+        2d list did.
+
+        This is a sweep that does not move (see sweep).
+
+        Parameter x: the x coordinate of the center of the box
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the center of the box
+        Precondition: y is an int or float
+
+        Parameter half_width: half of the width of the box
+        Precondition: half_width is an int or float >= 0
+
+        Parameter half_height: half of the height of the box
+        Precondition: half_height is an int or float >= 0
+        """
+        return self.sweep(x, y, y, half_width, half_height)
+
+
+    def sweep(self, x, y0, y1, half_width, half_height):
+        """
+        Returns the (row, col) of the first living alien hit by a moving box, or None
+
+        The box moves straight up or down, from (x, y0) to (x, y1).  An alien is hit if
+        one of the corners of the box is inside the alien at any point along the way, so
+        a fast box cannot pass through an alien between two frames.  If several aliens
+        are hit, this returns the first one the box reaches: the rows are checked in the
+        direction the box moves (bottom to top if it does not move), and each row from
+        left to right.
+
+        As the aliens sit on a lattice, each corner can only be inside the aliens whose
+        cells its path crosses.  So this only checks the cells under the paths of the
+        corners: one or two columns, and a few rows more than the distance moved
+        divided by the height of a cell, no matter how large the formation is.
+
+        Parameter x: the x coordinate of the center of the box
+        Precondition: x is an int or float
+
+        Parameter y0: the y coordinate of the center of the box before it moved
+        Precondition: y0 is an int or float
+
+        Parameter y1: the y coordinate of the center of the box after it moved
+        Precondition: y1 is an int or float
+
+        Parameter half_width: half of the width of the box
+        Precondition: half_width is an int or float >= 0
+
+        Parameter half_height: half of the height of the box
+        Precondition: half_height is an int or float >= 0
+        """
+        left = x-half_width
+        right = x+half_width
+        low = min(y0, y1)
+        high = max(y0, y1)
+
+        row0 = max(self._cellOf(low-half_height, self._y[0, 0], ALIEN_HEIGHT+ALIEN_V_SEP), 0)
+        row1 = min(self._cellOf(high+half_height, self._y[0, 0], ALIEN_HEIGHT+ALIEN_V_SEP),
+                   self._rows-1)
+        col0 = max(self._cellOf(left, self._x[0, 0], ALIEN_WIDTH+ALIEN_H_SEP), 0)
+        col1 = min(self._cellOf(right, self._x[0, 0], ALIEN_WIDTH+ALIEN_H_SEP), self._cols-1)
+
+        if y1 >= y0:
+            rows = range(row0, row1+1)
+        else:
+            rows = range(row1, row0-1, -1)
+
+        aw = ALIEN_WIDTH/2.0
+        ah = ALIEN_HEIGHT/2.0
+        for row in rows:
+            for col in range(col0, col1+1):
+                if self._alive[row, col]:
+                    ax = self._x[row, col]
+                    ay = self._y[row, col]
+                    inx = abs(left-ax) < aw or abs(right-ax) < aw
+                    # The bottom and top corners each travel along a segment; a corner
+                    # is inside the alien somewhere if its segment crosses the alien
+                    bottom = low-half_height < ay+ah and high-half_height > ay-ah
+                    top = low+half_height < ay+ah and high+half_height > ay-ah
+                    if inx and (bottom or top):
+                        return (row, col)
+        return None
+
+
+    # DRAW METHOD TO DRAW THE LIVING ALIENS
+    def draw(self, view):
+        """
+        Draws the living aliens in the view provided
+
+        The sprites are moved to match the position arrays first, if the formation has
+        marched since it was last drawn.
+
+        Parameter view: the game view, used in drawing
+        Precondition: instance of GView and Invaders
+        """
+        if self._sprites is None:
+            return
+        if not self._synced:
+            self._sync()
+
+        alive = self._alive.tolist()
+        for row in range(self._rows):
+            for col in range(self._cols):
+                if alive[row][col]:
+                    self._sprites[row][col].draw(view)
+
+
+    # METHODS TO SAVE AND RESTORE THE FORMATION
+    def getSnapshotSize(self):
+        """
+        Returns the number of bytes in a snapshot of this formation
+
+        This only depends on the number of rows and columns.
+        """
+        return 8*(self._rows+self._cols) + 2*self._cols + (self._rows*self._cols+7)//8
+
+
+    def snapshot(self):
+        """
+        Returns the state of this formation packed into bytes
+
+        The bytes are, in order: the x coordinate of each column and the y coordinate
+        of each row as little-endian doubles, the living columns in the order of
+        getLiveColumn as cols little-endian unsigned shorts (padded with 0xFFFF), and
+        whether each alien is alive as one bit per alien in row-major order.  The
+        coordinates are stored as they are, not as an offset, so a restored formation
+        is exactly the same however far it marched.  The order of the living columns
+        is kept so that a restored formation picks the same columns for the same random
+        numbers.
+        """
+        order = self._livecols + [0xFFFF]*(self._cols-len(self._livecols))
+        return (self._x[0].astype('<f8').tobytes() +
+                self._y[:, 0].astype('<f8').tobytes() +
+                struct.pack('<%dH' % self._cols, *order) +
+                np.packbits(self._alive).tobytes())
+
+
+    def restore(self, data, offset=0):
+        """
+        Sets this formation to the state in a snapshot
+
+        The arrays are updated in place and no sprites are made, so restoring is cheap.
+        The sprites are moved to their restored positions when the formation is next
+        drawn.
+
+        Parameter data: the bytes holding the snapshot
+        Precondition: data is a bytes-like object
+
+        Parameter offset: where the snapshot starts in data
+        Precondition: offset is an int >= 0, and a value returned by the snapshot of a
+        formation with the same number of rows and columns starts at that position
+        """
+        rows = self._rows
+        cols = self._cols
+        xs = np.frombuffer(data, dtype='<f8', offset=offset, count=cols)
+        ys = np.frombuffer(data, dtype='<f8', offset=offset+8*cols, count=rows)
+        offset += 8*(rows+cols)
+        order = struct.unpack_from('<%dH' % cols, data, offset)
+        bits = np.frombuffer(data, dtype=np.uint8, offset=offset+2*cols,
+                             count=(rows*cols+7)//8)
+
+        self._x[:] = xs
+        self._y[:] = ys[:, np.newaxis]
+        self._alive[:] = np.unpackbits(bits, count=rows*cols).reshape(rows, cols)
+        self._buildIndex([col for col in order if col != 0xFFFF])
+        self._synced = False
+        self._version = next(_VERSIONS)
+
+
+    # HELPER METHODS
+    def _buildIndex(self, livecols):
+        """
+        Rebuilds the index of living aliens from the array _alive
+
+        Parameter livecols: the columns with a living alien, in the order to keep them
+        Precondition: livecols is a list of every column with a living alien in _alive
+        """
+        self._colcount = self._alive.sum(axis=0).tolist()
+        self._rowcount = self._alive.sum(axis=1).tolist()
+        self._count = sum(self._colcount)
+        live = [col for col in range(self._cols) if self._colcount[col]]
+        rows = [row for row in range(self._rows) if self._rowcount[row]]
+
+        bottom = self._alive.argmax(axis=0).tolist()
+        self._bottom = [bottom[col] if self._colcount[col] else None
+                        for col in range(self._cols)]
+        self._livecols = list(livecols)
+        self._slots = [None]*self._cols
+        for slot in range(len(self._livecols)):
+            self._slots[self._livecols[slot]] = slot
+        self._left = live[0] if live else self._cols
+        self._right = live[-1] if live else self._cols-1
+        self._lowest = rows[0] if rows else self._rows
+
+
+    def _createSprites(self, factory):
+        """
+        Returns the 2d list of alien sprites for this formation
+
+        The image of each row is chosen from ALIEN_IMAGES, changing every two rows.
+
+        Parameter factory: the function to make an alien sprite
+        Precondition: factory is a callable taking (x, y, image), like Alien
+        """
+        xs = self._x.tolist()
+        ys = self._y.tolist()
+        sprites = []
+
+        for row in range(self._rows):
+            if row % 6 == 0 or row % 6 == 1:
+                picture = 0
+            elif row % 6 == 2 or row % 6 == 3:
+                picture = 1
+            else:
+                picture = 2
+
+            sprites.append([factory(xs[row][col], ys[row][col], ALIEN_IMAGES[picture])
+                            for col in range(self._cols)])
+
+        return sprites
+
+
+    def _removeColumn(self, col):
+        """
+        Removes an empty column from the index of living aliens
+
+        The column is swapped with the last living column and popped, and the span of
+        living columns is narrowed past any empty columns at its edges.
+
+        Parameter col: the column that just emptied
+        Precondition: col is an int, a living column with no living aliens left
+        """
+        slot = self._slots[col]
+        last = self._livecols.pop()
+        if last != col:
+            self._livecols[slot] = last
+            self._slots[last] = slot
+        self._slots[col] = None
+        self._bottom[col] = None
+
+        while self._left <= self._right and self._colcount[self._left] == 0:
+            self._left += 1
+        while self._right >= self._left and self._colcount[self._right] == 0:
+            self._right -= 1
+
+
+    def _cellOf(self, value, origin, pitch):
+        """
+        Returns the lattice cell whose center is nearest to a coordinate
+
+        The result may be outside of the formation (negative, or past the last cell).
+
+        Parameter value: the coordinate
+        Precondition: value is an int or float
+
+        Parameter origin: the coordinate of the center of cell 0
+        Precondition: origin is an int or float
+
+        Parameter pitch: the distance between the centers of neighbouring cells
+        Precondition: pitch is an int or float > 0
+        """
+        return int(math.floor((value-origin)/pitch+0.5))
+
+
+    def _sync(self):
+        """
+        Moves the living alien sprites to match the position arrays
+
+        Dead aliens are left where they died; they are moved when they are drawn again
+        (after a restore).
+        """
+        xs = self._x.tolist()
+        ys = self._y.tolist()
+        alive = self._alive.tolist()
+        for row in range(self._rows):
+            for col in range(self._cols):
+                if alive[row][col]:
+                    alien = self._sprites[row][col]
+                    alien.setAlienX(xs[row][col])
+                    alien.setAlienY(ys[row][col])
+        self._synced = True
@@ -13,4 +13,5 @@ from .gsprite import GSprite
 from .gpath import GPath, GTriangle, GPolygon
 from .gview import GInput, GView
 from .sound import Sound, SoundLibrary
+from .profiler import FrameProfiler
 from .app import GameApp
\ No newline at end of file
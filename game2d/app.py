@@ -35,9 +35,19 @@ class GameApp(kivy.app.App):
     
     :meth:`draw`: This method draws all of the objects to the screen.  The only 
     thing you should have in this method are calls to ``self.view.draw()``.
+    
+    By default, :meth:`update` is called once before every drawn frame, with the time
+    since the last frame.  If the game is created with a ``tick``, the game state is
+    instead updated in fixed steps of ``tick`` seconds.  Each frame runs as many steps
+    as the time since the last frame allows (possibly none), and :meth:`draw` can use
+    the attribute ``alpha`` to place objects between the last two steps.  Then the game
+    runs at the same speed no matter how fast it is drawn.
     """
     # Class attribute for tracking textures (to reduce memory footprint)
     TEXTURE_CACHE = {}
+    # Class attribute for counting the hot paths of drawing: None, or an object with
+    # methods count(name, amount) and frame() (such as a Metrics of the game)
+    COUNTERS = None
     
     
     # MUTABLE ATTRIBUTES
@@ -62,8 +72,69 @@ class GameApp(kivy.app.App):
         self._fps = value
         Clock.schedule_interval(self._refresh,1.0/self._fps)
     
+    @property
+    def probe(self):
+        """
+        The object told when each phase of a frame begins and ends, or None
+        
+        At the start of every frame, the method ``frame()`` of the probe is called.  Then
+        ``begin(name)`` and ``end(name)`` are called around each phase of the frame, 
+        which are named ``'clear'`` (clearing the view), ``'update'`` (every call to 
+        :meth:`update` in the frame) and ``'draw'``, all inside a phase ``'refresh'``
+        (the whole frame).  See :class:`FrameProfiler`.
+        
+        **Invariant**: Must be None or an object with methods ``frame``, ``begin`` and 
+        ``end``.
+        """
+        return self._probe
+    
+    @probe.setter
+    def probe(self,value):
+        assert value is None or hasattr(value,'begin'), '%s is not a probe' % repr(value)
+        self._probe = value
+    
     
     # IMMUTABLE PROPERTIES
+    @property
+    def tick(self):
+        """
+        The number of seconds in one fixed update step, or None
+        
+        If this value is None, :meth:`update` is called once per frame with the time 
+        since the last frame.  Otherwise, :meth:`update` is called with exactly this 
+        value, as many times as needed to keep up with the clock.
+        
+        **Invariant**: Must be None or an int or float > 0.
+        """
+        return self._tick
+    
+    @property
+    def maxticks(self):
+        """
+        The largest number of fixed update steps to run for one frame
+        
+        If the game falls further behind than this (for example, while the window is 
+        being dragged), the missing time is dropped, so that the game does not spend
+        ever longer catching up.  This value is unused if ``tick`` is None.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxticks
+    
+    @property
+    def alpha(self):
+        """
+        How far the clock is between the last fixed update step and the next one
+        
+        This is 0 right after a step and approaches 1 just before the next one, so 
+        :meth:`draw` can blend the positions of the last two steps to animate smoothly
+        when frames and steps do not line up.  This value is always 1 if ``tick`` is 
+        None.
+        
+        **Invariant**: Must be a float with 0 <= alpha <= 1.
+        """
+        return self._alpha
+    
     @property
     def width(self):
         """
@@ -176,9 +247,14 @@ class GameApp(kivy.app.App):
         :type name:  ``str``
         """
         assert cls.is_image(name), '%s is not an image file' % repr(name)
+        counters = cls.COUNTERS
         if name in cls.TEXTURE_CACHE:
+            if counters:
+                counters.count('texture_hits',1)
             return cls.TEXTURE_CACHE[name]
         
+        if counters:
+            counters.count('texture_misses',1)
         try:
             from kivy.core.image import Image
             texture = Image(name).texture
@@ -220,6 +296,11 @@ class GameApp(kivy.app.App):
             
             GameApp(width=400,height=400)
         
+        To update the game in fixed steps of 1/60th of a second, whatever the frame
+        rate, also give the ``tick``::
+            
+            GameApp(width=400,height=400,tick=1/60)
+        
         The game window will not show until you start the game. To start the game, use 
         the method ``run()``.
         
@@ -232,15 +313,25 @@ class GameApp(kivy.app.App):
         w = keywords.pop('width', 0.0)
         h = keywords.pop('height', 0.0)
         f = keywords.pop('fps', 60.0)
+        t = keywords.pop('tick', None)
+        m = keywords.pop('maxticks', 5)
 
         assert type(w) in [int,float], 'width %s is not a number' % repr(w)
         assert type(h) in [int,float], 'height %s is not a number' % repr(h)
         assert type(f) in [int,float], 'fps %s is not a number' % repr(value)
         assert f > 0, 'fps %s is not positive' % repr(value)
+        assert t is None or type(t) in [int,float], 'tick %s is not a number' % repr(t)
+        assert t is None or t > 0, 'tick %s is not positive' % repr(t)
+        assert type(m) == int and m > 0, 'maxticks %s is not a positive int' % repr(m)
 
         self._gwidth = w
         self._gheight = h
         self._fps = f
+        self._tick = t
+        self._maxticks = m
+        self._lag = 0.0
+        self._alpha = 1.0
+        self._probe = None
         
         Config.set('graphics', 'width', str(self.width))
         Config.set('graphics', 'height', str(self.height))
@@ -346,12 +437,43 @@ class GameApp(kivy.app.App):
         This method a callback-proxy for the methods `update` and `draw`.  It handles
         important issues behind the scenes, particularly with clearing the window.
         
+        If the game has a ``tick``, the time since the last frame is added to the time
+        not yet simulated, and `update` is called once for every whole ``tick`` in it.
+        What is left over sets ``alpha``.
+        
+        If the game has a ``probe``, it is told when each phase of the frame begins 
+        and ends.  If ``COUNTERS`` is set, the frame is counted.
+        
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
+        counters = self.COUNTERS
+        if counters:
+            counters.frame()
+        probe = self._probe
+        if probe:
+            probe.frame()
+            probe.begin('refresh')
+            probe.begin('clear')
         self.view.clear()
-        self.update(dt)
+        if probe:
+            probe.end('clear')
+            probe.begin('update')
+        if self._tick is None:
+            self.update(dt)
+        else:
+            self._lag = min(self._lag+dt, self._tick*self._maxticks)
+            while self._lag >= self._tick:
+                self.update(self._tick)
+                self._lag -= self._tick
+            self._alpha = self._lag/self._tick
+        if probe:
+            probe.end('update')
+            probe.begin('draw')
         self.draw()
+        if probe:
+            probe.end('draw')
+            probe.end('refresh')
     
     def _setpaths(self):
         """
@@ -11,6 +11,7 @@ Date:   August 1, 2017 (Python 3 version)
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from cornell import Point2, Matrix
+from .app import GameApp
 
 def is_color(c):
     """
@@ -602,7 +603,12 @@ class GObject(object):
     def _reset(self):
         """
         Resets the drawing cache.
+        
+        The rebuild is counted in ``GameApp.COUNTERS``, if it is set.
         """
+        counters = GameApp.COUNTERS
+        if counters:
+            counters.count('cache_rebuilds',1)
         self._cache = InstructionGroup()
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
@@ -15,6 +15,7 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.metrics import dp
 
 from cornell import Point2
+from .app import GameApp
 
 
 class GInput(object):
@@ -350,9 +351,14 @@ class GView(FloatLayout):
         You should never call this method, since you do not understand raw Kivy graphics
         commands.  Instead, you should use the `draw` method in :class:`GObject` instead.
         
+        The call is counted in ``GameApp.COUNTERS``, if it is set.
+        
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
         """
+        counters = GameApp.COUNTERS
+        if counters:
+            counters.count('view_draws',1)
         self._frame.add(cmd)
     
     def clear(self):
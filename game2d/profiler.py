@@ -0,0 +1,274 @@
+"""
+Frame profiler for 2D game support.
+
+This module contains the class FrameProfiler, which records how long each phase of the
+last few frames took, and draws the timings over the game as bar graphs with a frame
+rate readout.  It is a probe (see the attribute ``probe`` of :class:`GameApp`), so it
+sees the phases of every frame, and any other object can report more phases to it.
+
+Author: Komukill Loganathan (kl866)
+Date:   November 30, 2017
+"""
+from .grectangle import GRectangle, GLabel
+import numpy as np
+import time
+
+
+class FrameProfiler(object):
+    """
+    A class recording the time of each phase of the last frames, with an overlay.
+
+    The times are kept in a ring buffer with one row per frame: when the buffer is full,
+    each new frame replaces the oldest.  A phase can begin and end more than once in a
+    frame; its time in the frame is the total.  A name that is not one of the phases is
+    ignored, so a probe can report more than a profiler shows.
+
+    The overlay shows, for each phase, a bar as long as its average time and a thin bar
+    behind it as long as its worst time, both as a share of the frame budget (the bar
+    turns red if the worst time went over it).  The text is only redrawn every few
+    frames, as making the texture of a label is slow.
+    """
+    # The default phases: the ones of GameApp, then the steps of an update of a wave
+    PHASES = ('clear', 'update', 'draw', 'gameover', 'march', 'ship', 'bolts', 'collisions')
+
+    # The width of the bar of a phase that took the whole budget
+    BAR_WIDTH = 150
+    # The height of each line of the overlay
+    LINE_HEIGHT = 16
+    # The number of frames between two redraws of the text
+    TEXT_FRAMES = 15
+
+    # IMMUTABLE PROPERTIES
+    @property
+    def phases(self):
+        """
+        The names of the phases recorded, in the order shown.
+
+        **Invariant**: Must be a tuple of ``str``.
+        """
+        return self._names
+
+    @property
+    def budget(self):
+        """
+        The time that a frame may take, in seconds.
+
+        **Invariant**: Must be a float > 0.
+        """
+        return self._budget
+
+    @property
+    def frames(self):
+        """
+        The number of frames recorded so far, up to one less than the size of the ring
+        buffer (the row of the frame in progress is not counted).
+
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._filled
+
+    # BUILT-IN METHODS
+    def __init__(self, phases=PHASES, size=120, budget=1.0/60, left=10, top=690):
+        """
+        Creates a profiler with no frames recorded.
+
+        :param phases: the names of the phases to record
+        :type phases:  sequence of ``str``
+
+        :param size: the number of frames in the ring buffer
+        :type size:  ``int`` > 0
+
+        :param budget: the time that a frame may take, in seconds
+        :type budget:  ``float`` > 0
+
+        :param left: the left edge of the overlay
+        :type left:  ``int`` or ``float``
+
+        :param top: the top edge of the overlay
+        :type top:  ``int`` or ``float``
+        """
+        self._names = tuple(phases)
+        self._columns = dict((name, pos) for pos, name in enumerate(self._names))
+        self._times = np.zeros((size, len(self._names)))
+        self._frametimes = np.zeros(size)
+        self._starts = [0.0]*len(self._names)
+        self._row = 0
+        self._filled = 0
+        self._last = None
+        self._budget = float(budget)
+        self._left = left
+        self._top = top
+        self._overlay = None
+        self._countdown = 0
+
+    # PUBLIC METHODS
+    def frame(self):
+        """
+        Starts a new frame, replacing the oldest one if the ring buffer is full.
+
+        The time since the last call is the time of the frame that just ended.
+        """
+        now = time.perf_counter()
+        if not (self._last is None):
+            self._frametimes[self._row] = now-self._last
+            self._row = (self._row+1) % len(self._frametimes)
+            self._filled = min(self._filled+1, len(self._frametimes)-1)
+            self._times[self._row] = 0
+        self._last = now
+
+    def begin(self, name):
+        """
+        Marks the start of a phase in this frame.
+
+        :param name: the name of the phase
+        :type name:  ``str``
+        """
+        pos = self._columns.get(name)
+        if not (pos is None):
+            self._starts[pos] = time.perf_counter()
+
+    def end(self, name):
+        """
+        Marks the end of a phase in this frame, adding its time since :meth:`begin`.
+
+        :param name: the name of the phase
+        :type name:  ``str``
+        """
+        pos = self._columns.get(name)
+        if not (pos is None):
+            self._times[self._row, pos] += time.perf_counter()-self._starts[pos]
+
+    def getMean(self, name):
+        """
+        :return: the average time of a phase over the frames recorded, in seconds
+        :rtype:  ``float``
+
+        :param name: the name of the phase
+        :type name:  ``str``
+        """
+        if self._filled == 0:
+            return 0.0
+        return float(self._finished()[:, self._columns[name]].mean())
+
+    def getMax(self, name):
+        """
+        :return: the worst time of a phase over the frames recorded, in seconds
+        :rtype:  ``float``
+
+        :param name: the name of the phase
+        :type name:  ``str``
+        """
+        if self._filled == 0:
+            return 0.0
+        return float(self._finished()[:, self._columns[name]].max())
+
+    def getFrameTime(self):
+        """
+        :return: the average time between frames, in seconds (0 if none were recorded)
+        :rtype:  ``float``
+        """
+        if self._filled == 0:
+            return 0.0
+        return float(self._frametimes[self._recorded()].mean())
+
+    def getMaxFrameTime(self):
+        """
+        :return: the worst time between frames, in seconds (0 if none were recorded)
+        :rtype:  ``float``
+        """
+        if self._filled == 0:
+            return 0.0
+        return float(self._frametimes[self._recorded()].max())
+
+    def getFPS(self):
+        """
+        :return: the number of frames per second, over the frames recorded
+        :rtype:  ``float``
+        """
+        frametime = self.getFrameTime()
+        return 0.0 if frametime == 0 else 1.0/frametime
+
+    def draw(self, view):
+        """
+        Draws the overlay of the timings in the view.
+
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        if self._overlay is None:
+            self._overlay = self._createOverlay()
+        labels, means, worsts, readout = self._overlay
+
+        for pos in range(len(self._names)):
+            name = self._names[pos]
+            mean = self.getMean(name)
+            worst = self.getMax(name)
+            self._setBar(means[pos], mean, 'green' if mean <= self._budget else 'red')
+            self._setBar(worsts[pos], worst, 'gray' if worst <= self._budget else 'red')
+            if self._countdown == 0:
+                labels[pos].text = '%-10s %6.2f %6.2f' % (name, mean*1000, worst*1000)
+        if self._countdown == 0:
+            readout.text = 'FPS %5.1f  frame %5.2f ms  worst %5.2f ms  budget %5.2f ms' % (
+                self.getFPS(), self.getFrameTime()*1000, self.getMaxFrameTime()*1000,
+                self._budget*1000)
+        self._countdown = (self._countdown+1) % self.TEXT_FRAMES
+
+        readout.draw(view)
+        for pos in range(len(self._names)):
+            labels[pos].draw(view)
+            worsts[pos].draw(view)
+            means[pos].draw(view)
+
+    # HIDDEN METHODS
+    def _recorded(self):
+        """
+        :return: the rows of the ring buffer of the frames that are over
+        :rtype:  ``slice`` or ``list`` of ``int``
+        """
+        if self._filled < len(self._frametimes)-1:
+            return slice(0, self._filled)
+        return [pos for pos in range(len(self._frametimes)) if pos != self._row]
+
+    def _finished(self):
+        """
+        :return: the times of the phases of the frames that are over
+        :rtype:  2d ``numpy`` array, one row per frame
+        """
+        return self._times[self._recorded()]
+
+    def _createOverlay(self):
+        """
+        :return: the tuple (labels, mean bars, worst bars, readout) of the overlay
+        :rtype:  ``tuple``
+        """
+        line = self.LINE_HEIGHT
+        readout = GLabel(text='', font_size=12, halign='left', left=self._left,
+                         top=self._top, linecolor='black')
+        labels = []
+        means = []
+        worsts = []
+        for pos in range(len(self._names)):
+            y = self._top-(pos+1.5)*line
+            labels.append(GLabel(text=self._names[pos], font_size=12, halign='left',
+                                 left=self._left, top=y+line/2, linecolor='black'))
+            worsts.append(GRectangle(x=0, y=y, width=1, height=line/4, fillcolor='gray'))
+            means.append(GRectangle(x=0, y=y, width=1, height=line/2, fillcolor='green'))
+        return (labels, means, worsts, readout)
+
+    def _setBar(self, bar, seconds, color):
+        """
+        Sets a bar to show a time, as a share of the budget.
+
+        :param bar: the bar to set
+        :type bar:  :class:`GRectangle`
+
+        :param seconds: the time to show
+        :type seconds:  ``float`` >= 0
+
+        :param color: the color of the bar
+        :type color:  ``str``
+        """
+        width = max(1.0, min(seconds/self._budget, 2.0)*self.BAR_WIDTH)
+        bar.width = width
+        bar.left = self._left+180
+        bar.fillcolor = color
@@ -0,0 +1,393 @@
+"""
+Metrics module for Alien Invaders
+
+This module counts what the hot paths of the game do, for long unattended (soak) runs
+where the trend over hours matters more than any one frame.  The counters are
+
+    alien_collision_tests  player bolts tested against the formation
+    ship_collision_tests   alien bolts tested against the ship
+    bolts_created          bolts fired by the ship or the aliens
+    bolts_destroyed        bolts that hit something, left the screen or were cleared
+    cache_rebuilds         drawing caches rebuilt by GObject._reset
+    view_draws             calls to GView.draw
+    texture_hits           textures found in the cache of GameApp.load_texture
+    texture_misses         textures that GameApp.load_texture had to load
+    frames                 frames (or, headless, actions) counted by Metrics.frame
+
+and the times of the last METRICS_FRAMES frames are kept for their percentiles.
+
+Counting is off until a Metrics is enabled (see enable).  Each hot path reads the global
+COUNTERS and only counts if it is not None, so when counting is off a hot path costs one
+global lookup and one test.  The game2d package cannot import this module, so its hot
+paths count into GameApp.COUNTERS, which the game sets to the same Metrics.
+
+A MetricsWriter appends a report to a file as one line of JSON every few seconds, and a
+MetricsServer serves the latest report over HTTP.  Both run in threads of their own.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+import numpy as np
+import http.server
+import threading
+import json
+import time
+
+# PRIMARY RULE: metrics.py is not allowed to access anything in any module other than
+# consts.py.  The game counts into it; it never reads the game.
+
+# the metrics that the hot paths count into [Metrics, or None if counting is off]
+COUNTERS = None
+
+
+def enable(counters):
+    """
+    Turns counting on (or off), into the given metrics
+
+    Parameter counters: the metrics to count into, or None to stop counting
+    Precondition: counters is a Metrics or None
+    """
+    global COUNTERS
+    COUNTERS = counters
+
+
+class Metrics(object):
+    """
+    A class counting the hot paths of the game, and timing its frames.
+
+    The counts are kept by name, so any part of the game can add a counter.  The times
+    of the frames are kept in a ring buffer of fixed size: when it is full, each new
+    frame replaces the oldest.
+
+    The game counts from its own thread, while reports may be made from a writer or a
+    server thread.  A report copies the counts at once (a copy of a dict is one step that
+    no other thread can interrupt), so it never sees a count half made.  The ring buffer
+    takes several steps to change, so it is only read or changed while holding _lock;
+    a report never sees the time of a frame without the position that goes with it.
+
+    INSTANCE ATTRIBUTES:
+        _counts:  the count of each counter [dict from str to int]
+        _times:   the time of each of the last frames, in seconds [float array]
+        _next:    the position in _times of the next frame [int, 0 <= _next < len(_times)]
+        _filled:  the number of frames in _times [int, 0 <= _filled <= len(_times)]
+        _lock:    the lock held to read or change _times, _next and _filled
+                  [threading.Lock]
+        _last:    when the last frame started [float from time.perf_counter, or None
+                  before the first frame]
+        _started: when the metrics were made [float from time.time]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getCount(self, name):
+        """
+        Returns the count of a counter (0 if it never counted)
+
+        Parameter name: the name of the counter
+        Precondition: name is a str
+        """
+        return self._counts.get(name, 0)
+
+
+    def getCounts(self):
+        """
+        Returns a copy of the counts, as a dict from the name of each counter to its count
+        """
+        return dict(self._counts)
+
+
+    def getFrameTimes(self):
+        """
+        Returns a copy of the times of the last frames, in seconds, oldest first
+        """
+        with self._lock:
+            return self._copyTimes()
+
+
+    # INITIALIZER
+    def __init__(self, frames=METRICS_FRAMES):
+        """
+        Initializer: creates metrics with nothing counted
+
+        Parameter frames: the number of frames to keep the times of
+        Precondition: frames is an int > 0
+        """
+        self._counts = {}
+        self._times = np.zeros(frames)
+        self._next = 0
+        self._filled = 0
+        self._lock = threading.Lock()
+        self._last = None
+        self._started = time.time()
+
+
+    # METHODS TO COUNT
+    def count(self, name, amount=1):
+        """
+        Adds amount to a counter
+
+        Parameter name: the name of the counter
+        Precondition: name is a str
+
+        Parameter amount: the amount to add
+        Precondition: amount is an int >= 0
+        """
+        self._counts[name] = self._counts.get(name, 0)+amount
+
+
+    def frame(self):
+        """
+        Counts a frame, and keeps the time since the last one
+
+        This is the method frame of a probe (see GameApp.probe), so the game calls it at
+        the start of every frame.
+        """
+        now = time.perf_counter()
+        if not (self._last is None):
+            self._addTime(now-self._last)
+        self._last = now
+        self.count('frames')
+
+
+    def merge(self, counts, times):
+        """
+        Adds counts and frame times from somewhere else, such as another process
+
+        Parameter counts: the counts to add
+        Precondition: counts is a dict from str to int
+
+        Parameter times: the frame times to keep, in seconds, oldest first
+        Precondition: times is a sequence or array of floats >= 0
+        """
+        for name, amount in counts.items():
+            self.count(name, amount)
+        for value in times:
+            self._addTime(value)
+
+
+    def drain(self):
+        """
+        Returns the pair (counts, frame times) of this metrics, and starts again from zero
+
+        This is how a process sends what it counted to another one (see merge).  The
+        next frame is not timed, as the time since the last one was not a frame.
+        """
+        counts = self.getCounts()
+        self._counts = {}
+        with self._lock:
+            times = self._copyTimes()
+            self._next = 0
+            self._filled = 0
+        self._last = None
+        return (counts, times)
+
+
+    # METHODS TO REPORT
+    def report(self, previous=None):
+        """
+        Returns a report of the metrics, as a dict that can be written as JSON
+
+        The report has the time it was made, the seconds since the metrics were made,
+        every count, and the mean, percentiles and maximum of the frame times in
+        milliseconds.  If there is a previous report, it also has how much each counter
+        grew every second and every frame since then.
+
+        Parameter previous: an earlier report of this metrics, or None
+        Precondition: previous is a dict returned by report, or None
+        """
+        now = time.time()
+        counts = self.getCounts()
+        times = self.getFrameTimes()*1000
+        result = {'time': now, 'uptime': now-self._started, 'counts': counts}
+        if len(times):
+            p50, p90, p99 = np.percentile(times, (50, 90, 99)).tolist()
+            result['frame_ms'] = {'frames': len(times), 'mean': float(times.mean()),
+                                  'p50': p50, 'p90': p90, 'p99': p99,
+                                  'max': float(times.max())}
+        if not (previous is None):
+            seconds = now-previous['time']
+            before = previous['counts']
+            growth = dict((name, counts[name]-before.get(name, 0)) for name in counts)
+            frames = growth.get('frames', 0)
+            result['interval'] = seconds
+            if seconds > 0:
+                result['per_second'] = dict((name, growth[name]/seconds) for name in growth)
+            if frames > 0:
+                result['per_frame'] = dict((name, growth[name]/frames) for name in growth)
+        return result
+
+
+    # HELPER METHODS
+    def _copyTimes(self):
+        """
+        Returns a copy of the times of the last frames, oldest first
+
+        The caller must hold _lock.
+        """
+        if self._filled < len(self._times):
+            return self._times[:self._filled].copy()
+        return np.roll(self._times, -self._next)
+
+
+    def _addTime(self, value):
+        """
+        Keeps the time of a frame, replacing the oldest if the ring buffer is full
+
+        Parameter value: the time of the frame, in seconds
+        Precondition: value is a float >= 0
+        """
+        with self._lock:
+            self._times[self._next] = value
+            self._next = (self._next+1) % len(self._times)
+            self._filled = min(self._filled+1, len(self._times))
+
+
+class MetricsWriter(object):
+    """
+    A class appending a report of some metrics to a file every few seconds.
+
+    Each report is one line of JSON, and has how much each counter grew since the line
+    before it (see Metrics.report), so the file can be read as a time series.  The file
+    is flushed after every line, so a run that is killed keeps every line written.
+
+    INSTANCE ATTRIBUTES:
+        _metrics:  the metrics to report [Metrics]
+        _file:     the file to append to [file object, open for appending text]
+        _interval: the seconds between two reports [float > 0]
+        _previous: the last report written [dict, or None before the first]
+        _stop:     set to stop the thread [threading.Event]
+        _thread:   the thread writing the reports [threading.Thread]
+    """
+
+    # INITIALIZER
+    def __init__(self, metrics, path, interval=METRICS_INTERVAL):
+        """
+        Initializer: starts appending reports of metrics to the file path
+
+        Parameter metrics: the metrics to report
+        Precondition: metrics is a Metrics
+
+        Parameter path: the name of the file to append to
+        Precondition: path is a str
+
+        Parameter interval: the seconds between two reports
+        Precondition: interval is an int or float > 0
+        """
+        self._metrics = metrics
+        self._file = open(path, 'a')
+        self._interval = interval
+        self._previous = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-writer')
+        self._thread.daemon = True
+        self._thread.start()
+
+
+    # PUBLIC METHODS
+    def write(self):
+        """
+        Appends a report of the metrics to the file now
+        """
+        report = self._metrics.report(self._previous)
+        self._file.write(json.dumps(report)+'\n')
+        self._file.flush()
+        self._previous = report
+
+
+    def close(self):
+        """
+        Stops the thread, appends a last report and closes the file
+        """
+        self._stop.set()
+        self._thread.join()
+        self.write()
+        self._file.close()
+
+
+    # HELPER METHODS
+    def _run(self):
+        """
+        Appends a report every _interval seconds, until _stop is set
+        """
+        while not self._stop.wait(self._interval):
+            self.write()
+
+
+class MetricsServer(object):
+    """
+    A class serving the report of some metrics over HTTP.
+
+    A GET of /metrics (or /) answers with the report (see Metrics.report) as JSON.  The
+    server only listens on the local host unless told otherwise, as the soak machines
+    are read from the machine itself or through a tunnel.
+
+    INSTANCE ATTRIBUTES:
+        _server: the HTTP server [http.server.HTTPServer, with an attribute metrics]
+        _thread: the thread serving the requests [threading.Thread]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getPort(self):
+        """
+        Returns the port the server listens on
+        """
+        return self._server.server_address[1]
+
+
+    # INITIALIZER
+    def __init__(self, metrics, port=0, host='127.0.0.1'):
+        """
+        Initializer: starts serving the report of metrics
+
+        Parameter metrics: the metrics to serve
+        Precondition: metrics is a Metrics
+
+        Parameter port: the port to listen on, or 0 for any free port
+        Precondition: port is an int, 0 <= port < 65536
+
+        Parameter host: the address to listen on
+        Precondition: host is a str
+        """
+        self._server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.metrics = metrics
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='metrics-server')
+        self._thread.daemon = True
+        self._thread.start()
+
+
+    # PUBLIC METHODS
+    def close(self):
+        """
+        Stops the server
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    """
+    The handler of the requests to a MetricsServer
+    """
+
+    def do_GET(self):
+        """
+        Answers a GET of /metrics (or /) with the report of the metrics, as JSON
+        """
+        if not (self.path.split('?')[0] in ('/', '/metrics')):
+            self.send_error(404)
+            return
+        body = json.dumps(self.server.metrics.report()).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def log_message(self, format, *args):
+        """
+        Logs nothing, as a soak run would fill its log with requests
+        """
+        pass
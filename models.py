@@ -24,14 +24,15 @@ make a new class or not, please ask on Piazza.
 """
 from consts import *
 from game2d import *
+from bodies import *
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other than 
-# consts.py.  If you need extra information from Gameplay, then it should be
-# a parameter in your method, and Wave should pass it as a argument when it
-# calls the method.
+# consts.py (and the shared rules in bodies.py).  If you need extra information from
+# Gameplay, then it should be a parameter in your method, and Wave should pass it as a
+# argument when it calls the method.
 
 
-class Ship(GImage):
+class Ship(ShipModel, GImage):
     """
     A class to represent the game ship.
     
@@ -54,23 +55,10 @@ class Ship(GImage):
     features (like animation). If you add attributes, list them below.
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-    """
-    pass
-    
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    def getShipX(self):
-        """
-        Returns the x coordinate of Ship object
-        """
-        return self.x
-        
-    
-    def getShipY(self):
-        """
-        Returns the y coordinate of Ship object
-        """
-        return self.y
     
+    The getters and moveShip are inherited from ShipModel in bodies.py, so
+    that the headless ShipBody follows exactly the same rules.
+    """
     
     # INITIALIZER TO CREATE A NEW SHIP
     def __init__(self):
@@ -80,59 +68,11 @@ class Ship(GImage):
         super().__init__(x=GAME_WIDTH/2, y=SHIP_BOTTOM, width=SHIP_WIDTH,
                          height=SHIP_HEIGHT, source='ship.png')
     
-    # METHODS TO MOVE THE SHIP AND CHECK FOR COLLISIONS
-    def moveShip(self, input):
-        """
-        Moves ship to left or right based on keystroke detected.
-        
-        This method reads the player's key presses.The ship moves only when the
-        player presses a left or right arrow keys.
-        
-        This method is written with guidance from codes in arrows.py update()
-        method from class
-        """
-        #print('initial x: ' + str(self.x)) #watch
-        da = 0
-        if input.is_key_down('left'):
-            da += SHIP_MOVEMENT
-        if input.is_key_down('right'):
-            da -= SHIP_MOVEMENT
-        
-        #change position
-        x = self.x - da
-        x = max(SHIP_WIDTH/2, x)
-        x = min(x, GAME_WIDTH-(SHIP_WIDTH/2))
-        self.x = x
-        
-    
-    def collides(self,bolt):
-        """
-        Returns: True if the bolt was fired by the alien and collides with this ship
-        
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
-        """
-        collision = False
-        half_width = BOLT_WIDTH/2
-        half_height = BOLT_HEIGHT/2
-        
-        bottomleft = self.contains((bolt.getBoltX()-half_width, bolt.getBoltY()-half_height))
-        bottomright = self.contains((bolt.getBoltX()+half_width, bolt.getBoltY()-half_height))
-        bottom = bottomleft or bottomright
-        
-        topleft = self.contains((bolt.getBoltX()-half_width, bolt.getBoltY()+half_height))
-        topright = self.contains((bolt.getBoltX()+half_width, bolt.getBoltY()+half_height))
-        top = topleft or topright
-        
-        collision = bottom or top
-        
-        return collision and (not bolt.isPlayerBolt())
-    
     
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 
-class Alien(GImage):
+class Alien(AlienModel, GImage):
     """
     A class to represent a single alien.
     
@@ -152,42 +92,10 @@ class Alien(GImage):
     them below.
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-    """
-    
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    def getAlienX(self):
-        """
-        Returns the x coordinate of the alien object
-        """
-        return self.x
-    
     
-    def setAlienX(self, val):
-        """
-        Sets x coordinate of Alien object
-        
-        Parameter val: value to be set as x coordinate
-        Precondition: val is a number, int or float, x>0 and x<GAME_WIDTH
-        """
-        self.x = val
-    
-    
-    def getAlienY(self):
-        """
-        Returns the y coordinate of the alien object
-        """
-        return self.y
-    
-    
-    def setAlienY(self, val):
-        """
-        Sets y coordinate of Alien object
-        
-        Parameter val: value to be set as y coordinate
-        Precondition: val is a number, int or float, y>0 and y<GAME_HEIGHT
-        """
-        self.y = val
-        
+    The setters are inherited from AlienModel in bodies.py.  The collisions of the
+    aliens are tested in Formation, on the positions of every alien at once.
+    """
     
     # INITIALIZER TO CREATE AN ALIEN
     def __init__(self, x_coor, y_coor, image):
@@ -205,34 +113,10 @@ class Alien(GImage):
         """
         super().__init__(x=x_coor, y=y_coor, width=ALIEN_WIDTH, height=ALIEN_HEIGHT, source=image)
     
-    # METHOD TO CHECK FOR COLLISION (IF DESIRED)
-    def collides(self, bolt):
-        """
-        Returns: True if the bolt was fired by the player and collides with this alien
-        
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
-        """
-        collision = False
-        half_width = BOLT_WIDTH/2
-        half_height = BOLT_HEIGHT/2
-        
-        bottomleft = self.contains((bolt.getBoltX()-half_width, bolt.getBoltY()-half_height))
-        bottomright = self.contains((bolt.getBoltX()+half_width, bolt.getBoltY()-half_height))
-        bottom = bottomleft or bottomright
-        
-        topleft = self.contains((bolt.getBoltX()-half_width, bolt.getBoltY()+half_height))
-        topright = self.contains((bolt.getBoltX()+half_width, bolt.getBoltY()+half_height))
-        top = topleft or topright
-        
-        collision = bottom or top
-        
-        return bolt.isPlayerBolt() and collision
-    
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
 
 
-class Bolt(GRectangle):
+class Bolt(BoltModel, GRectangle):
     """
     A class representing a laser bolt.
     
@@ -257,45 +141,10 @@ class Bolt(GRectangle):
         _velocity: The velocity in y direction [int or float]
     
     LIST MORE ATTRIBUTES (AND THEIR INVARIANTS) HERE IF NECESSARY
-    """
-    pass
-    
-    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
-    def isPlayerBolt(self):
-        """
-        Returns True if Bolt object is fired by Player, False otherwise
-        """
-        return (self._velocity >= 0)
-    
-    def getBoltY(self):
-        """
-        Returns the y value of the bottom of the Bolt object
-        """
-        return self.y
-    
-    
-    def setBoltY(self, yval):
-        """
-        Sets the y coordinate of Bolt object
-        
-        Parameter yval: y coordinate to be set as
-        Precondition: y is an int or float
-        """
-        self.y = yval
-    
-    
-    def getBoltX(self):
-        """
-        Returns the x value of the center of the Bolt object
-        """
-        return self.x
-    
-    def getVelocity(self):
-        """
-        Returns velocity of Bolt object
-        """
-        return self._velocity
     
+    isPlayerBolt and fire are inherited from BoltModel in bodies.py, which keeps the
+    rules apart from the drawing.
+    """
     
     # INITIALIZER TO SET THE VELOCITY
     def __init__(self, xval, yval, w, h, fill, direction):
@@ -324,10 +173,7 @@ class Bolt(GRectangle):
         Precondition direction is a str, either 'up' or 'down'
         """
         super().__init__(x=xval, y=yval, width=w, height=h, fillcolor=fill)
-        if direction == 'up':
-            self._velocity = BOLT_SPEED
-        elif direction == 'down':
-            self._velocity = -1*BOLT_SPEED
+        self._setDirection(direction)
             
     
     # ADD MORE METHODS (PROPERLY SPECIFIED) AS NECESSARY
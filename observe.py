@@ -0,0 +1,378 @@
+"""
+Observation module for Alien Invaders
+
+This module contains the class ObservationBuilder, which turns the state of a wave into
+what a bot sees, without drawing anything.  It offers two forms of observation: a short
+vector of features (where the ship is, the alien bolts nearest to it, and the bottom
+alien of each column), and a small raster of the screen, where each cell is 1 if the
+center of an alien, a bolt or the ship is inside it.
+
+Each form is written into an array made once by the builder and reused for every
+observation, with scratch arrays for the work in between, so building an observation
+does not allocate memory (except to make room the first time there are more bolts than
+ever before).  It costs much less than the update of the wave it observes.  A builder
+can observe any wave, such as the one played by a WaveEnv (see WaveEnv.getWave).
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+import numpy as np
+
+# PRIMARY RULE: ObservationBuilder can only access attributes in wave.py via
+# getters/setters.  It never draws; every observation comes from the state of the wave.
+
+# the number of alien bolts nearest to the ship in the features
+OBSERVE_NEAREST_BOLTS = 4
+# the number of columns of cells in the raster
+OBSERVE_RASTER_WIDTH  = 80
+# the number of rows of cells in the raster
+OBSERVE_RASTER_HEIGHT = 70
+# the channel of the raster with the aliens
+OBSERVE_ALIENS = 0
+# the channel of the raster with the bolts (of the player and of the aliens)
+OBSERVE_BOLTS  = 1
+# the channel of the raster with the ship
+OBSERVE_SHIP   = 2
+
+
+class ObservationBuilder(object):
+    """
+    A class that builds observations of waves into reused arrays.
+
+    The features are a float32 array of getFeatureSize() values, each about between -1
+    and 1:
+        the x coordinate of the ship, over GAME_WIDTH (0.5 if the ship was just
+        destroyed, where it comes back)
+        the lives left, over SHIP_LIVES
+        1 if the aliens march to the right, -1 if to the left
+        1 if a player bolt is on screen (so the ship cannot fire), 0 otherwise
+        the y coordinate of the player bolt over GAME_HEIGHT (0 if there is none)
+        for each of the nearest alien bolts to the ship, its x and y distance from the
+        ship over GAME_WIDTH and GAME_HEIGHT and 1 (or 0, 0, 0 if there are fewer bolts)
+        for each column of aliens, 1 if it has a living alien (0 if not), the x distance
+        of the column from the ship over GAME_WIDTH, and the y coordinate of its bottom
+        living alien over GAME_HEIGHT (0 if it has none)
+
+    The raster is a float32 array of shape getRasterShape(): one channel each for the
+    aliens, the bolts and the ship (OBSERVE_ALIENS, OBSERVE_BOLTS, OBSERVE_SHIP), each a
+    grid of cells with row 0 at the top of the screen.  A cell is 1 if the center of
+    something of its channel is inside it, and 0 otherwise.
+
+    The same arrays are returned by every call, with new values, so a caller that keeps
+    an observation must copy it.
+
+    INSTANCE ATTRIBUTES:
+        _rows:     the number of rows of aliens [int > 0]
+        _cols:     the number of columns of aliens [int > 0]
+        _nearest:  the number of alien bolts in the features [int >= 0]
+        _width:    the number of columns of cells in the raster [int > 0]
+        _height:   the number of rows of cells in the raster [int > 0]
+        _features: the features [float32 array of getFeatureSize()]
+        _cells:    the raster, flattened, plus one cell past the end that collects what
+                   is not drawn [float32 array of 3*_height*_width+1]
+        _raster:   the raster [float32 array view of _cells, of getRasterShape()]
+        _near:     the nearest alien bolts in the features [float32 array view of
+                   _features, of _nearest x 3]
+        _columns:  the columns of aliens in the features [float32 array view of
+                   _features, of _cols x 3]
+        _featurekey: the version of the aliens in the features [int >= 0, 0 for none]
+        _rasterkey:  the version of the aliens in the raster [int >= 0, 0 for none]
+        _drawn:    the number of bolts in the raster [int >= 0]
+        _shipcell: the cell of the ship in the raster [int, the last cell of _cells if
+                   there is no ship]
+        _colx:     the x offset of each column from column 0 [float array of _cols]
+        _rowy:     the y offset of each row from row 0 [float array of _rows]
+        _bottom:   scratch for the bottom row of each column [int array of _cols]
+        _present:  scratch for which columns have a living alien [bool array of _cols]
+        _fcol:     the x coordinate of each column over GAME_WIDTH, for the features
+                   [float array of _cols]
+        _acol:     scratch for each column [float array of _cols]
+        _frow:     scratch for each row [float array of _rows]
+        _icol:     scratch for the cell column of each column [int array of _cols]
+        _irow:     scratch for the cell row of each row [int array of _rows]
+        _index:    the cell of each alien in the raster, or the last cell of _cells for
+                   a dead alien [int array of _rows x _cols]
+        _dead:     scratch for which aliens are dead [bool array of _rows x _cols]
+        _fbolt:    scratch for the bolts [float array of 3 x the most bolts so far]
+        _ibolt:    scratch for the bolts; row 1 holds the cells of the bolts in the
+                   raster [int array of 2 x the most bolts so far]
+
+    The version of a formation changes whenever its aliens change (see
+    Formation.getVersion), so the parts of an observation that only depend on the
+    aliens are only worked out again when the version changes.
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getFeatureSize(self):
+        """
+        Returns the number of values in the features
+        """
+        return 5 + 3*self._nearest + 3*self._cols
+
+
+    def getRasterShape(self):
+        """
+        Returns the shape of the raster, as the tuple (channels, rows, columns)
+        """
+        return (3, self._height, self._width)
+
+
+    # INITIALIZER
+    def __init__(self, rows=ALIEN_ROWS, cols=ALIENS_IN_ROW, nearest=OBSERVE_NEAREST_BOLTS,
+                 width=OBSERVE_RASTER_WIDTH, height=OBSERVE_RASTER_HEIGHT):
+        """
+        Initializer: creates a builder for waves with the given number of aliens
+
+        Parameter rows: the number of rows of aliens in the waves
+        Precondition: rows is an int > 0
+
+        Parameter cols: the number of columns of aliens in the waves
+        Precondition: cols is an int > 0
+
+        Parameter nearest: the number of alien bolts in the features
+        Precondition: nearest is an int >= 0
+
+        Parameter width: the number of columns of cells in the raster
+        Precondition: width is an int > 0
+
+        Parameter height: the number of rows of cells in the raster
+        Precondition: height is an int > 0
+        """
+        self._rows = rows
+        self._cols = cols
+        self._nearest = nearest
+        self._width = width
+        self._height = height
+
+        self._features = np.zeros(self.getFeatureSize(), dtype=np.float32)
+        self._near = self._features[5:5+3*nearest].reshape(nearest, 3)
+        self._columns = self._features[5+3*nearest:].reshape(cols, 3)
+        self._cells = np.zeros(3*height*width+1, dtype=np.float32)
+        self._raster = self._cells[:-1].reshape(3, height, width)
+        self._featurekey = 0
+        self._rasterkey = 0
+        self._drawn = 0
+        self._shipcell = len(self._cells)-1
+
+        self._colx = np.arange(cols, dtype=float)*(ALIEN_WIDTH+ALIEN_H_SEP)
+        self._rowy = np.arange(rows, dtype=float)*(ALIEN_HEIGHT+ALIEN_V_SEP)
+        self._bottom = np.zeros(cols, dtype=np.intp)
+        self._present = np.zeros(cols, dtype=bool)
+        self._fcol = np.zeros(cols)
+        self._acol = np.zeros(cols)
+        self._frow = np.zeros(rows)
+        self._icol = np.zeros(cols, dtype=np.intp)
+        self._irow = np.zeros(rows, dtype=np.intp)
+        self._index = np.full((rows, cols), len(self._cells)-1, dtype=np.intp)
+        self._dead = np.zeros((rows, cols), dtype=bool)
+        self._fbolt = np.zeros((3, BOLT_CAPACITY))
+        self._ibolt = np.zeros((2, BOLT_CAPACITY), dtype=np.intp)
+
+
+    # PUBLIC METHODS
+    def features(self, wave):
+        """
+        Returns the features of a wave (see the class docstring)
+
+        Parameter wave: the wave to observe
+        Precondition: wave is a Wave with _rows x _cols aliens
+        """
+        aliens = wave.getAliens()
+        bolts = wave.getBolts()
+        out = self._features
+
+        ship = wave.getShip()
+        shipx = GAME_WIDTH/2 if ship is None else ship.getShipX()
+        out[0] = shipx/GAME_WIDTH
+        out[1] = wave.getLives()/SHIP_LIVES
+        out[2] = 1 if wave.getDirection() == 'right' else -1
+        out[3] = 0
+        out[4] = 0
+
+        self._near[:] = 0
+        n = len(bolts)
+        if n:
+            player = bolts.isPlayer()
+            if bolts.hasPlayerBolt():
+                out[3] = 1
+                out[4] = bolts.getY()[np.argmax(player)]/GAME_HEIGHT
+            if n > self._fbolt.shape[1]:
+                self._growBolts(n)
+            dx = self._fbolt[0, :n]
+            dy = self._fbolt[1, :n]
+            dist = self._fbolt[2, :n]
+            np.subtract(bolts.getX(), shipx, out=dx)
+            dx *= 1.0/GAME_WIDTH
+            np.subtract(bolts.getY(), SHIP_BOTTOM, out=dy)
+            dy *= 1.0/GAME_HEIGHT
+            np.hypot(dx, dy, out=dist)
+            np.copyto(dist, np.inf, where=player)
+            near = self._near
+            for slot in range(min(self._nearest, n)):
+                index = np.argmin(dist)
+                if dist[index] == np.inf:
+                    break
+                near[slot, 0] = dx[index]
+                near[slot, 1] = dy[index]
+                near[slot, 2] = 1
+                dist[index] = np.inf
+
+        if aliens.getVersion() != self._featurekey:
+            self._featureColumns(aliens)
+        np.subtract(self._fcol, shipx/GAME_WIDTH, out=self._columns[:, 1])
+        return out
+
+
+    def raster(self, wave):
+        """
+        Returns the raster of a wave (see the class docstring)
+
+        Only the cells that were set in the last raster are cleared, and the aliens are
+        only drawn again when they have changed, so most rasters only move the bolts and
+        the ship.
+
+        Parameter wave: the wave to observe
+        Precondition: wave is a Wave with _rows x _cols aliens
+        """
+        cells = self._cells
+        plane = self._height*self._width
+
+        aliens = wave.getAliens()
+        if aliens.getVersion() != self._rasterkey:
+            self._rasterAliens(aliens)
+
+        cells[self._ibolt[1, :self._drawn]] = 0
+        bolts = wave.getBolts()
+        n = len(bolts)
+        if n:
+            if n > self._fbolt.shape[1]:
+                self._growBolts(n)
+            col = self._ibolt[0, :n]
+            row = self._ibolt[1, :n]
+            self._cellX(bolts.getX(), col, self._fbolt[0, :n])
+            self._cellY(bolts.getY(), row, self._fbolt[0, :n])
+            row *= self._width
+            row += col
+            row += OBSERVE_BOLTS*plane
+            cells[row] = 1
+        self._drawn = n
+
+        cells[self._shipcell] = 0
+        ship = wave.getShip()
+        if ship is None:
+            self._shipcell = len(cells)-1
+        else:
+            col = min(max(int(ship.getShipX()*self._width/GAME_WIDTH), 0), self._width-1)
+            row = min(max(int((GAME_HEIGHT-ship.getShipY())*self._height/GAME_HEIGHT), 0),
+                      self._height-1)
+            self._shipcell = OBSERVE_SHIP*plane+row*self._width+col
+            cells[self._shipcell] = 1
+        return self._raster
+
+
+    # HELPER METHODS
+    def _featureColumns(self, aliens):
+        """
+        Puts the features of the columns of aliens that do not depend on the ship
+
+        The presence and bottom y coordinate of each column go straight into the
+        features, and the x coordinate of each column over GAME_WIDTH into _fcol.
+
+        Parameter aliens: the aliens of the wave
+        Precondition: aliens is a Formation with _rows x _cols aliens
+        """
+        alive = aliens.getAlive()
+        columns = self._columns
+        np.any(alive, axis=0, out=self._present)
+        np.argmax(alive, axis=0, out=self._bottom)
+        columns[:, 0] = self._present
+        np.take(self._rowy, self._bottom, out=self._fcol)
+        self._fcol += aliens.getAlienY(0, 0)
+        np.divide(self._fcol, GAME_HEIGHT, out=columns[:, 2])
+        columns[:, 2] *= self._present
+        np.add(self._colx, aliens.getAlienX(0, 0), out=self._fcol)
+        self._fcol *= 1.0/GAME_WIDTH
+        self._featurekey = aliens.getVersion()
+
+
+    def _rasterAliens(self, aliens):
+        """
+        Draws the aliens into their channel of the raster, in place of the old ones
+
+        Parameter aliens: the aliens of the wave
+        Precondition: aliens is a Formation with _rows x _cols aliens
+        """
+        cells = self._cells
+        cells[self._index] = 0
+        np.add(self._colx, aliens.getAlienX(0, 0), out=self._acol)
+        self._cellX(self._acol, self._icol)
+        np.add(self._rowy, aliens.getAlienY(0, 0), out=self._frow)
+        self._cellY(self._frow, self._irow)
+        self._irow *= self._width
+        np.add(self._irow[:, np.newaxis], self._icol[np.newaxis, :], out=self._index)
+        np.logical_not(aliens.getAlive(), out=self._dead)
+        np.copyto(self._index, len(cells)-1, where=self._dead)
+        cells[self._index] = 1
+        self._rasterkey = aliens.getVersion()
+
+
+    def _cellX(self, xs, out, scratch=None):
+        """
+        Puts the raster column of each x coordinate into out
+
+        Parameter xs: the x coordinates
+        Precondition: xs is a float array
+
+        Parameter out: where to put the columns
+        Precondition: out is an int array, the same length as xs
+
+        Parameter scratch: a scratch array, or None to work in xs itself
+        Precondition: scratch is None or a float array the same length as xs
+        """
+        if scratch is None:
+            scratch = xs
+        np.multiply(xs, self._width/GAME_WIDTH, out=scratch)
+        np.minimum(scratch, self._width-1, out=scratch)
+        np.maximum(scratch, 0, out=scratch)
+        np.copyto(out, scratch, casting='unsafe')
+
+
+    def _cellY(self, ys, out, scratch=None):
+        """
+        Puts the raster row of each y coordinate into out (row 0 is at the top)
+
+        Parameter ys: the y coordinates
+        Precondition: ys is a float array
+
+        Parameter out: where to put the rows
+        Precondition: out is an int array, the same length as ys
+
+        Parameter scratch: a scratch array, or None to work in ys itself
+        Precondition: scratch is None or a float array the same length as ys
+        """
+        if scratch is None:
+            scratch = ys
+        np.subtract(GAME_HEIGHT, ys, out=scratch)
+        scratch *= self._height/GAME_HEIGHT
+        np.minimum(scratch, self._height-1, out=scratch)
+        np.maximum(scratch, 0, out=scratch)
+        np.copyto(out, scratch, casting='unsafe')
+
+
+    def _growBolts(self, size):
+        """
+        Doubles the scratch arrays for the bolts until they can hold size bolts
+
+        The cells of the bolts in the raster are kept, so they can still be cleared.
+
+        Parameter size: the number of bolts the arrays must hold
+        Precondition: size is an int > 0
+        """
+        capacity = self._fbolt.shape[1]
+        while capacity < size:
+            capacity *= 2
+        ibolt = np.zeros((2, capacity), dtype=np.intp)
+        ibolt[:, :self._drawn] = self._ibolt[:, :self._drawn]
+        self._fbolt = np.zeros((3, capacity))
+        self._ibolt = ibolt
@@ -0,0 +1,131 @@
+"""
+Bolt pool module for Alien Invaders
+
+This module contains the class BoltPool, which recycles laser bolts.  Making a Bolt is
+expensive: the initializer checks every keyword, parses the color name and builds a new
+Kivy drawing cache.  A pool keeps the spent bolts of each direction on a free list and
+hands them out again, moving them to the new position, so drawing the bolts does not
+make anything new once the pool is warm.
+
+The bolts themselves are stored as arrays (see projectiles.py); the pooled Bolt objects
+are only the sprites that Wave draws them with.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+
+# PRIMARY RULE: The pool does not know which bolt class it holds.  Wave passes in the
+# factory (Bolt), so this module never imports models.py or game2d.
+
+
+class BoltPool(object):
+    """
+    A class representing a pool of reusable laser bolts.
+
+    Bolts are pooled by direction.  All bolts going the same direction have the same
+    color, so a recycled bolt never has to change color (which would rebuild its
+    drawing cache).
+
+    INSTANCE ATTRIBUTES:
+        _factory: the function to make a new bolt [callable taking (x, y, width,
+                  height, fill, direction), like Bolt]
+        _colors:  the fill color of the bolts in each direction [dict mapping 'up'
+                  and 'down' to color strings]
+        _free:    the spent bolts ready for reuse [dict mapping 'up' and 'down' to
+                  lists of bolts]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getFreeCount(self, direction):
+        """
+        Returns the number of spent bolts ready for reuse in the given direction
+
+        Parameter direction: the direction of the bolts
+        Precondition: direction is a str, either 'up' or 'down'
+        """
+        return len(self._free[direction])
+
+
+    # INITIALIZER TO CREATE THE POOL
+    def __init__(self, factory, upcolor, downcolor, size=0):
+        """
+        Initializer: creates a pool, with size bolts made ahead for each direction
+
+        Parameter factory: the function to make a new bolt
+        Precondition: factory is a callable taking (x, y, width, height, fill,
+        direction), like Bolt
+
+        Parameter upcolor: the fill color of the bolts going up
+        Precondition: upcolor is a str, a valid RGB color
+
+        Parameter downcolor: the fill color of the bolts going down
+        Precondition: downcolor is a str, a valid RGB color
+
+        Parameter size: the number of bolts to make ahead for each direction
+        Precondition: size is an int >= 0
+        """
+        self._factory = factory
+        self._colors = {'up': upcolor, 'down': downcolor}
+        self._free = {'up': [], 'down': []}
+
+        for direction in ('up', 'down'):
+            for x in range(size):
+                self._free[direction].append(self._make(0, 0, direction))
+
+
+    # PUBLIC METHODS
+    def acquire(self, x, y, direction):
+        """
+        Returns a bolt at (x, y) travelling in the given direction
+
+        The bolt is a recycled one if there is one free; otherwise it is made new.
+
+        Parameter x: x coordinate of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: y coordinate of the bolt
+        Precondition: y is an int or float
+
+        Parameter direction: direction travelled by the bolt
+        Precondition: direction is a str, either 'up' or 'down'
+        """
+        free = self._free[direction]
+        if not free:
+            return self._make(x, y, direction)
+
+        bolt = free.pop()
+        bolt.fire(x, y, direction)
+        return bolt
+
+
+    def release(self, bolt):
+        """
+        Returns a spent bolt to the pool for reuse
+
+        The bolt must no longer be used by anything else.
+
+        Parameter bolt: the spent bolt
+        Precondition: bolt was acquired from this pool and not released since
+        """
+        if bolt.isPlayerBolt():
+            self._free['up'].append(bolt)
+        else:
+            self._free['down'].append(bolt)
+
+
+    # HELPER METHODS
+    def _make(self, x, y, direction):
+        """
+        Returns a new bolt at (x, y) travelling in the given direction
+
+        Parameter x: x coordinate of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: y coordinate of the bolt
+        Precondition: y is an int or float
+
+        Parameter direction: direction travelled by the bolt
+        Precondition: direction is a str, either 'up' or 'down'
+        """
+        return self._factory(x, y, BOLT_WIDTH, BOLT_HEIGHT, self._colors[direction], direction)
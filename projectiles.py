@@ -0,0 +1,404 @@
+"""
+Projectile module for Alien Invaders
+
+This module contains the class ProjectileSystem, which stores every laser bolt in a wave
+as NumPy arrays (positions, velocities and owners) instead of as a list of Bolt objects.
+Moving, culling and testing the bolts against the ship are each one array operation per
+frame, no matter how many bolts there are.  This is what lets the bullet-hell difficulty
+keep thousands of alien bolts on screen.
+
+Collisions are swept: each bolt remembers where it was before it last moved, and is
+tested along the whole segment it travelled, not only where it stopped.  So a bolt
+cannot pass through an alien or the ship, however far it moves in one frame.
+
+The Bolt sprites are only needed to draw the bolts; Wave makes them from the arrays
+when it draws.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+import numpy as np
+import struct
+
+# PRIMARY RULE: ProjectileSystem is a model, so it is not allowed to access anything in
+# any module other than consts.py.  The formation to collide with is passed in by Wave.
+
+
+class ProjectileSystem(object):
+    """
+    A class representing all of the laser bolts in a wave.
+
+    A bolt is a player bolt if its velocity is >= 0 (it goes up), exactly as for the
+    class Bolt.  The bolts are kept packed at the front of the arrays, in no particular
+    order: removing bolts moves later bolts down to fill the gaps.  The arrays double
+    in size whenever they fill up.
+
+    INSTANCE ATTRIBUTES:
+        _count:    the number of bolts [int >= 0]
+        _x:        the x coordinate of the center of each bolt [float array, only the
+                   first _count entries are bolts]
+        _y:        the y coordinate of the center of each bolt [float array, the same
+                   length as _x]
+        _prevy:    the y coordinate of the center of each bolt before it last moved
+                   [float array, the same length as _x; equal to _y for a new bolt]
+        _velocity: the velocity in the y direction of each bolt [float array, the same
+                   length as _x]
+        _player:   whether each bolt was fired by the player [bool array, the same
+                   length as _x]
+        _players:  the number of bolts fired by the player [int, 0 <= _players <= _count]
+
+    The count _players lets the collision tests skip the array work when there are no
+    bolts of the owner they test, which is most frames in the classic difficulty.
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def __len__(self):
+        """
+        Returns the number of bolts
+        """
+        return self._count
+
+
+    def getX(self):
+        """
+        Returns the x coordinates of the bolts
+
+        The result is a view of the array of bolts, so it must not be modified, and it
+        is only valid until the bolts next change.
+        """
+        return self._x[:self._count]
+
+
+    def getY(self):
+        """
+        Returns the y coordinates of the bolts
+
+        The result is a view of the array of bolts, so it must not be modified, and it
+        is only valid until the bolts next change.
+        """
+        return self._y[:self._count]
+
+
+    def getPrevY(self):
+        """
+        Returns the y coordinates of the bolts before they last moved
+
+        The result is a view of the array of bolts, so it must not be modified, and it
+        is only valid until the bolts next change.
+        """
+        return self._prevy[:self._count]
+
+
+    def getVelocity(self):
+        """
+        Returns the velocities of the bolts
+
+        The result is a view of the array of bolts, so it must not be modified, and it
+        is only valid until the bolts next change.
+        """
+        return self._velocity[:self._count]
+
+
+    def isPlayer(self):
+        """
+        Returns whether each bolt was fired by the player
+
+        The result is a view of the array of bolts, so it must not be modified, and it
+        is only valid until the bolts next change.
+        """
+        return self._player[:self._count]
+
+
+    def hasPlayerBolt(self):
+        """
+        Returns True if any bolt was fired by the player, False otherwise
+        """
+        return self._players > 0
+
+
+    def getPlayerCount(self):
+        """
+        Returns the number of bolts fired by the player
+        """
+        return self._players
+
+
+    # INITIALIZER TO CREATE AN EMPTY SYSTEM
+    def __init__(self, capacity=BOLT_CAPACITY):
+        """
+        Initializer: creates a system with no bolts
+
+        Parameter capacity: the number of bolts to make room for at first
+        Precondition: capacity is an int > 0
+        """
+        self._count = 0
+        self._x = np.zeros(capacity)
+        self._y = np.zeros(capacity)
+        self._prevy = np.zeros(capacity)
+        self._velocity = np.zeros(capacity)
+        self._player = np.zeros(capacity, dtype=bool)
+        self._players = 0
+
+
+    # METHODS TO ADD AND REMOVE BOLTS
+    def spawn(self, x, y, velocity):
+        """
+        Adds a bolt at (x, y) with the given velocity
+
+        Parameter x: x coordinate of the bolt
+        Precondition: x is an int or float
+
+        Parameter y: y coordinate of the bolt
+        Precondition: y is an int or float
+
+        Parameter velocity: the velocity of the bolt in the y direction
+        Precondition: velocity is an int or float; >= 0 for a player bolt
+        """
+        if self._count == len(self._x):
+            self._grow(self._count+1)
+
+        n = self._count
+        self._x[n] = x
+        self._y[n] = y
+        self._prevy[n] = y
+        self._velocity[n] = velocity
+        self._player[n] = velocity >= 0
+        self._count = n+1
+        if velocity >= 0:
+            self._players += 1
+
+
+    def spawnMany(self, xs, ys, velocity):
+        """
+        Adds a bolt at each (xs[i], ys[i]), all with the same velocity
+
+        Parameter xs: the x coordinates of the bolts
+        Precondition: xs is a sequence or array of numbers
+
+        Parameter ys: the y coordinates of the bolts
+        Precondition: ys is a sequence or array of numbers, the same length as xs
+
+        Parameter velocity: the velocity of the bolts in the y direction
+        Precondition: velocity is an int or float; >= 0 for player bolts
+        """
+        k = len(xs)
+        if self._count+k > len(self._x):
+            self._grow(self._count+k)
+
+        n = self._count
+        self._x[n:n+k] = xs
+        self._y[n:n+k] = ys
+        self._prevy[n:n+k] = ys
+        self._velocity[n:n+k] = velocity
+        self._player[n:n+k] = velocity >= 0
+        self._count = n+k
+        if velocity >= 0:
+            self._players += k
+
+
+    def remove(self, mask):
+        """
+        Removes every bolt whose entry in mask is True
+
+        Parameter mask: which bolts to remove
+        Precondition: mask is a bool array with one entry per bolt
+        """
+        keep = np.flatnonzero(~mask)
+        k = len(keep)
+        if k == self._count:
+            return
+
+        self._x[:k] = self._x[keep]
+        self._y[:k] = self._y[keep]
+        self._prevy[:k] = self._prevy[keep]
+        self._velocity[:k] = self._velocity[keep]
+        self._player[:k] = self._player[keep]
+        self._count = k
+        self._players = int(np.count_nonzero(self._player[:k]))
+
+
+    def clear(self):
+        """
+        Removes every bolt
+        """
+        self._count = 0
+        self._players = 0
+
+
+    # METHODS TO MOVE AND COLLIDE THE BOLTS
+    def move(self):
+        """
+        Moves every bolt by its velocity, remembering where it was
+        """
+        n = self._count
+        self._prevy[:n] = self._y[:n]
+        self._y[:n] += self._velocity[:n]
+
+
+    def cull(self, bottom, top):
+        """
+        Removes every bolt whose y coordinate is not in the range (bottom, top]
+
+        Parameter bottom: the lowest y coordinate to keep (exclusive)
+        Precondition: bottom is an int or float
+
+        Parameter top: the highest y coordinate to keep (inclusive)
+        Precondition: top is an int or float
+        """
+        y = self._y[:self._count]
+        out = (y > top) | (y <= bottom)
+        if out.any():
+            self.remove(out)
+
+
+    def collideBox(self, x, y, width, height, player):
+        """
+        Returns True if any bolt of the given owner collides with a box
+
+        A bolt collides with the box if one of the corners of the bolt is inside the
+        box, which is the test the ship made of each Bolt, at any point between where the
+        bolt was before it last moved and where it is now.  The bolts are not removed.
+
+        Parameter x: the x coordinate of the center of the box
+        Precondition: x is an int or float
+
+        Parameter y: the y coordinate of the center of the box
+        Precondition: y is an int or float
+
+        Parameter width: the width of the box
+        Precondition: width is an int or float > 0
+
+        Parameter height: the height of the box
+        Precondition: height is an int or float > 0
+
+        Parameter player: whether to test the player bolts (or else the alien bolts)
+        Precondition: player is a bool
+        """
+        n = self._count
+        owned = self._players if player else n-self._players
+        if owned == 0:
+            return False
+
+        bx = self._x[:n]
+        low = np.minimum(self._prevy[:n], self._y[:n])
+        high = np.maximum(self._prevy[:n], self._y[:n])
+        hw = BOLT_WIDTH/2
+        hh = BOLT_HEIGHT/2
+        bottom = y-height/2.0
+        top = y+height/2.0
+        if hw < width/2.0 and hh < height/2.0:
+            # A bolt smaller than the box has a corner inside it exactly when the two
+            # overlap, which is one comparison per side of the box
+            inx = np.abs(bx-x) < width/2.0+hw
+            iny = (low-hh < top) & (high+hh > bottom)
+        else:
+            # Each corner travels along a segment, which must cross the box
+            inx = (np.abs(bx-hw-x) < width/2.0) | (np.abs(bx+hw-x) < width/2.0)
+            iny = (((low-hh < top) & (high-hh > bottom)) |
+                   ((low+hh < top) & (high+hh > bottom)))
+        hits = inx & iny
+        if owned < n:
+            hits &= (self._player[:n] == player)
+        return bool(hits.any())
+
+
+    def collideFormation(self, formation):
+        """
+        Returns the number of aliens destroyed by the player bolts
+
+        Each player bolt that hits a living alien, anywhere between where it was
+        before it last moved and where it is now, destroys the first alien along the
+        way and is removed.  The alien bolts pass through the aliens.
+
+        Parameter formation: the aliens to collide with
+        Precondition: formation is a Formation
+        """
+        if self._players == 0:
+            return 0
+
+        n = self._count
+        shooters = np.flatnonzero(self._player[:n])
+
+        spent = np.zeros(n, dtype=bool)
+        for index in shooters.tolist():
+            hit = formation.sweep(float(self._x[index]), float(self._prevy[index]),
+                                  float(self._y[index]), BOLT_WIDTH/2, BOLT_HEIGHT/2)
+            if not (hit is None):
+                formation.kill(hit[0], hit[1])
+                spent[index] = True
+
+        kills = int(spent.sum())
+        if kills:
+            self.remove(spent)
+        return kills
+
+
+    # METHODS TO SAVE AND RESTORE THE BOLTS
+    def getSnapshotSize(self):
+        """
+        Returns the number of bytes in a snapshot of the bolts as they are now
+        """
+        return 4 + 32*self._count
+
+
+    def snapshot(self):
+        """
+        Returns the state of the bolts packed into bytes
+
+        The bytes are, in order: the number of bolts n as a little-endian unsigned
+        int, then the n x coordinates, the n y coordinates, the n y coordinates before
+        the last move and the n velocities, each as little-endian doubles.  The owner
+        of each bolt is not stored, as it follows from the velocity.
+        """
+        n = self._count
+        return (struct.pack('<I', n) + self._x[:n].astype('<f8').tobytes() +
+                self._y[:n].astype('<f8').tobytes() +
+                self._prevy[:n].astype('<f8').tobytes() +
+                self._velocity[:n].astype('<f8').tobytes())
+
+
+    def restore(self, data, offset=0):
+        """
+        Sets the bolts to the state in a snapshot
+
+        Parameter data: the bytes holding the snapshot
+        Precondition: data is a bytes-like object
+
+        Parameter offset: where the snapshot starts in data
+        Precondition: offset is an int >= 0, and a value returned by snapshot starts
+        at that position in data
+        """
+        n = struct.unpack_from('<I', data, offset)[0]
+        if n > len(self._x):
+            self._count = 0
+            self._grow(n)
+
+        values = np.frombuffer(data, dtype='<f8', count=4*n, offset=offset+4)
+        self._x[:n] = values[:n]
+        self._y[:n] = values[n:2*n]
+        self._prevy[:n] = values[2*n:3*n]
+        self._velocity[:n] = values[3*n:]
+        self._player[:n] = self._velocity[:n] >= 0
+        self._count = n
+        self._players = int(np.count_nonzero(self._player[:n]))
+
+
+    # HELPER METHODS
+    def _grow(self, size):
+        """
+        Doubles the capacity of the arrays until they can hold size bolts
+
+        Parameter size: the number of bolts the arrays must hold
+        Precondition: size is an int > 0
+        """
+        capacity = len(self._x)
+        while capacity < size:
+            capacity *= 2
+
+        n = self._count
+        for name in ('_x', '_y', '_prevy', '_velocity', '_player'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:n] = old[:n]
+            setattr(self, name, new)
@@ -0,0 +1,753 @@
+"""
+Replay module for Alien Invaders
+
+This module records the keys a player holds down in every update of a game session,
+and plays a recording back without a window, as fast as the computer allows.  A
+replayed session makes the same waves and sees the same keys at the same updates as
+the recorded one, so it plays out exactly the same.  This is how to reproduce a bug
+that a player ran into, or time every update of their game, without playing it again
+by hand.
+
+Only the keys the game looks at are recorded (REPLAY_KEYS), along with the number of
+keys held down (GInput.key_count), which the game also uses.  Every
+REPLAY_KEYFRAME_TICKS updates, the recording also stores a keyframe, a snapshot of the
+whole session (see Session.snapshot).  A replay can jump to any update by restoring
+the last keyframe before it and playing only the updates in between.
+
+The file is:
+
+    the 4 bytes b'AIRP' and a version byte (4)
+    the length of an update in seconds, as a little-endian double
+    the seed of the session, as a varint
+    the settings of the game, as the varint size and size bytes of JSON: an object with
+    CONFIG_PROFILE and the value of every constant in CONFIG_KEYS
+    then any number of records, each either
+        a run: the varint n > 0 and the varint keys, meaning that the keys were held
+        down for the next n updates
+        a keyframe: the varint 0, the varint t, the varint size and size bytes of
+        snapshot, the state of the session after t updates
+    then, if the recording was closed properly, the index: the varint number of
+    updates, the varint number of keyframes, and for each keyframe the varint t and
+    the varint position of its record in the file, each minus those of the keyframe
+    before
+    and finally the position of the index, as a little-endian unsigned long long,
+    and the 4 bytes b'AIRX'
+
+where keys has bit i set if REPLAY_KEYS[i] is held down, plus key_count times 16.  A
+varint is an int >= 0 written 7 bits at a time, lowest first, with the top bit of each
+byte set if more bytes follow.  A run is only written when the keys change (or at a
+keyframe), so a game takes a few bytes per second of play, plus a few hundred bytes
+per keyframe.  A file without an index (because the game crashed) can still be read;
+it is just scanned for its keyframes first.
+
+Files are memory-mapped when they are loaded, so seeking in a long recording only
+reads the parts of the file it needs.  Version 1 files (with no keyframes or index)
+are read too, and so are version 2 files, but their keyframes are skipped, as they hold
+snapshots in an older format.  Files before version 4 have no settings, so they are
+played with the settings of the game as it is.
+
+A session only plays out the same with the same formation and speeds, so a replay
+fails if the settings of the recording are not those of the game.  To play back a game
+started with numbers or a profile, give replay.py the same numbers and profile.
+
+To play back a recording from the command line, type
+
+    python replay.py [ROWS [PERROW [SPEED]]] FILE [--seek=UPDATE] [--profile=NAME]
+
+which prints how the session ended and the slowest updates.  With --seek, it instead
+jumps to that update and prints the state of the session there.  The numbers ROWS,
+PERROW and SPEED and the option --profile (or --config) are read by consts.py, as for
+the game, and must be those the game was recorded with.  As consts.py reads the first
+three arguments as those numbers, an option among them must be written --name=value.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+from session import *
+import numpy as np
+import argparse
+import bisect
+import struct
+import json
+import mmap
+import time
+import sys
+
+# PRIMARY RULE: This module must never import game2d or Kivy.  The recorder only needs
+# an input with is_key_down and key_count, like GInput, and the player is headless.
+
+# the keys recorded, in the order of their bits
+REPLAY_KEYS = ('left', 'right', 'spacebar', 's')
+# the first bytes of a recording
+REPLAY_MAGIC = b'AIRP'
+# the last bytes of a recording with an index
+REPLAY_INDEX_MAGIC = b'AIRX'
+# the version of the file format written
+REPLAY_VERSION = 4
+# the number of updates between keyframes (10 seconds at 60 updates a second)
+REPLAY_KEYFRAME_TICKS = 600
+
+
+def getSettings():
+    """
+    Returns the settings of the game as it is now, which a recording must be played with
+
+    The settings are a dict with the name of the profile (CONFIG_PROFILE) and the value
+    of every constant in CONFIG_KEYS, after the profile and the numbers on the command
+    line are applied.
+    """
+    settings = {'CONFIG_PROFILE': CONFIG_PROFILE}
+    for name in CONFIG_KEYS:
+        settings[name] = globals()[name]
+    return settings
+
+
+class Recorder(object):
+    """
+    A class that records the keys held down in every update to a file.
+
+    The runs and keyframes are written to the file as soon as they are complete, so a
+    recording is mostly complete even if the game crashes.  Only the last run (the
+    keys held down since they last changed) and the index are written when the
+    recorder is closed.
+
+    INSTANCE ATTRIBUTES:
+        _file:   the file being written [binary file, or None once closed]
+        _offset: the number of bytes written to the file [int >= 0]
+        _every:  the number of updates between keyframes [int > 0, or None for none]
+        _keys:   the keys held down in the current run [int >= 0, packed as in the file]
+        _run:    the number of updates in the current run [int >= 0]
+        _ticks:  the number of updates recorded [int >= 0]
+        _index:  the update and file position of every keyframe written [list of (t,
+                 position) pairs of ints, in order]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getTickCount(self):
+        """
+        Returns the number of updates recorded so far
+        """
+        return self._ticks
+
+
+    # INITIALIZER TO START A RECORDING
+    def __init__(self, filename, seed, tick, every=REPLAY_KEYFRAME_TICKS):
+        """
+        Initializer: creates the file and writes its header
+
+        Parameter filename: the file to record to (it is replaced if it exists)
+        Precondition: filename is a str
+
+        Parameter seed: the seed of the session being recorded
+        Precondition: seed is an int >= 0
+
+        Parameter tick: the length of an update of the session, in seconds
+        Precondition: tick is an int or float > 0
+
+        Parameter every: the number of updates between keyframes, or None for none
+        Precondition: every is None or an int > 0
+        """
+        assert type(tick) in [int,float] and tick > 0, 'recording needs a fixed tick, not %s' % repr(tick)
+        self._file = open(filename, 'wb')
+        self._offset = 0
+        self._every = every
+        self._keys = 0
+        self._run = 0
+        self._ticks = 0
+        self._index = []
+        settings = json.dumps(getSettings(), sort_keys=True).encode('utf-8')
+        self._write(REPLAY_MAGIC+struct.pack('<Bd', REPLAY_VERSION, tick)+_encodeVarint(seed)+
+                    _encodeVarint(len(settings))+settings)
+
+
+    # PUBLIC METHODS
+    def record(self, input, session=None):
+        """
+        Records the keys held down in one update
+
+        If a keyframe is due, the state of the session before the update is recorded
+        first.
+
+        Parameter input: the user input, used to control the game
+        Precondition: input has a method is_key_down and an attribute key_count, like
+        GInput
+
+        Parameter session: the session being recorded, or None to skip keyframes
+        Precondition: session is None or has a method snapshot, like Session
+        """
+        if (not (session is None) and not (self._every is None) and self._ticks > 0
+            and self._ticks % self._every == 0):
+            self._endRun()
+            snapshot = session.snapshot()
+            self._index.append((self._ticks, self._offset))
+            self._write(_encodeVarint(0)+_encodeVarint(self._ticks)+
+                        _encodeVarint(len(snapshot))+snapshot)
+
+        keys = input.key_count << 4
+        for bit in range(len(REPLAY_KEYS)):
+            if input.is_key_down(REPLAY_KEYS[bit]):
+                keys |= 1 << bit
+
+        if keys != self._keys:
+            self._endRun()
+        self._keys = keys
+        self._run += 1
+        self._ticks += 1
+
+
+    def close(self):
+        """
+        Writes the last run and the index, and closes the file
+
+        Closing a recorder a second time does nothing.
+        """
+        if self._file is None:
+            return
+        self._endRun()
+
+        position = self._offset
+        index = _encodeVarint(self._ticks)+_encodeVarint(len(self._index))
+        last = (0, 0)
+        for entry in self._index:
+            index += _encodeVarint(entry[0]-last[0])+_encodeVarint(entry[1]-last[1])
+            last = entry
+        self._write(index+struct.pack('<Q', position)+REPLAY_INDEX_MAGIC)
+        self._file.close()
+        self._file = None
+
+
+    # HELPER METHODS
+    def _endRun(self):
+        """
+        Writes the current run, if it has any updates, and starts a new one
+        """
+        if self._run > 0:
+            self._write(_encodeVarint(self._run)+_encodeVarint(self._keys))
+            self._run = 0
+
+
+    def _write(self, data):
+        """
+        Writes data to the end of the file, and flushes it
+
+        Parameter data: the bytes to write
+        Precondition: data is a bytes object
+        """
+        self._file.write(data)
+        self._file.flush()
+        self._offset += len(data)
+
+
+class Recording(object):
+    """
+    A class representing a recording read back from a file.
+
+    INSTANCE ATTRIBUTES:
+        _data:   the contents of the file [bytes-like object, such as an mmap]
+        _file:   the open file that _data maps [binary file, or None]
+        _tick:   the length of an update, in seconds [float > 0]
+        _seed:   the seed of the recorded session [int >= 0]
+        _settings: the settings of the game that was recorded [dict from str to a
+                 value, as returned by getSettings, or None before version 4]
+        _start:  the position of the first record in _data [int > 0]
+        _end:    the position just after the last record in _data [int >= _start]
+        _ticks:  the number of updates recorded [int >= 0]
+        _frames: the update of every keyframe, in order [list of int > 0]
+        _places: the position of every keyframe in _data [list of int, the same length
+                 as _frames]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getTick(self):
+        """
+        Returns the length of an update, in seconds
+        """
+        return self._tick
+
+
+    def getSeed(self):
+        """
+        Returns the seed of the recorded session
+        """
+        return self._seed
+
+
+    def getSettings(self):
+        """
+        Returns the settings of the recorded game, or None if the file does not have them
+
+        The settings are a dict, as returned by the function getSettings.
+        """
+        return self._settings
+
+
+    def getTickCount(self):
+        """
+        Returns the number of updates recorded
+        """
+        return self._ticks
+
+
+    def getKeyframeCount(self):
+        """
+        Returns the number of keyframes in the recording
+        """
+        return len(self._frames)
+
+
+    # INITIALIZER TO READ A RECORDING
+    def __init__(self, data, file=None):
+        """
+        Initializer: reads a recording from the contents of a file
+
+        Only the header and the index are read.  If there is no index, the records are
+        scanned (but not played) to find the keyframes.
+
+        Parameter data: the contents of a file written by a Recorder
+        Precondition: data is a bytes-like object
+
+        Parameter file: the open file that data maps, to close with the recording
+        Precondition: file is None or a binary file
+        """
+        assert bytes(data[:4]) == REPLAY_MAGIC, 'not an Alien Invaders recording'
+        version, self._tick = struct.unpack_from('<Bd', data, 4)
+        assert version in (1, 2, 3, REPLAY_VERSION), \
+            'recording version %d is not supported' % version
+        self._seed, self._start = _decodeVarint(data, 13)
+        self._settings = None
+        if version >= 4:
+            size, pos = _decodeVarint(data, self._start)
+            self._settings = json.loads(bytes(data[pos:pos+size]).decode('utf-8'))
+            self._start = pos+size
+        self._data = data
+        self._file = file
+
+        if len(data) >= self._start+12 and bytes(data[-4:]) == REPLAY_INDEX_MAGIC:
+            self._end = struct.unpack_from('<Q', data, len(data)-12)[0]
+            self._readIndex()
+        else:
+            self._end = len(data)
+            self._scan()
+        if version < 3:
+            # The snapshots of older versions cannot be restored, so their keyframes
+            # are not used, and seeking plays from the start
+            self._frames = []
+            self._places = []
+
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Returns the recording in a file, memory-mapped
+
+        Parameter filename: the file written by a Recorder
+        Precondition: filename is a str
+        """
+        file = open(filename, 'rb')
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be mapped
+            data = file.read()
+        return cls(data, file)
+
+
+    # PUBLIC METHODS
+    def close(self):
+        """
+        Closes the file of this recording, if it was loaded from one
+        """
+        if not (self._file is None):
+            if isinstance(self._data, mmap.mmap):
+                self._data.close()
+            self._file.close()
+            self._file = None
+
+
+    def getKeyframe(self, tick):
+        """
+        Returns the last keyframe at or before an update, as the pair (t, snapshot)
+
+        The snapshot is the state of the session after t updates.  This returns None
+        if there is no such keyframe.
+
+        Parameter tick: the update to look before
+        Precondition: tick is an int >= 0
+        """
+        slot = bisect.bisect_right(self._frames, tick)-1
+        if slot < 0:
+            return None
+        pos = _decodeVarint(self._data, self._places[slot])[1]
+        frame, pos = _decodeVarint(self._data, pos)
+        size, pos = _decodeVarint(self._data, pos)
+        return (frame, bytes(self._data[pos:pos+size]))
+
+
+    def keys(self, start=0):
+        """
+        Yields the keys held down in each update from update start on, packed as in
+        the file
+
+        Reading starts at the last keyframe before start, so it does not go through
+        the whole file.
+
+        Parameter start: the first update to yield the keys of
+        Precondition: start is an int >= 0
+        """
+        slot = bisect.bisect_right(self._frames, start)-1
+        if slot < 0:
+            pos = self._start
+            tick = 0
+        else:
+            pos = self._places[slot]
+            tick = self._frames[slot]
+
+        data = self._data
+        while pos < self._end:
+            run, pos = _decodeVarint(data, pos)
+            if run == 0:
+                frame, pos = _decodeVarint(data, pos)
+                size, pos = _decodeVarint(data, pos)
+                pos += size
+            else:
+                keys, pos = _decodeVarint(data, pos)
+                skip = min(max(start-tick, 0), run)
+                for x in range(run-skip):
+                    yield keys
+                tick += run
+
+
+    # HELPER METHODS
+    def _readIndex(self):
+        """
+        Reads the index at the end of the file into _ticks, _frames and _places
+        """
+        self._ticks, pos = _decodeVarint(self._data, self._end)
+        count, pos = _decodeVarint(self._data, pos)
+        self._frames = []
+        self._places = []
+        frame = 0
+        place = 0
+        for x in range(count):
+            step, pos = _decodeVarint(self._data, pos)
+            jump, pos = _decodeVarint(self._data, pos)
+            frame += step
+            place += jump
+            self._frames.append(frame)
+            self._places.append(place)
+
+
+    def _scan(self):
+        """
+        Reads every record (but no keys) to fill _ticks, _frames and _places
+
+        This is for a file with no index.  A record cut short at the end of the file
+        (if the game crashed while writing it) is ignored.
+        """
+        self._ticks = 0
+        self._frames = []
+        self._places = []
+        data = self._data
+        pos = self._start
+        end = pos
+        try:
+            while pos < len(data):
+                run, pos = _decodeVarint(data, pos)
+                if run == 0:
+                    frame, pos = _decodeVarint(data, pos)
+                    size, pos = _decodeVarint(data, pos)
+                    if pos+size > len(data):
+                        break
+                    pos += size
+                    self._frames.append(frame)
+                    self._places.append(end)
+                else:
+                    keys, pos = _decodeVarint(data, pos)
+                    self._ticks += run
+                end = pos
+        except IndexError:
+            pass
+        self._end = end
+
+
+class ReplayInput(object):
+    """
+    A class that stands in for GInput when a recording is played back.
+
+    Only the keys in REPLAY_KEYS are ever held down.
+
+    INSTANCE ATTRIBUTES:
+        _keys: the keys held down, packed as in a recording [int >= 0]
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    @property
+    def key_count(self):
+        """
+        The number of keys held down, as recorded from GInput.key_count
+        """
+        return self._keys >> 4
+
+
+    def setKeys(self, keys):
+        """
+        Sets the keys held down
+
+        Parameter keys: the keys held down, packed as in a recording
+        Precondition: keys is an int >= 0
+        """
+        self._keys = keys
+
+
+    # INITIALIZER
+    def __init__(self):
+        """
+        Initializer: creates an input with no keys held down
+        """
+        self._keys = 0
+
+
+    # PUBLIC METHODS
+    def is_key_down(self, key):
+        """
+        Returns True if the key is held down, False otherwise
+
+        Parameter key: the name of the key, as for GInput
+        Precondition: key is a str
+        """
+        if key in REPLAY_KEYS:
+            return (self._keys >> REPLAY_KEYS.index(key)) & 1 == 1
+        return False
+
+
+class ReplaySession(Session):
+    """
+    A class that plays back a recorded session, headless.
+
+    Its messages are plain strings, and its waves are headless (see bodies.py), so it
+    never creates Kivy objects.
+
+    INSTANCE ATTRIBUTES:
+        input:      the stand-in for the user input [ReplayInput]
+        _recording: the recording being played [Recording]
+        _played:    the number of updates played so far [int >= 0]
+        _times:     the time each update played took, in seconds, in the order they
+                    were played, if timed [list of float, or None if not timed]
+
+    The attributes inherited from Session are listed there.
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getPlayedCount(self):
+        """
+        Returns the number of updates played so far
+        """
+        return self._played
+
+
+    def getTimes(self):
+        """
+        Returns the time each update took in seconds, or None if not timed
+        """
+        return self._times
+
+
+    def getMessage(self):
+        """
+        Returns the message shown to the player, or None if there is none
+        """
+        return self._text
+
+
+    # INITIALIZER
+    def __init__(self, recording, timed=False):
+        """
+        Initializer: creates a session at the start of a recording
+
+        Parameter recording: the recording to play
+        Precondition: recording is a Recording
+
+        Parameter timed: whether to time every update
+        Precondition: timed is a bool
+        """
+        recorded = recording.getSettings()
+        if not (recorded is None):
+            _checkSettings(recorded, getSettings())
+        self.input = ReplayInput()
+        self._recording = recording
+        self._played = 0
+        self._times = [] if timed else None
+        self._startSession(recording.getSeed())
+
+
+    # PUBLIC METHODS
+    def play(self, stop=None):
+        """
+        Plays the updates of the recording from where the session is, as fast as possible
+
+        Parameter stop: the number of updates to have played when done, or None to play
+        to the end of the recording
+        Precondition: stop is None or an int >= the number of updates played so far
+        """
+        if stop is None:
+            stop = self._recording.getTickCount()
+        tick = self._recording.getTick()
+        times = self._times
+        for keys in self._recording.keys(self._played):
+            if self._played >= stop:
+                break
+            self.input.setKeys(keys)
+            if times is None:
+                self.update(tick)
+            else:
+                start = time.perf_counter()
+                self.update(tick)
+                times.append(time.perf_counter()-start)
+            self._played += 1
+
+
+    def seek(self, tick):
+        """
+        Sets the session to where it was after a number of updates
+
+        The session jumps to the last keyframe at or before tick, unless it is already
+        between that keyframe and tick, and then plays the updates left.  So seeking
+        only plays at most REPLAY_KEYFRAME_TICKS updates, however long the recording.
+
+        Parameter tick: the number of updates to have played
+        Precondition: tick is an int, 0 <= tick <= the number of updates recorded
+        """
+        keyframe = self._recording.getKeyframe(tick)
+        if keyframe is None:
+            if tick < self._played:
+                self._startSession(self._recording.getSeed())
+                self._played = 0
+        elif tick < self._played or keyframe[0] > self._played:
+            self.restore(keyframe[1])
+            self._played = keyframe[0]
+        self.play(tick)
+
+
+    # HELPER METHODS FOR SESSION
+    def _makeMessage(self, text):
+        """
+        Returns the text of the message itself
+
+        Parameter text: the text of the message
+        Precondition: text is a str
+        """
+        return text
+
+
+    def _makeWave(self, seed):
+        """
+        Returns a new headless wave
+
+        Parameter seed: the seed of the wave
+        Precondition: seed is an int >= 0
+        """
+        return Wave(headless=True, seed=seed)
+
+
+# HELPER FUNCTIONS
+def _checkSettings(recorded, current):
+    """
+    Raises a ValueError naming every setting that differs between a recording and the game
+
+    Parameter recorded: the settings of the recording
+    Precondition: recorded is a dict, as returned by getSettings
+
+    Parameter current: the settings of the game
+    Precondition: current is a dict, as returned by getSettings
+    """
+    names = list(current)+[name for name in recorded if not (name in current)]
+    differ = [name for name in names if recorded.get(name) != current.get(name)]
+    if differ:
+        raise ValueError('the recording was made with %s, but the game has %s; give the '
+                         'numbers and --profile the game was played with' %
+                         (', '.join('%s = %r' % (name, recorded.get(name)) for name in differ),
+                          ', '.join('%s = %r' % (name, current.get(name)) for name in differ)))
+
+
+def _encodeVarint(value):
+    """
+    Returns the bytes of value as a varint
+
+    Parameter value: the value to encode
+    Precondition: value is an int >= 0
+    """
+    result = bytearray()
+    while value >= 0x80:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def _decodeVarint(data, pos):
+    """
+    Returns the pair (value, next) of the varint at position pos in data
+
+    next is the position just after the varint.
+
+    Parameter data: the bytes holding the varint
+    Precondition: data is a bytes-like object
+
+    Parameter pos: the position of the first byte of the varint
+    Precondition: pos is an int, a valid position in data
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return (value, pos)
+
+
+def _parseArguments():
+    """
+    Returns the options of the player, parsed from sys.argv
+    """
+    parser = argparse.ArgumentParser(description='Play back a recorded session of Alien Invaders.')
+    parser.add_argument('numbers', nargs='*', help='ROWS PERROW SPEED, as for the game')
+    parser.add_argument('file', help='the recording to play')
+    parser.add_argument('--seek', type=int, default=None)
+    parser.add_argument('--profile', default=None)
+    parser.add_argument('--config', default=None)
+
+    # consts.py has already read the first three arguments as numbers
+    for pos in range(2, min(len(sys.argv), 4)):
+        flag = sys.argv[pos-1]
+        if (flag.startswith('--') and not ('=' in flag) and
+            sys.argv[pos].replace('.', '', 1).isdigit()):
+            parser.error('write %s=VALUE among the first three arguments' % flag)
+    return parser.parse_args()
+
+
+# SCRIPT CODE
+if __name__ == '__main__':
+    args = _parseArguments()
+    recording = Recording.load(args.file)
+    session = ReplaySession(recording, timed=True)
+    start = time.perf_counter()
+    if not (args.seek is None):
+        session.seek(args.seek)
+    else:
+        session.play()
+    elapsed = time.perf_counter()-start
+
+    print('%d updates in %.3f seconds (%.0f updates per second)' %
+          (session.getPlayedCount(), elapsed, session.getPlayedCount()/max(elapsed, 1e-9)))
+    wave = session.getWave()
+    print('state %d, %d waves' % (session.getState(), session.getWaveCount()))
+    if not (wave is None):
+        print('lives %d, game over %s, won %s' % (wave.getLives(), wave.getGameOver(), wave.getWon()))
+    if args.seek is None:
+        times = np.array(session.getTimes())
+        for tick in np.argsort(times)[::-1][:5].tolist():
+            print('update %d took %.3f ms' % (tick, times[tick]*1000))
+    recording.close()
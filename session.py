@@ -0,0 +1,379 @@
+"""
+Session module for Alien Invaders
+
+This module contains the mixin Session, which holds the rules of a game session: the
+states that Invaders moves through (waiting to start, playing a wave, paused between
+lives, complete) and the waves it makes.  Invaders in app.py combines it with GameApp
+to play the game in a window.  The replay player (see replay.py) combines it with a
+stand-in input to play a recorded session headless, with no window, as fast as it can.
+
+Every wave of a session gets its seed from the seed of the session, so a session with
+the same seed and the same key presses always plays out the same.  The state of a
+session can also be packed into bytes and restored (see snapshot), which is how a
+replay jumps to the middle of a recording.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+from wave import *
+import numpy as np
+import struct
+import random
+import tracer
+
+# The fixed part of a snapshot of a session (see Session.snapshot): _state, _wavecount,
+# _lastkeys, whether there is a wave and whether there is a message, all little-endian
+_SESSION_HEADER = struct.Struct('<BIQBB')
+
+# The name of the span of the handler of each state, when tracing (see tracer.py)
+_STATE_SPANS = {STATE_INACTIVE: '_inactive', STATE_NEWWAVE: '_newwave',
+                STATE_ACTIVE: '_active', STATE_PAUSED: '_paused',
+                STATE_CONTINUE: '_continue', STATE_COMPLETE: '_complete'}
+
+# PRIMARY RULE: Session can only access attributes in wave.py via getters/setters.
+# Like wave.py, it must not import game2d; what is shown is left to the class using it.
+
+
+class Session(object):
+    """
+    A mixin with the rules for a game session of Alien Invaders.
+
+    The class using this mixin must provide the attribute input (like GInput) and the
+    methods _makeMessage and _makeWave, which decide how the messages and the waves are
+    made (drawn or headless).  It must call _startSession before the first update.
+
+    INSTANCE ATTRIBUTES:
+        _state: the current state of the game represented as a value from consts.py
+                [one of STATE_INACTIVE, STATE_NEWWAVE, STATE_ACTIVE, STATE_PAUSED, STATE_CONTINUE, STATE_COMPLETE]
+        _wave:  the subcontroller for a single wave, which manages the ships and aliens
+                [Wave, or None if there is no wave currently active]
+        _text:  the currently active message
+                [made by _makeMessage, or None if there is no message to display]
+        _lastkeys:  sum of the number of keys pressed in the previous frames
+                    [int >= 0]
+        _seed:  the seed of this session [int >= 0]
+        _wavecount: the number of waves made so far in this session [int >= 0]
+        _recorder: the recorder of the key presses of this session [Recorder, or None]
+
+    STATE SPECIFIC INVARIANTS:
+        Attribute _wave is only None if _state is STATE_INACTIVE.
+        Attribute _text is only None if _state is STATE_ACTIVE.
+    """
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getState(self):
+        """
+        Returns the current state of the game, a value from consts.py
+        """
+        return self._state
+
+
+    def getWave(self):
+        """
+        Returns the current wave, or None if there is no wave
+        """
+        return self._wave
+
+
+    def getSeed(self):
+        """
+        Returns the seed of this session
+        """
+        return self._seed
+
+
+    def getWaveCount(self):
+        """
+        Returns the number of waves made so far in this session
+        """
+        return self._wavecount
+
+
+    # METHODS TO START AND UPDATE THE SESSION
+    def _startSession(self, seed=None, recorder=None):
+        """
+        Sets the session to the start state, with no wave
+
+        Parameter seed: the seed of the session, or None to pick one at random
+        Precondition: seed is None or an int >= 0
+
+        Parameter recorder: the recorder to log every update to, or None
+        Precondition: recorder is None or a Recorder (see replay.py)
+        """
+        if seed is None:
+            seed = random.getrandbits(63)
+        self._seed = seed
+        self._wavecount = 0
+        self._recorder = recorder
+
+        self._state = STATE_INACTIVE
+        self._wave = None
+        self._text = self._makeMessage(self._messageText())
+        self._lastkeys = 0
+
+
+    # METHODS TO SAVE AND RESTORE THE SESSION
+    def snapshot(self):
+        """
+        Returns the state of this session packed into bytes
+
+        The bytes are the fixed part _SESSION_HEADER, then the snapshot of the wave if
+        there is one (see Wave.snapshot).  The seed of the session is not included; a
+        snapshot is only restored into a session with the same seed.
+        """
+        header = _SESSION_HEADER.pack(self._state, self._wavecount, self._lastkeys,
+                                      not (self._wave is None), not (self._text is None))
+        if self._wave is None:
+            return header
+        return header+self._wave.snapshot()
+
+
+    def restore(self, data):
+        """
+        Sets this session to the state in a snapshot
+
+        The current wave is reused if there is one, so that no sprites are made.  The
+        message is made again from the restored state.
+
+        Parameter data: the snapshot to restore
+        Precondition: data is a bytes-like object returned by the snapshot of a session
+        with the same seed
+        """
+        state, wavecount, lastkeys, haswave, hastext = _SESSION_HEADER.unpack_from(data, 0)
+        self._state = state
+        self._wavecount = wavecount
+        self._lastkeys = lastkeys
+        if haswave:
+            if self._wave is None:
+                self._wave = self._makeWave(0)
+            self._wave.restore(data[_SESSION_HEADER.size:])
+        else:
+            self._wave = None
+
+        if hastext:
+            self._text = self._makeMessage(self._messageText())
+        else:
+            self._text = None
+
+
+    def update(self,dt):
+        """
+        Animates a single frame in the game.
+
+        It is the method that does most of the work. It is NOT in charge of playing the
+        game.  That is the purpose of the class Wave. The primary purpose of this
+        game is to determine the current state, and -- if the game is active -- pass
+        the input to the Wave object _wave to play the game.
+
+        As part of the assignment, you are allowed to add your own states. However, at
+        a minimum you must support the following states: STATE_INACTIVE, STATE_NEWWAVE,
+        STATE_ACTIVE, STATE_PAUSED, STATE_CONTINUE, and STATE_COMPLETE.  Each one of these
+        does its own thing and might even needs its own helper.  We describe these below.
+
+        STATE_INACTIVE: This is the state when the application first opens.  It is a
+        paused state, waiting for the player to start the game.  It displays a simple
+        message on the screen. The application remains in this state so long as the
+        player never presses a key.  In addition, this is the state the application
+        returns to when the game is over (all lives are lost or all aliens are dead).
+
+        STATE_NEWWAVE: This is the state creates a new wave and shows it on the screen.
+        The application switches to this state if the state was STATE_INACTIVE in the
+        previous frame, and the player pressed a key. This state only lasts one animation
+        frame before switching to STATE_ACTIVE.
+
+        STATE_ACTIVE: This is a session of normal gameplay.  The player can move the
+        ship and fire laser bolts.  All of this should be handled inside of class Wave
+        (NOT in this class).  Hence the Wave class should have an update() method, just
+        like the subcontroller example in lecture.
+
+        STATE_PAUSED: Like STATE_INACTIVE, this is a paused state. However, the game is
+        still visible on the screen.
+
+        STATE_CONTINUE: This state restores the ship after it was destroyed. The
+        application switches to this state if the state was STATE_PAUSED in the
+        previous frame, and the player pressed a key. This state only lasts one animation
+        frame before switching to STATE_ACTIVE.
+
+        STATE_COMPLETE: The wave is over, and is either won or lost.
+
+        If the session has a recorder, the keys held down (and, now and then, the state
+        of the session) are logged to it first.  If tracing is on, the handler of the
+        state is recorded as a span, named after the handler.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if not (self._recorder is None):
+            self._recorder.record(self.input, self)
+
+        trace = tracer.TRACER
+        if trace:
+            span = _STATE_SPANS[self._state]
+            trace.begin(span)
+
+        # determine current state
+        if self._state == STATE_INACTIVE:
+            self._inactive()
+        elif self._state == STATE_NEWWAVE:
+            self._newwave()
+        elif self._state == STATE_ACTIVE:
+            self._active(dt)
+        elif self._state == STATE_CONTINUE:
+            self._continue(dt)
+        elif self._state == STATE_PAUSED:
+            self._paused()
+        elif self._state == STATE_COMPLETE:
+            self._complete()
+
+        if trace:
+            trace.end(span)
+
+
+    # HELPER METHODS FOR THE STATES GO HERE
+    def _inactive(self):
+        """
+        Detects key press to start game when state is inactive
+        """
+        self._determineKeyInput()
+
+
+    def _newwave(self):
+        """
+        Changes state from newwave to active, making newwave to last one frame
+        """
+        self._state = STATE_ACTIVE
+
+
+    def _active(self, dt):
+        """
+        Performs tasks needed to be done when state becomes active.
+
+        This methods calls the update method from Wave when there are still
+        lives available and the player ship is not destroyed. It changes the
+        state to paused if there is still lives available but the ship is
+        destroyed.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if self._wave.getLives() <= 0 or self._wave.getGameOver():
+            self._state = STATE_COMPLETE
+        elif self._wave.getLives() > 0 and not (self._wave.getShip() is None):
+            self._wave.update(self.input, dt)
+        elif self._wave.getShip() is None and self._wave.getLives() > 0:
+            self._state = STATE_PAUSED
+
+
+    def _paused(self):
+        """
+        Performs tasks needed to be done when state becomes paused.
+
+        This method creates a text message and displays it when the game
+        state becomes paused. It also resets the lastkeys count and calls the
+        key input mthod to determine if player initiated a key press to continue
+        game.
+        """
+        self._text = self._makeMessage(self._messageText())
+
+        self._lastkeys = 0
+        self._determineKeyInput()
+
+
+    def _continue(self, dt):
+        """
+        Performs tasks needed to be done when state becomes continue.
+
+        This methods changes the state from paused to active, which will ensure
+        continue only lasts for one animation frame. It then calls the update
+        method from Wave to that will create a new Ship().
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._state = STATE_ACTIVE
+        self._wave.update(self.input, dt)
+
+
+    def _complete(self):
+        """
+        Performs tasks needed to be done when state becomes complete.
+
+        If the player won, a congratulatory message is displayed. If the player lost,
+        an admonishing message is displayed.
+        """
+        self._text = self._makeMessage(self._messageText())
+
+
+    def _determineKeyInput(self):
+        """
+        Determines if a key was pressed in this frame and changes state accordingly.
+
+        This method checks for a key press of 'S' and if there is one, changes the
+        game state accordingly. A key press is when a key is pressed for
+        the first time. The state does not continue to change as the key is held
+        down.
+
+        This method is written using the guidance of state.py source code form class.
+        """
+        current_keys = self.input.key_count
+        change = current_keys > 0 and self._lastkeys == 0 and self.input.is_key_down('s')
+
+        if change and self._state == STATE_INACTIVE:
+            # there was a click, so change state to start new game
+            self._state = STATE_NEWWAVE
+            self._text = None
+            self._wave = self._makeWave(self._nextWaveSeed())
+        elif change and self._state == STATE_PAUSED:
+            self._state = STATE_CONTINUE
+            self._text = None
+        if self.input.is_key_down('s'):
+            self._lastkeys += current_keys #update last_keys
+
+
+    def _messageText(self):
+        """
+        Returns the text of the message to show in the current state
+
+        Precondition: the state is STATE_INACTIVE, STATE_PAUSED or STATE_COMPLETE
+        """
+        if self._state == STATE_PAUSED:
+            return "You lost a live.\n\nPress 'S' to continue."
+        elif self._state == STATE_COMPLETE and self._wave.getWon() == True:
+            return "Congratulations!\nYou have won!"
+        elif self._state == STATE_COMPLETE:
+            return "Too bad!\n\nYou have failed to\nstop the invaders!"
+        return "Press 'S' to Play\n\n'SPACEBAR' to fire"
+
+
+    def _nextWaveSeed(self):
+        """
+        Returns the seed of the next wave of this session
+
+        The seed only depends on the seed of the session and on how many waves came
+        before, so a replayed session makes the same waves.
+        """
+        self._wavecount += 1
+        words = np.random.SeedSequence([self._seed, self._wavecount]).generate_state(2)
+        return (int(words[0]) << 31) ^ int(words[1])
+
+
+    # METHODS FOR THE CLASS USING THIS MIXIN
+    def _makeMessage(self, text):
+        """
+        Returns a message to show the player
+
+        Parameter text: the text of the message
+        Precondition: text is a str
+        """
+        raise NotImplementedError('the class using Session must define _makeMessage')
+
+
+    def _makeWave(self, seed):
+        """
+        Returns a new wave for this session
+
+        Parameter seed: the seed of the wave
+        Precondition: seed is an int >= 0
+        """
+        raise NotImplementedError('the class using Session must define _makeWave')
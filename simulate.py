@@ -0,0 +1,413 @@
+"""
+Simulator script for Alien Invaders
+
+This script plays many seeded waves of Alien Invaders headless, with a bot (a policy)
+pressing the keys, and reports how the waves went: how often the player won, how long
+the waves lasted and how many lives were lost.  It is for tuning the constants of
+consts.py (such as ALIEN_SPEED, BOLT_RATE and SHIP_MOVEMENT) from statistics over many
+thousands of games, so the games are spread over every core with a multiprocessing
+pool.
+
+Run it next to __main__.py, as
+
+    python simulate.py [ROWS [PERROW [SPEED]]] [options]
+
+The numbers ROWS, PERROW and SPEED change the wave exactly as for the game (consts.py
+reads them).  As consts.py reads the first three arguments as those numbers, the options
+must come after them, and an option with a number among the first three arguments must
+be in the form --name=value.  The options are:
+
+    --games=N          the number of games to play (default 1000)
+    --seed=S           the seed of the first game; game i has seed S+i (default 0)
+    --policy=NAME      the policy to play with: idle, random, hunter (the default), or
+                       module:function for a function in another module
+    --processes=P      the number of processes (default: one per core)
+    --repeat=R         the number of updates to hold each action for (default 1)
+    --limit=L          the most actions in a game (default: no limit)
+    --alien-speed=X    play with ALIEN_SPEED = X
+    --bolt-rate=X      play with BOLT_RATE = X
+    --ship-movement=X  play with SHIP_MOVEMENT = X
+    --json             print the report as one JSON object
+    --metrics=FILE     append the counters of the hot paths (see metrics.py) of every
+                       process to FILE as a line of JSON every few seconds
+    --metrics-port=P   serve the counters at http://127.0.0.1:P/metrics
+    --metrics-interval=S  the seconds between two lines of --metrics (default 10)
+    --profile=NAME     play with a profile of invaders.ini (see consts.py)
+    --config=FILE      read the profiles from FILE instead of invaders.ini
+
+A policy is a function policy(obs, last, rng) that returns the action to play (see
+env.py) from the observation obs of WaveEnv, the action last played (0 at the start)
+and a NumPy random generator rng, seeded from the seed of the game.  As the same seed
+and the same policy always play the same game, any game of a report can be played
+again by itself.
+
+With --metrics or --metrics-port, each process counts into a Metrics of its own, and
+sends what it counted with the results of every chunk of games; the counters served or
+written are the sum over the processes.  A frame of a simulator is one action.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+from env import *
+import consts
+import bodies
+import wave
+import env
+import metrics
+import numpy as np
+import multiprocessing
+import importlib
+import argparse
+import json
+import time
+import sys
+import os
+
+# PRIMARY RULE: the simulator only plays waves through WaveEnv (see env.py).  It must
+# never import game2d or Kivy.
+
+# the constants that the options of the simulator can change
+SIMULATE_TUNABLE = ('ALIEN_SPEED', 'BOLT_RATE', 'SHIP_MOVEMENT')
+# the number of games each process plays at a time
+SIMULATE_CHUNK = 16
+# the distance from the ship under which the hunter dodges an alien bolt
+HUNTER_DODGE = 150
+
+
+# THE BUILT-IN POLICIES
+def idlePolicy(obs, last, rng):
+    """
+    Returns 0: this policy never presses a key
+
+    Parameter obs: the observation of the wave
+    Precondition: obs is an observation of WaveEnv
+
+    Parameter last: the action played last
+    Precondition: last is an int, 0 <= last < ACTION_COUNT
+
+    Parameter rng: the random generator of the game
+    Precondition: rng is a numpy Generator
+    """
+    return 0
+
+
+def randomPolicy(obs, last, rng):
+    """
+    Returns a random action
+
+    Parameter obs: the observation of the wave
+    Precondition: obs is an observation of WaveEnv
+
+    Parameter last: the action played last
+    Precondition: last is an int, 0 <= last < ACTION_COUNT
+
+    Parameter rng: the random generator of the game
+    Precondition: rng is a numpy Generator
+    """
+    return int(rng.integers(0, ACTION_COUNT))
+
+
+def hunterPolicy(obs, last, rng):
+    """
+    Returns the action of a simple bot that dodges bolts and shoots the nearest column
+
+    The bot moves away from any alien bolt coming down on the ship.  Otherwise it moves
+    under the nearest column with a living alien and fires.  As the ship only fires
+    when the spacebar is pressed after an update with no keys down, it lets go of every
+    key before it fires.
+
+    Parameter obs: the observation of the wave
+    Precondition: obs is an observation of WaveEnv
+
+    Parameter last: the action played last
+    Precondition: last is an int, 0 <= last < ACTION_COUNT
+
+    Parameter rng: the random generator of the game
+    Precondition: rng is a numpy Generator
+    """
+    shipx = obs[0]*GAME_WIDTH
+    near = obs[6:6+3*ENV_NEAREST_BOLTS].reshape(ENV_NEAREST_BOLTS, 3)
+    for dx, dy, present in near.tolist():
+        if present and abs(dx*GAME_WIDTH) < SHIP_WIDTH and dy*GAME_HEIGHT < HUNTER_DODGE:
+            if (dx > 0 or shipx >= GAME_WIDTH-SHIP_WIDTH) and shipx > SHIP_WIDTH:
+                return ACTION_LEFT
+            return ACTION_RIGHT
+
+    alive = obs[6+3*ENV_NEAREST_BOLTS:].reshape(ALIEN_ROWS, ALIENS_IN_ROW).any(axis=0)
+    if not alive.any():
+        return 0
+    xs = obs[2]*GAME_WIDTH + np.flatnonzero(alive)*(ALIEN_WIDTH+ALIEN_H_SEP)
+    target = xs[np.argmin(np.abs(xs-shipx))]
+    if target < shipx-ALIEN_WIDTH/4:
+        return ACTION_LEFT
+    elif target > shipx+ALIEN_WIDTH/4:
+        return ACTION_RIGHT
+    elif obs[5] == 0 and last == 0:
+        return ACTION_FIRE
+    return 0
+
+
+# the policies that can be named with --policy
+SIMULATE_POLICIES = {'idle': idlePolicy, 'random': randomPolicy, 'hunter': hunterPolicy}
+
+
+class Simulator(object):
+    """
+    A class that plays seeded games with a policy, in one process of the pool.
+
+    INSTANCE ATTRIBUTES:
+        _env:    the environment the games are played in [WaveEnv]
+        _policy: the policy that plays the games [function, see the module docstring]
+        _repeat: the number of updates in each action [int > 0]
+    """
+
+    # INITIALIZER
+    def __init__(self, policy, repeat=1, limit=None):
+        """
+        Initializer: creates a simulator for the given policy
+
+        Parameter policy: the policy that plays the games
+        Precondition: policy is a function, see the module docstring
+
+        Parameter repeat: the number of updates to hold each action for
+        Precondition: repeat is an int > 0
+
+        Parameter limit: the most actions in a game, or None for no limit
+        Precondition: limit is None or an int > 0
+        """
+        self._env = WaveEnv(difficulty=DIFFICULTY_CLASSIC, repeat=repeat, limit=limit)
+        self._policy = policy
+        self._repeat = repeat
+
+
+    # PUBLIC METHODS
+    def play(self, seed):
+        """
+        Returns the tuple (seed, won, updates, lives lost, aliens left) of a new game
+
+        The number of updates is the number of actions times the updates in each
+        action, so it may count a few updates too many at the end of a game.
+
+        Parameter seed: the seed of the game
+        Precondition: seed is an int >= 0
+        """
+        rng = np.random.default_rng(seed)
+        obs = self._env.reset(seed)
+        action = 0
+        done = False
+        counters = metrics.COUNTERS
+        while not done:
+            if counters: counters.frame()
+            action = int(self._policy(obs, action, rng))
+            obs, reward, done, info = self._env.step(action)
+        return (seed, info['won'], info['steps']*self._repeat,
+                SHIP_LIVES-info['lives'], info['aliens'])
+
+
+# the simulator of a process of the pool [Simulator, or None before the pool starts]
+_simulator = None
+
+
+# HELPER FUNCTIONS FOR THE POOL
+def _startWorker(name, overrides, repeat, limit, counting=False):
+    """
+    Sets up a process of the pool: changes the constants and makes its simulator
+
+    The modules took their own copies of the constants when they imported consts.py,
+    so each constant is changed in every module that uses it.
+
+    Parameter name: the name of the policy
+    Precondition: name is a str accepted by _loadPolicy
+
+    Parameter overrides: the new values of the constants to change
+    Precondition: overrides is a dict from names in SIMULATE_TUNABLE to numbers
+
+    Parameter repeat: the number of updates to hold each action for
+    Precondition: repeat is an int > 0
+
+    Parameter limit: the most actions in a game, or None for no limit
+    Precondition: limit is None or an int > 0
+
+    Parameter counting: whether to count the hot paths (see metrics.py)
+    Precondition: counting is a bool
+    """
+    global _simulator
+    for key, value in overrides.items():
+        for module in (consts, bodies, wave, env):
+            if hasattr(module, key):
+                setattr(module, key, value)
+    _simulator = Simulator(_loadPolicy(name), repeat, limit)
+    if counting:
+        metrics.enable(metrics.Metrics())
+
+
+def _playGames(seeds):
+    """
+    Returns the pair (results, counted) of playing a game for each seed
+
+    The results are the list of the results of Simulator.play for each seed.  If the
+    process counts the hot paths, counted is what it counted in these games (see
+    Metrics.drain), and otherwise it is None.
+
+    Parameter seeds: the seeds of the games to play
+    Precondition: seeds is a list of ints >= 0
+    """
+    results = [_simulator.play(seed) for seed in seeds]
+    counted = None
+    if metrics.COUNTERS:
+        counted = metrics.COUNTERS.drain()
+    return (results, counted)
+
+
+def _loadPolicy(name):
+    """
+    Returns the policy with the given name
+
+    Parameter name: a key of SIMULATE_POLICIES, or module:function
+    Precondition: name is a str
+    """
+    if name in SIMULATE_POLICIES:
+        return SIMULATE_POLICIES[name]
+    module, sep, function = name.partition(':')
+    if not sep:
+        raise ValueError('unknown policy %r' % name)
+    return getattr(importlib.import_module(module), function)
+
+
+def _report(results, elapsed):
+    """
+    Returns the report of the games as a dict
+
+    The durations are in seconds of game time (updates of GAME_TICK seconds).
+
+    Parameter results: the results of the games
+    Precondition: results is a nonempty list of tuples returned by Simulator.play
+
+    Parameter elapsed: the time taken to play the games, in seconds
+    Precondition: elapsed is a float > 0
+    """
+    won = np.array([result[1] for result in results], dtype=bool)
+    seconds = np.array([result[2] for result in results])*GAME_TICK
+    lost = np.array([result[3] for result in results])
+    left = np.array([result[4] for result in results])
+
+    n = len(results)
+    rate = won.mean()
+    report = {'games': n, 'won': int(won.sum()), 'win_rate': float(rate),
+              'win_rate_error': float(1.96*np.sqrt(rate*(1-rate)/n)),
+              'lives_lost': float(lost.mean()),
+              'lives_lost_counts': np.bincount(lost, minlength=SHIP_LIVES+1).tolist(),
+              'aliens_left': float(left.mean()),
+              'elapsed': elapsed, 'games_per_second': n/elapsed,
+              'updates_per_second': float(seconds.sum()/GAME_TICK/elapsed)}
+    for key, mask in (('duration', np.ones(n, dtype=bool)), ('duration_won', won),
+                      ('duration_lost', ~won)):
+        if mask.any():
+            report[key] = {'mean': float(seconds[mask].mean()),
+                           'p50': float(np.percentile(seconds[mask], 50)),
+                           'p90': float(np.percentile(seconds[mask], 90)),
+                           'max': float(seconds[mask].max())}
+    return report
+
+
+def _printReport(report, options):
+    """
+    Prints the report of the games, one statistic per line
+
+    Parameter report: the report of the games
+    Precondition: report is a dict returned by _report
+
+    Parameter options: the options of the simulator
+    Precondition: options is a dict of the options, with the values of the constants
+    """
+    print(' '.join('%s=%s' % (key, options[key]) for key in sorted(options)))
+    print('%d games in %.1f seconds (%.0f games, %.0f updates per second)' %
+          (report['games'], report['elapsed'], report['games_per_second'],
+           report['updates_per_second']))
+    print('won %d (%.1f%% +/- %.1f%%)' % (report['won'], 100*report['win_rate'],
+                                         100*report['win_rate_error']))
+    print('lives lost %.2f on average, games by lives lost %s' %
+          (report['lives_lost'], report['lives_lost_counts']))
+    print('aliens left %.1f on average' % report['aliens_left'])
+    for key in ('duration', 'duration_won', 'duration_lost'):
+        if key in report:
+            stats = report[key]
+            print('%-13s mean %6.1fs  p50 %6.1fs  p90 %6.1fs  max %6.1fs' %
+                  (key, stats['mean'], stats['p50'], stats['p90'], stats['max']))
+
+
+def _parseArguments():
+    """
+    Returns the options of the simulator, parsed from sys.argv
+    """
+    parser = argparse.ArgumentParser(description='Play many seeded waves of Alien Invaders headless.')
+    parser.add_argument('numbers', nargs='*', help='ROWS PERROW SPEED, as for the game')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', default='hunter')
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--limit', type=int, default=None)
+    parser.add_argument('--alien-speed', type=float, default=None)
+    parser.add_argument('--bolt-rate', type=int, default=None)
+    parser.add_argument('--ship-movement', type=int, default=None)
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--metrics', default=None)
+    parser.add_argument('--metrics-port', type=int, default=None)
+    parser.add_argument('--metrics-interval', type=float, default=METRICS_INTERVAL)
+    parser.add_argument('--profile', default=None)
+    parser.add_argument('--config', default=None)
+
+    # consts.py has already read the first three arguments as numbers
+    for pos in range(2, min(len(sys.argv), 4)):
+        flag = sys.argv[pos-1]
+        if (flag.startswith('--') and not ('=' in flag) and flag != '--json' and
+            sys.argv[pos].replace('.', '', 1).isdigit()):
+            parser.error('write %s=VALUE among the first three arguments' % flag)
+    return parser.parse_args()
+
+
+# Application code
+if __name__ == '__main__':
+    args = _parseArguments()
+    overrides = {}
+    for key, value in (('ALIEN_SPEED', args.alien_speed), ('BOLT_RATE', args.bolt_rate),
+                       ('SHIP_MOVEMENT', args.ship_movement)):
+        if not (value is None):
+            overrides[key] = value
+    _loadPolicy(args.policy)
+
+    seeds = list(range(args.seed, args.seed+args.games))
+    chunks = [seeds[pos:pos+SIMULATE_CHUNK] for pos in range(0, len(seeds), SIMULATE_CHUNK)]
+    counters = None
+    exports = []
+    if not (args.metrics is None and args.metrics_port is None):
+        counters = metrics.Metrics()
+        if not (args.metrics is None):
+            exports.append(metrics.MetricsWriter(counters, args.metrics, args.metrics_interval))
+        if not (args.metrics_port is None):
+            exports.append(metrics.MetricsServer(counters, args.metrics_port))
+
+    start = time.perf_counter()
+    initargs = (args.policy, overrides, args.repeat, args.limit, not (counters is None))
+    with multiprocessing.Pool(args.processes, initializer=_startWorker,
+                              initargs=initargs) as pool:
+        results = []
+        for part, counted in pool.imap_unordered(_playGames, chunks):
+            results.extend(part)
+            if not (counted is None):
+                counters.merge(*counted)
+    report = _report(results, time.perf_counter()-start)
+    for export in exports:
+        export.close()
+
+    options = {'policy': args.policy, 'seed': args.seed, 'ALIEN_ROWS': ALIEN_ROWS,
+               'ALIENS_IN_ROW': ALIENS_IN_ROW}
+    for key in SIMULATE_TUNABLE:
+        options[key] = overrides.get(key, getattr(consts, key))
+    if args.json:
+        report['options'] = options
+        print(json.dumps(report))
+    else:
+        _printReport(report, options)
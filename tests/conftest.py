@@ -0,0 +1,16 @@
+"""
+Settings shared by the tests of Alien Invaders
+
+The tests only play headless waves and sessions, so they never need Kivy.  consts.py
+reads the numbers and options on the command line when it is imported, so the arguments
+given to pytest are cleared first, and the game modules (which are not a package) are
+imported from the folder above this one.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+import os
+import sys
+
+sys.argv = sys.argv[:1]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
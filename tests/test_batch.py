@@ -0,0 +1,62 @@
+"""
+Tests of WaveBatch (batch.py)
+
+Game i of a batch made with seed S must play out exactly like a headless Wave made with
+seed S+i and given the same actions.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+from wave import Wave
+from batch import WaveBatch
+from env import ActionInput, ACTION_COUNT
+import numpy as np
+import pytest
+
+# the number of updates played
+TICKS = 4000
+
+
+@pytest.mark.parametrize('seed', [0, 500])
+def test_batch_plays_like_waves(seed):
+    """
+    Tests that every game of a batch plays out like a Wave, update by update
+    """
+    count = 8
+    batch = WaveBatch(count, seed=seed)
+    waves = [Wave(headless=True, seed=seed+game) for game in range(count)]
+    inputs = [ActionInput() for game in range(count)]
+    rng = np.random.default_rng(seed)
+    actions = np.zeros(count, dtype=int)
+
+    for tick in range(TICKS):
+        if tick % 7 == 0:
+            actions = rng.integers(0, ACTION_COUNT, count)
+        for game in range(count):
+            wave = waves[game]
+            if not (wave.getGameOver() or wave.getLives() <= 0):
+                inputs[game].setAction(int(actions[game]))
+                wave.update(inputs[game], GAME_TICK)
+        batch.update(actions)
+
+        for game in range(count):
+            wave = waves[game]
+            assert batch.getLives()[game] == wave.getLives()
+            assert batch.getGameOver()[game] == wave.getGameOver()
+            assert batch.getWon()[game] == wave.getWon()
+            assert (batch.getAlive()[game] == wave.getAliens().getAlive()).all()
+            if not (wave.getShip() is None):
+                assert batch.getShipX()[game] == wave.getShip().x
+    assert batch.getDone().any() and batch.getLives().min() < SHIP_LIVES
+
+
+def test_seed_range():
+    """
+    Tests that a batch takes the seeds a Wave takes, and no other
+    """
+    WaveBatch(3, seed=2**64-3)
+    with pytest.raises(AssertionError):
+        WaveBatch(3, seed=2**64-2)
+    with pytest.raises(AssertionError):
+        WaveBatch(3, seed=-1)
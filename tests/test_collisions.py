@@ -0,0 +1,69 @@
+"""
+Tests of the swept collisions of Formation.sweep and ProjectileSystem.collideBox
+
+Each swept test is checked by brute force: the box is moved along its path in small
+steps, and tested where it stands at each one.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+from formation import Formation
+from projectiles import ProjectileSystem
+import random
+
+# the number of places along a path that the brute force tests
+STEPS = 400
+
+
+def test_sweep_matches_brute_force():
+    """
+    Tests that Formation.sweep finds the same alien as moving the bolt in small steps
+    """
+    rng = random.Random(3)
+    rows = 5
+    cols = 11
+    hits = 0
+    for trial in range(500):
+        formation = Formation(rows, cols)
+        for kill in range(rng.randint(0, 40)):
+            formation.kill(rng.randrange(rows), rng.randrange(cols))
+        x = rng.uniform(0, GAME_WIDTH)
+        y0 = rng.uniform(300, GAME_HEIGHT)
+        y1 = y0+rng.uniform(-200, 200)
+
+        expected = None
+        for step in range(STEPS+1):
+            y = y0+(y1-y0)*step/STEPS
+            expected = formation.hit(x, y, BOLT_WIDTH/2, BOLT_HEIGHT/2)
+            if not (expected is None):
+                break
+        assert formation.sweep(x, y0, y1, BOLT_WIDTH/2, BOLT_HEIGHT/2) == expected
+        hits += not (expected is None)
+    assert hits > 0
+
+
+def test_collide_box_matches_brute_force():
+    """
+    Tests that ProjectileSystem.collideBox finds a bolt that crossed the box on its way
+    """
+    rng = random.Random(4)
+    hits = 0
+    for trial in range(500):
+        x = rng.uniform(0, 100)
+        y = rng.uniform(-100, 200)
+        speed = rng.uniform(0, 150)
+        bolts = ProjectileSystem()
+        bolts.spawn(x, y, -speed)
+        bolts.move()
+
+        expected = False
+        for step in range(STEPS+1):
+            still = ProjectileSystem()
+            still.spawn(x, y-speed*step/STEPS, -1)
+            if still.collideBox(50, 50, SHIP_WIDTH, SHIP_HEIGHT, False):
+                expected = True
+                break
+        assert bolts.collideBox(50, 50, SHIP_WIDTH, SHIP_HEIGHT, False) == expected
+        hits += expected
+    assert hits > 0
@@ -0,0 +1,81 @@
+"""
+Tests of the profiles read from invaders.ini (consts.py)
+
+consts.py reads its profile when it is imported, so each test imports it in a new
+Python, with the command line to test.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+import os
+import subprocess
+import sys
+
+# the folder of the game modules
+FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(tmp_path, profile, code, args=()):
+    """
+    Returns the finished process that ran code after importing consts with a profile
+
+    The command line is args, then the option --config with the file of the profile.
+
+    Parameter tmp_path: the folder to write the config file to
+    Precondition: tmp_path is a pathlib.Path
+
+    Parameter profile: the lines of the profile section [test]
+    Precondition: profile is a str
+
+    Parameter code: the Python code to run after the import
+    Precondition: code is a str
+
+    Parameter args: the arguments before --config, such as the numbers
+    Precondition: args is a sequence of str
+    """
+    config = tmp_path / 'test.ini'
+    config.write_text('[invaders]\nprofile = test\n\n[test]\n'+profile)
+    path = os.pathsep.join([FOLDER]+sys.path)
+    return subprocess.run([sys.executable, '-c', 'from consts import *\n'+code]+list(args)+
+                          ['--config', str(config)],
+                          capture_output=True, text=True, cwd=FOLDER,
+                          env=dict(os.environ, PYTHONPATH=path))
+
+
+def test_profile_sets_constants(tmp_path):
+    """
+    Tests that a profile sets constants with the types they have
+    """
+    result = run(tmp_path, 'ALIEN_ROWS = 7\nALIEN_SPEED = 2 ; an int sets a float\n',
+                 'print(repr(ALIEN_ROWS), repr(ALIEN_SPEED))')
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['7', '2.0']
+
+
+def test_profile_reports_bad_value(tmp_path):
+    """
+    Tests that a value of the wrong type names the constant and the profile
+    """
+    for line in ('ALIEN_ROWS = 2.0\n', 'ALIEN_ROWS = many\n', 'ALIEN_SPEED = fast\n'):
+        result = run(tmp_path, line, '')
+        assert result.returncode != 0
+        message = result.stderr.strip().splitlines()[-1]
+        assert message.startswith('ValueError: '+line.split()[0]+' = '), message
+        assert 'profile [test]' in message and 'test.ini' in message, message
+
+
+def test_command_line_wins_over_profile(tmp_path):
+    """
+    Tests that the numbers on the command line win over the profile, even when they
+    are the same as the numbers in consts.py
+    """
+    profile = 'ALIEN_ROWS = 7\nALIENS_IN_ROW = 9\nALIEN_SPEED = 2.0\n'
+    code = 'print(ALIEN_ROWS, ALIENS_IN_ROW, ALIEN_SPEED)'
+    cases = [((), '7 9 2.0'), (('6',), '6 9 2.0'), (('5', '12', '1.0'), '5 12 1.0'),
+             (('5', '12', '--profile=stress'), '5 12 0.25'),
+             (('6', '13', '--profile=stress'), '6 13 0.25'),
+             (('99', '12'), '7 12 2.0')]
+    for args, expected in cases:
+        result = run(tmp_path, profile, code, args)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == expected, args
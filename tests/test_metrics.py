@@ -0,0 +1,53 @@
+"""
+Tests of the counters and frame times of metrics.py
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from metrics import Metrics
+import numpy as np
+import threading
+
+
+def test_frame_times_oldest_first():
+    """
+    Tests that the ring buffer keeps the last frames, oldest first
+    """
+    counters = Metrics(frames=4)
+    counters.merge({'frames': 3}, [1.0, 2.0, 3.0])
+    assert counters.getFrameTimes().tolist() == [1.0, 2.0, 3.0]
+    counters.merge({'frames': 3}, [4.0, 5.0, 6.0])
+    assert counters.getFrameTimes().tolist() == [3.0, 4.0, 5.0, 6.0]
+    counts, times = counters.drain()
+    assert counts == {'frames': 6}
+    assert times.tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert counters.getCounts() == {}
+    assert len(counters.getFrameTimes()) == 0
+
+
+def test_frame_times_read_from_another_thread():
+    """
+    Tests that a thread reading the frame times always sees the frames in order
+
+    The game thread keeps the times 1, 2, 3, ... so any copy taken while it does must
+    be a run of numbers that each grow by 1.
+    """
+    counters = Metrics(frames=64)
+    done = threading.Event()
+
+    def game():
+        value = 1.0
+        while not done.is_set():
+            for step in range(1000):
+                counters.merge({}, (value,))
+                value += 1
+
+    thread = threading.Thread(target=game)
+    thread.start()
+    try:
+        for read in range(20000):
+            times = counters.getFrameTimes()
+            assert (np.diff(times) == 1).all(), times
+    finally:
+        done.set()
+        thread.join()
@@ -0,0 +1,317 @@
+"""
+Tests of the recording and replay of game sessions (replay.py)
+
+A session is played headless with random keys and recorded.  Playing back the
+recording must give a session that is the same as the recorded one, down to the last
+bit of its snapshot.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+from replay import *
+from replay import _decodeVarint
+import subprocess
+import struct
+import random
+import pytest
+import os
+import sys
+
+# the number of updates recorded
+TICKS = 5000
+
+
+class KeyInput(object):
+    """
+    A stand-in for GInput that holds down the keys it is given
+
+    INSTANCE ATTRIBUTES:
+        keys:  the keys held down [set of str]
+        extra: the number of keys held down that the game does not look at [int >= 0]
+    """
+
+    @property
+    def key_count(self):
+        """
+        The number of keys held down
+        """
+        return len(self.keys)+self.extra
+
+    def __init__(self):
+        """
+        Initializer: creates an input with no keys held down
+        """
+        self.keys = set()
+        self.extra = 0
+
+    def is_key_down(self, key):
+        """
+        Returns True if the key is held down
+
+        Parameter key: the key to test
+        Precondition: key is a str
+        """
+        return key in self.keys
+
+
+class LiveSession(Session):
+    """
+    A headless session played with a KeyInput, as GameApp plays one with a GInput
+    """
+
+    def __init__(self, seed, recorder):
+        """
+        Initializer: creates a session that records every update
+
+        Parameter seed: the seed of the session
+        Precondition: seed is an int >= 0
+
+        Parameter recorder: the recorder of the session
+        Precondition: recorder is a Recorder
+        """
+        self.input = KeyInput()
+        self._startSession(seed, recorder)
+
+    def _makeMessage(self, text):
+        """
+        Returns the text of the message itself
+        """
+        return text
+
+    def _makeWave(self, seed):
+        """
+        Returns a new headless wave
+        """
+        return Wave(headless=True, seed=seed)
+
+
+def record(filename, seed, ticks, every=REPLAY_KEYFRAME_TICKS, watch=()):
+    """
+    Returns the pair (session, snapshots) of a session played with random keys
+
+    The keys change now and then, and are held down in between, so the player starts
+    games, moves, fires and pauses.  The snapshots are a dictionary from each update
+    in watch to the snapshot of the session after that many updates.
+
+    Parameter filename: the file to record to
+    Precondition: filename is a str
+
+    Parameter seed: the seed of the session, and of the random keys
+    Precondition: seed is an int >= 0
+
+    Parameter ticks: the number of updates to play
+    Precondition: ticks is an int >= 0
+
+    Parameter every: the number of updates between keyframes
+    Precondition: every is an int > 0
+
+    Parameter watch: the updates to take a snapshot after
+    Precondition: watch is a collection of ints, 0 <= tick <= ticks
+    """
+    rng = random.Random(seed)
+    recorder = Recorder(filename, seed, GAME_TICK, every)
+    session = LiveSession(seed, recorder)
+    snapshots = {}
+    for tick in range(ticks):
+        if tick in watch:
+            snapshots[tick] = session.snapshot()
+        if rng.random() < 0.05:
+            session.input.keys = set(key for key in REPLAY_KEYS if rng.random() < 0.4)
+            session.input.extra = int(rng.random() < 0.1)
+        session.update(GAME_TICK)
+    if ticks in watch:
+        snapshots[ticks] = session.snapshot()
+    recorder.close()
+    return (session, snapshots)
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_replay_plays_out_the_same(tmp_path, seed):
+    """
+    Tests that a replayed session ends exactly like the recorded one
+    """
+    filename = str(tmp_path / 'game.airp')
+    live = record(filename, seed, TICKS)[0]
+    assert live.getWaveCount() > 0
+
+    recording = Recording.load(filename)
+    assert recording.getTickCount() == TICKS
+    replay = ReplaySession(recording)
+    replay.play()
+    assert replay.getPlayedCount() == TICKS
+    assert replay.getState() == live.getState()
+    assert replay.getWaveCount() == live.getWaveCount()
+    assert replay.snapshot() == live.snapshot()
+    recording.close()
+
+
+def test_replay_stops_early(tmp_path):
+    """
+    Tests that a replay played in parts ends like one played at once
+    """
+    filename = str(tmp_path / 'game.airp')
+    snapshots = record(filename, 9, TICKS, watch=(1234, TICKS))[1]
+
+    recording = Recording.load(filename)
+    replay = ReplaySession(recording)
+    replay.play(1234)
+    assert replay.getPlayedCount() == 1234
+    assert replay.snapshot() == snapshots[1234]
+    replay.play()
+    assert replay.snapshot() == snapshots[TICKS]
+    recording.close()
+
+
+def test_seek_in_any_order(tmp_path):
+    """
+    Tests that seeking to an update, backwards or forwards, gives the session there
+    """
+    filename = str(tmp_path / 'game.airp')
+    rng = random.Random(7)
+    watch = set(rng.sample(range(TICKS+1), 30)) | {0, 199, 200, 201, 4800, TICKS}
+    snapshots = record(filename, 7, TICKS, 200, watch)[1]
+
+    recording = Recording.load(filename)
+    assert recording.getKeyframeCount() == (TICKS-1)//200
+    replay = ReplaySession(recording)
+    order = sorted(watch)
+    rng.shuffle(order)
+    for tick in order:
+        replay.seek(tick)
+        assert replay.getPlayedCount() == tick
+        assert replay.snapshot() == snapshots[tick]
+    recording.close()
+
+
+def test_seek_without_index(tmp_path):
+    """
+    Tests that a recording cut short (as if the game crashed) can still be sought
+    """
+    filename = str(tmp_path / 'game.airp')
+    watch = set(range(0, TICKS+1, 250))
+    snapshots = record(filename, 8, TICKS, 200, watch)[1]
+    with open(filename, 'rb') as file:
+        data = file.read()
+
+    recording = Recording(data[:len(data)//2+3])
+    assert 0 < recording.getTickCount() < TICKS
+    assert recording.getKeyframeCount() > 0
+    replay = ReplaySession(recording)
+    for tick in sorted(watch, reverse=True):
+        if tick <= recording.getTickCount():
+            replay.seek(tick)
+            assert replay.snapshot() == snapshots[tick]
+
+
+def olderVersion(data, version):
+    """
+    Returns a recording in data written as an older version, with no settings or index
+
+    Parameter data: the contents of a file written by a Recorder
+    Precondition: data is a bytes object
+
+    Parameter version: the version to write
+    Precondition: version is 2 or 3
+    """
+    start = _decodeVarint(data, 13)[1]
+    size, pos = _decodeVarint(data, start)
+    end = struct.unpack_from('<Q', data, len(data)-12)[0]
+    return data[:4]+bytes([version])+data[5:start]+data[pos+size:end]
+
+
+@pytest.mark.parametrize('version', [2, 3])
+def test_seek_in_older_versions(tmp_path, version):
+    """
+    Tests that the keyframes of a version 2 file are not restored, those of a version 3
+    file are, and that seeking works in both
+    """
+    filename = str(tmp_path / 'game.airp')
+    watch = (3000, 1000)
+    snapshots = record(filename, 6, TICKS, 200, watch)[1]
+    with open(filename, 'rb') as file:
+        data = file.read()
+
+    recording = Recording(olderVersion(data, version))
+    assert recording.getSettings() is None
+    assert recording.getTickCount() == TICKS
+    assert (recording.getKeyframeCount() > 0) == (version == 3)
+    replay = ReplaySession(recording)
+    for tick in watch:
+        replay.seek(tick)
+        assert replay.snapshot() == snapshots[tick]
+
+
+def python(args, code=None):
+    """
+    Returns the finished process of a new Python run in the folder of the tests
+
+    The game modules and the tests can be imported in it.
+
+    Parameter args: the arguments after the script (or after code)
+    Precondition: args is a list of str, starting with the script if code is None
+
+    Parameter code: the Python code to run, or None to run a script
+    Precondition: code is None or a str
+    """
+    tests = os.path.dirname(os.path.abspath(__file__))
+    path = os.pathsep.join([tests, os.path.dirname(tests)]+sys.path)
+    command = [sys.executable]+([] if code is None else ['-c', code])+args
+    return subprocess.run(command, capture_output=True, text=True, cwd=tests,
+                          env=dict(os.environ, PYTHONPATH=path))
+
+
+def recordElsewhere(filename, ticks):
+    """
+    Returns the finished process that recorded a session in another Python, with the
+    numbers 2 3 on its command line
+
+    The process prints the number of waves made and whether the recording replays to
+    the same snapshot there.
+
+    Parameter filename: the file to record to
+    Precondition: filename is a str
+
+    Parameter ticks: the number of updates to record
+    Precondition: ticks is an int >= 0
+    """
+    code = ('import sys, test_replay\n'
+            'live = test_replay.record(sys.argv[3], 4, %d)[0]\n'
+            'replay = test_replay.ReplaySession(test_replay.Recording.load(sys.argv[3]))\n'
+            'replay.play()\n'
+            'print(live.getWaveCount(), replay.snapshot() == live.snapshot())\n' % ticks)
+    return python(['2', '3', filename], code)
+
+
+def test_settings_must_match(tmp_path):
+    """
+    Tests that a game recorded with other numbers on the command line is not replayed
+    with the numbers of this one, but plays out the same with its own
+    """
+    filename = str(tmp_path / 'game.airp')
+    result = recordElsewhere(filename, 3000)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['1', 'True']
+
+    recording = Recording.load(filename)
+    assert recording.getSettings()['ALIEN_ROWS'] == 2
+    assert recording.getSettings()['ALIENS_IN_ROW'] == 3
+    with pytest.raises(ValueError, match='ALIEN_ROWS = 2, ALIENS_IN_ROW = 3'):
+        ReplaySession(recording)
+    recording.close()
+
+
+def test_command_line_seek(tmp_path):
+    """
+    Tests that replay.py seeks with --seek, and reads the numbers before the file
+    """
+    filename = str(tmp_path / 'game.airp')
+    assert recordElsewhere(filename, 3000).returncode == 0
+
+    result = python(['../replay.py', '2', '3', filename, '--seek=1000'])
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith('1000 updates in ')
+
+    result = python(['../replay.py', filename, '--seek=1000'])
+    assert result.returncode != 0
+    assert 'ALIEN_ROWS = 2' in result.stderr
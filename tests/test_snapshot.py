@@ -0,0 +1,87 @@
+"""
+Tests of Wave.snapshot and Wave.restore (and of Formation, which they pack)
+
+A restored wave must be the same as the wave the snapshot was made from, down to the
+last bit, and must go on to play out the same.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+from wave import Wave
+from formation import Formation
+from env import ActionInput, ACTION_COUNT
+import numpy as np
+import pytest
+
+
+def play(wave, actions):
+    """
+    Plays the actions in a wave, one update each, until the wave is done
+
+    Parameter wave: the wave to play
+    Precondition: wave is a headless Wave
+
+    Parameter actions: the action of each update
+    Precondition: actions is a sequence of ints, 0 <= action < ACTION_COUNT
+    """
+    input = ActionInput()
+    for action in actions:
+        if wave.getGameOver() or wave.getLives() <= 0:
+            return
+        input.setAction(int(action))
+        wave.update(input, GAME_TICK)
+
+
+@pytest.mark.parametrize('difficulty', [DIFFICULTY_CLASSIC, DIFFICULTY_BULLET_HELL])
+@pytest.mark.parametrize('seed', range(6))
+def test_restore_plays_out_the_same(seed, difficulty):
+    """
+    Tests that a wave restored into another wave plays out exactly like the original
+    """
+    rng = np.random.default_rng(seed)
+    original = Wave(headless=True, difficulty=difficulty, seed=seed)
+    play(original, rng.integers(0, ACTION_COUNT, int(rng.integers(0, 2500))))
+    data = original.snapshot()
+
+    copy = Wave(headless=True, difficulty=difficulty, seed=seed+1000)
+    play(copy, rng.integers(0, ACTION_COUNT, 300))
+    copy.restore(data)
+    assert copy.snapshot() == data
+
+    actions = rng.integers(0, ACTION_COUNT, 2000)
+    play(original, actions)
+    play(copy, actions)
+    assert copy.snapshot() == original.snapshot()
+
+
+def test_restore_keeps_exact_positions():
+    """
+    Tests that a formation that marched by steps that are not whole numbers is
+    restored to exactly the same positions
+    """
+    original = Formation(ALIEN_ROWS, ALIENS_IN_ROW)
+    for step in range(1000):
+        original.march(0.1, -0.3 if step % 7 == 0 else 0)
+    original.kill(0, 0)
+
+    copy = Formation(ALIEN_ROWS, ALIENS_IN_ROW)
+    copy.march(13.7, 0)
+    copy.restore(original.snapshot())
+    for row in range(ALIEN_ROWS):
+        for col in range(ALIENS_IN_ROW):
+            assert copy.getAlienX(row, col) == original.getAlienX(row, col)
+            assert copy.getAlienY(row, col) == original.getAlienY(row, col)
+            assert copy.isAlive(row, col) == original.isAlive(row, col)
+
+
+def test_seed_range():
+    """
+    Tests that every seed a snapshot can hold is accepted, and no other
+    """
+    wave = Wave(headless=True, seed=2**64-1)
+    Wave(headless=True, seed=0).restore(wave.snapshot())
+    with pytest.raises(AssertionError):
+        Wave(headless=True, seed=2**64)
+    with pytest.raises(AssertionError):
+        Wave(headless=True, seed=-1)
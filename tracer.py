@@ -0,0 +1,246 @@
+"""
+Tracer module for Alien Invaders
+
+This module records when each phase of each frame of the game begins and ends, and
+writes the spans to a file in the trace event format (the JSON array format), so that a
+session can be opened in a standard trace viewer, such as chrome://tracing or Perfetto.
+
+The spans recorded are
+    refresh, clear, update, draw   GameApp._refresh and its phases (the tracer is the
+                                   probe of the game, see GameApp.probe)
+    Invaders.update                each update of the game, one per tick
+    _inactive ... _complete        the handler of the state of the session in an update
+    gameover ... collisions        the steps of Wave.update (the tracer is the probe of
+                                   the wave, see Wave.setProbe)
+    Wave.draw                      drawing the wave
+and the start of every frame is marked with an instant event.
+
+Tracing is off unless a Tracer is enabled (see enable).  The modules that are not probed
+read the global TRACER and only record a span if it is not None.  A span costs the game
+one clock read and one append to a queue; the spans are turned into JSON and written by
+a thread of the tracer, every TRACE_INTERVAL seconds, so that tracing barely changes the
+frames it measures.
+
+# Author: Komukill Loganathan (kl866)
+# Date: November 30, 2017
+"""
+from consts import *
+import collections
+import threading
+import json
+import time
+import os
+
+# PRIMARY RULE: tracer.py is not allowed to access anything in any module other than
+# consts.py.  The game tells it what it does; it never reads the game.
+
+# the tracer that the game records spans into [Tracer, or None if tracing is off]
+TRACER = None
+
+
+def enable(tracer):
+    """
+    Turns tracing on (or off), into the given tracer
+
+    Parameter tracer: the tracer to record into, or None to stop tracing
+    Precondition: tracer is a Tracer or None
+    """
+    global TRACER
+    TRACER = tracer
+
+
+def combine(*probes):
+    """
+    Returns one probe that tells each of the probes given, or None if there are none
+
+    The probes that are None are left out.  If only one is left, it is returned as it
+    is, so a single probe costs nothing more.
+
+    Parameter probes: the probes to combine
+    Precondition: each probe is None or an object with methods frame, begin and end
+    """
+    probes = [probe for probe in probes if not (probe is None)]
+    if len(probes) == 0:
+        return None
+    if len(probes) == 1:
+        return probes[0]
+    return ProbeGroup(probes)
+
+
+class ProbeGroup(object):
+    """
+    A class that is a probe telling several probes (see GameApp.probe)
+
+    INSTANCE ATTRIBUTES:
+        _probes: the probes to tell, in order [nonempty tuple of probes]
+    """
+
+    # INITIALIZER
+    def __init__(self, probes):
+        """
+        Initializer: creates a probe telling each of the given probes
+
+        Parameter probes: the probes to tell
+        Precondition: probes is a nonempty sequence of objects with methods frame,
+        begin and end
+        """
+        self._probes = tuple(probes)
+
+
+    # METHODS OF A PROBE
+    def frame(self):
+        """
+        Tells each probe that a new frame started
+        """
+        for probe in self._probes:
+            probe.frame()
+
+
+    def begin(self, name):
+        """
+        Tells each probe that a phase began
+
+        Parameter name: the name of the phase
+        Precondition: name is a str
+        """
+        for probe in self._probes:
+            probe.begin(name)
+
+
+    def end(self, name):
+        """
+        Tells each probe that a phase ended
+
+        Parameter name: the name of the phase
+        Precondition: name is a str
+        """
+        for probe in self._probes:
+            probe.end(name)
+
+
+class Tracer(object):
+    """
+    A class recording spans of the game, and writing them as trace events.
+
+    The spans are kept in a queue as (phase, name, time) tuples until the thread of the
+    tracer writes them.  The queue is a deque, which can be appended to by the game and
+    emptied by the thread at the same time.  The file is a JSON array of trace events,
+    flushed after each write, so a trace of a run that is killed can still be opened
+    (the trace viewers accept an array that was never closed).
+
+    INSTANCE ATTRIBUTES:
+        _events:   the spans not yet written [deque of (str, str, float) tuples: the
+                   phase 'B', 'E' or 'i', the name, and the time from time.perf_counter]
+        _origin:   the time that the timestamps of the trace count from [float from
+                   time.perf_counter]
+        _file:     the file to write to [file object, open for writing text]
+        _pid:      the id of the process, for the trace events [int]
+        _tid:      the id of the thread that made the tracer, for the trace events [int]
+        _interval: the seconds between two writes [float > 0]
+        _lock:     held while the spans are written [threading.Lock]
+        _stop:     set to stop the thread [threading.Event]
+        _thread:   the thread writing the spans [threading.Thread]
+    """
+
+    # INITIALIZER
+    def __init__(self, path, interval=TRACE_INTERVAL):
+        """
+        Initializer: starts a trace written to the file path
+
+        Parameter path: the name of the file to write to
+        Precondition: path is a str
+
+        Parameter interval: the seconds between two writes of the spans
+        Precondition: interval is an int or float > 0
+        """
+        self._events = collections.deque()
+        self._origin = time.perf_counter()
+        self._file = open(path, 'w')
+        self._pid = os.getpid()
+        self._tid = threading.get_ident()
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._file.write('['+json.dumps({'name': 'process_name', 'ph': 'M', 'pid': self._pid,
+                                         'tid': self._tid, 'args': {'name': 'Alien Invaders'}}))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='tracer')
+        self._thread.daemon = True
+        self._thread.start()
+
+
+    # METHODS OF A PROBE
+    def frame(self):
+        """
+        Marks the start of a frame
+        """
+        self._events.append(('i', 'frame', time.perf_counter()))
+
+
+    def begin(self, name):
+        """
+        Records that a span began
+
+        Parameter name: the name of the span
+        Precondition: name is a str
+        """
+        self._events.append(('B', name, time.perf_counter()))
+
+
+    def end(self, name):
+        """
+        Records that a span ended
+
+        Parameter name: the name of the span
+        Precondition: name is a str
+        """
+        self._events.append(('E', name, time.perf_counter()))
+
+
+    # PUBLIC METHODS
+    def flush(self):
+        """
+        Writes every span recorded so far to the file
+        """
+        with self._lock:
+            events = self._events
+            for pos in range(len(events)):
+                phase, name, when = events.popleft()
+                event = {'name': name, 'ph': phase, 'ts': (when-self._origin)*1e6,
+                         'pid': self._pid, 'tid': self._tid}
+                if phase == 'i':
+                    event['s'] = 't'
+                self._writeEvent(event)
+            self._file.flush()
+
+
+    def close(self):
+        """
+        Stops the thread, writes the last spans and closes the file
+        """
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+        self._file.write('\n]\n')
+        self._file.close()
+
+
+    # HELPER METHODS
+    def _writeEvent(self, event):
+        """
+        Writes a trace event to the file, as the next element of the array
+
+        The first element is written by the initializer, so every other element comes
+        after a comma.
+
+        Parameter event: the trace event
+        Precondition: event is a dict that can be written as JSON
+        """
+        self._file.write(',\n'+json.dumps(event, separators=(',', ':')))
+
+
+    def _run(self):
+        """
+        Writes the spans every _interval seconds, until _stop is set
+        """
+        while not self._stop.wait(self._interval):
+            self.flush()
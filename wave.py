@@ -16,10 +16,29 @@ issue.  If you do not know, ask on Piazza and we will answer.
 # Date: November 30, 2017
 """
 
-from game2d import *
 from consts import *
-from models import *
+from bodies import *
+from formation import *
+from projectiles import *
+from pool import *
+import numpy as np
+import struct
 import random
+import metrics
+
+try:
+    from game2d import *
+    from models import *
+except ImportError:
+    # Kivy is not installed, so only headless waves (see bodies.py) can be made
+    pass
+
+# The fixed part of a snapshot of a wave (see Wave.snapshot): the rows and columns of the
+# formation, the difficulty, the seed, _lives, _time, _direction (0 for 'right', 1 for
+# 'left'), _step, _firespeed, _previouskeys, _gameover, _won, whether there is a ship,
+# the x coordinate of the ship, and the PCG64 state (state, increment, has_uint32 and
+# uinteger), all little-endian
+_SNAPSHOT_HEADER = struct.Struct('<HHBQHdBHHHBBBd16s16sBI')
 
 # PRIMARY RULE: Wave can only access attributes in models.py via getters/setters
 # Wave is NOT allowed to access anything in app.py (Subcontrollers are not permitted 
@@ -44,8 +63,8 @@ class Wave(object):
     #UPDATE ME LATER
     INSTANCE ATTRIBUTES:
         _ship:   the player ship to control [Ship]
-        _aliens: the 2d list of aliens in the wave [rectangular 2d list of Alien or None] 
-        _bolts:  the laser bolts currently on screen [list of Bolt, possibly empty]
+        _aliens: the aliens in the wave [Formation] 
+        _bolts:  the laser bolts currently on screen [ProjectileSystem, possibly empty]
         _dline:  the defensive line being protected [GPath]
         _lives:  the number of lives left  [int >= 0]
         _time:   The amount of time since the last Alien "step" [number >= 0]
@@ -67,6 +86,38 @@ class Wave(object):
         _step: steps taken by aliens, cumulative but gets reset to 0 after firing bolt[int>=0]
         _gameover: is the game over, True for yes, False for no [bool]
         _won: did the player win, True for yes, False for no [bool]
+        _headless: whether this wave runs on plain geometry only [bool]
+        _difficulty: how hard this wave is [one of DIFFICULTY_CLASSIC, DIFFICULTY_BULLET_HELL]
+        _pool: the Bolt sprites kept for drawing the bolts [BoltPool, or None if headless]
+        _boltsprites: the Bolt sprites drawn for the bolts in the last frame [list of Bolt]
+        _seed: the seed of the random generator of this wave [int >= 0]
+        _random: the random generator for every random choice in this wave [numpy Generator]
+        _wreck: the last ship destroyed, kept to be reused as the next ship [Ship, or None]
+        _probe: what is told when each step of an update begins and ends [an object
+                with methods begin(name) and end(name), such as a FrameProfiler, or None]
+    
+    The bolts are stored as arrays in _bolts, and are moved and collided as arrays. 
+    Bolt sprites are only needed to draw them. Each frame, the sprites drawn in the
+    last frame go back to _pool and are handed out again at the new bolt positions,
+    so drawing the bolts does not make new sprites once the pool is warm.
+    
+    In DIFFICULTY_BULLET_HELL, the aliens also fire HELL_BOLTS_PER_FRAME bolts every
+    frame, from the bottom aliens of random columns.
+    
+    Every random choice is made with _random, never with the module random, so two
+    waves made with the same seed and given the same input play out exactly the same,
+    even when other waves run at the same time. _random is a PCG64 generator, whose
+    whole state is a few integers (see getRandomState).
+    
+    The whole state of a wave can be packed into a few hundred bytes with snapshot, 
+    and put back into a wave with restore. Restoring does not make new sprites: dead
+    aliens keep their sprites in the formation, and a destroyed ship is kept in _wreck
+    to come back as the next ship.
+    
+    A headless wave uses the classes in bodies.py instead of those in models.py, has
+    no alien or bolt sprites, and has no defensive line (_dline is None).  It never
+    creates Kivy objects, so it can run without a window. Drawing a headless wave does
+    nothing.
     """
     
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
@@ -98,24 +149,197 @@ class Wave(object):
         return self._gameover
     
     
+    def getAliens(self):
+        """
+        Returns the aliens in this wave, as a Formation
+        
+        The formation must not be changed; it is for reading the state of the wave.
+        """
+        return self._aliens
+    
+    
+    def getBolts(self):
+        """
+        Returns the laser bolts in this wave, as a ProjectileSystem
+        
+        The bolts must not be changed; they are for reading the state of the wave.
+        """
+        return self._bolts
+    
+    
+    def getDirection(self):
+        """
+        Returns the direction the aliens march towards, either 'right' or 'left'
+        """
+        return self._direction
+    
+    
+    def getSeed(self):
+        """
+        Returns the seed that this wave was made with
+        """
+        return self._seed
+    
+    
+    def getRandomState(self):
+        """
+        Returns the state of the random generator of this wave
+        
+        The state is a dict (the state of a numpy PCG64 bit generator). Passing it to
+        setRandomState, on this wave or another, makes the same random choices follow.
+        """
+        return self._random.bit_generator.state
+    
+    
+    def setRandomState(self, state):
+        """
+        Sets the state of the random generator of this wave
+        
+        Parameter state: the state to restore
+        Precondition: state is a value returned by getRandomState
+        """
+        self._random.bit_generator.state = state
+    
+    
+    def getProbe(self):
+        """
+        Returns what is told when each step of an update begins and ends, or None
+        """
+        return self._probe
+    
+    
+    def setProbe(self, probe):
+        """
+        Sets what is told when each step of an update begins and ends
+        
+        The steps are named 'gameover' (the check whether the game is over), 'march'
+        (the aliens marching and firing), 'ship' (the ship moving and firing), 'bolts'
+        (the bolts moving and going off screen) and 'collisions'.  A step may begin and
+        end more than once in an update.  Drawing the wave is the step 'Wave.draw'.
+        
+        Parameter probe: the object to tell, or None to tell nothing
+        Precondition: probe is None or has methods begin(name) and end(name)
+        """
+        self._probe = probe
+    
+    
     # INITIALIZER (standard form) TO CREATE SHIP AND ALIENS
-    def __init__(self):
+    def __init__(self, headless=False, difficulty=DIFFICULTY, seed=None):
         """
         Initializer: creates ship, defense line, and wave of aliens
+        
+        Parameter headless: whether to run on plain geometry, without Kivy
+        Precondition: headless is a bool
+        
+        Parameter difficulty: how hard this wave is
+        Precondition: difficulty is one of DIFFICULTY_CLASSIC, DIFFICULTY_BULLET_HELL
+        
+        Parameter seed: the seed of the random generator, or None to pick one at random
+        Precondition: seed is None or an int, 0 <= seed < 2**64 (a snapshot stores the
+        seed in 64 bits)
         """
+        if seed is None:
+            seed = random.getrandbits(63)
+        assert 0 <= seed < 2**64, \
+            '%s is not a seed in the range 0 to 2**64-1' % repr(seed)
+        self._seed = seed
+        self._random = np.random.Generator(np.random.PCG64(seed))
+        self._headless = headless
+        self._difficulty = difficulty
         self._lives = SHIP_LIVES
         self._aliens = self._createAlienWave(); 
-        self._ship = Ship()
-        self._dline = GPath(points=[0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE],
-                            linewidth=1.5, linecolor='black')
+        self._wreck = None
+        self._ship = self._newShip()
+        if headless:
+            self._dline = None
+        else:
+            self._dline = GPath(points=[0,DEFENSE_LINE,GAME_WIDTH,DEFENSE_LINE],
+                                linewidth=1.5, linecolor='black')
         self._time = 0
         self._direction = 'right'
-        self._bolts = []
+        self._bolts = ProjectileSystem()
+        if headless:
+            self._pool = None
+        else:
+            self._pool = BoltPool(Bolt, 'black', 'green', BOLT_POOL_SIZE)
+        self._boltsprites = []
         self._previouskeys = 0
-        self._firespeed = random.randint(1, BOLT_RATE)
+        self._firespeed = self._randint(1, BOLT_RATE)
         self._step = 0
         self._gameover = False
         self._won = False
+        self._probe = None
+    
+    
+    # METHODS TO SAVE AND RESTORE THE WAVE
+    def snapshot(self):
+        """
+        Returns the state of this wave packed into bytes
+        
+        The bytes are the fixed part _SNAPSHOT_HEADER, then the snapshot of the
+        formation (whose size only depends on the number of rows and columns), then
+        the snapshot of the bolts (32 bytes per bolt). A classic wave packs into a 
+        few hundred bytes.
+        
+        Only the state of the game is saved, not how it is drawn, so a snapshot of a
+        headless wave can be restored into a drawn one and the other way round.
+        """
+        state = self._random.bit_generator.state
+        if self._ship is None:
+            shipx = 0.0
+        else:
+            shipx = self._ship.getShipX()
+        header = _SNAPSHOT_HEADER.pack(
+            self._aliens.getRows(), self._aliens.getCols(), self._difficulty,
+            self._seed, self._lives, self._time, 0 if self._direction == 'right' else 1,
+            self._step, self._firespeed, self._previouskeys, self._gameover, self._won,
+            not (self._ship is None), shipx,
+            state['state']['state'].to_bytes(16, 'little'),
+            state['state']['inc'].to_bytes(16, 'little'),
+            state['has_uint32'], state['uinteger'])
+        return header+self._aliens.snapshot()+self._bolts.snapshot()
+    
+    
+    def restore(self, data):
+        """
+        Sets this wave to the state in a snapshot
+        
+        The state is written into the existing formation, bolts and ship, so no 
+        sprites are made (except a ship, if this wave has never had one to reuse).
+        
+        Parameter data: the snapshot to restore
+        Precondition: data is a bytes-like object returned by the snapshot of a wave
+        with the same number of rows and columns of aliens
+        """
+        fields = _SNAPSHOT_HEADER.unpack_from(data, 0)
+        assert fields[0] == self._aliens.getRows() and fields[1] == self._aliens.getCols(), \
+            'snapshot is of a wave with a different formation'
+        
+        self._difficulty = fields[2]
+        self._seed = fields[3]
+        self._lives = fields[4]
+        self._time = fields[5]
+        self._direction = 'right' if fields[6] == 0 else 'left'
+        self._step = fields[7]
+        self._firespeed = fields[8]
+        self._previouskeys = fields[9]
+        self._gameover = bool(fields[10])
+        self._won = bool(fields[11])
+        if fields[12]:
+            if self._ship is None:
+                self._ship = self._newShip()
+            self._ship.setShipX(fields[13])
+        elif not (self._ship is None):
+            self._wreck = self._ship
+            self._ship = None
+        self._random.bit_generator.state = {'bit_generator': 'PCG64',
+            'state': {'state': int.from_bytes(fields[14], 'little'),
+                      'inc': int.from_bytes(fields[15], 'little')},
+            'has_uint32': fields[16], 'uinteger': fields[17]}
+        
+        offset = _SNAPSHOT_HEADER.size
+        self._aliens.restore(data, offset)
+        self._bolts.restore(data, offset+self._aliens.getSnapshotSize())
     
     
     # UPDATE METHOD TO MOVE THE SHIP, ALIENS, AND LASER BOLTS
@@ -126,25 +350,50 @@ class Wave(object):
         This method is called in the update() method of Invaders to help in
         moving the ship, aliens and laser bolts.
         
+        If counting is on (see metrics.py), the bolts destroyed in the update are
+        counted here, and the bolts created and collision tests by the helpers.
+        
         Parameter input: the user input, used to control the game
         Precondition: Instance of GInput and attribute of Invaders
         
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        if self._isGameOver():
+        probe = self._probe
+        counters = metrics.COUNTERS
+        if probe: probe.begin('gameover')
+        over = self._isGameOver()
+        if probe: probe.end('gameover')
+        
+        if over:
             self._gameover = True
         else:
+            if probe: probe.begin('march')
             self._moveAliens(dt)
+            if self._difficulty == DIFFICULTY_BULLET_HELL:
+                self._fireAlienVolley()
+            if probe: probe.end('march')
+            if probe: probe.begin('ship')
             if not(self._ship is None):
                 self._ship.moveShip(input)
                 self._createPlayerBolts(input)
             if self._ship == None:
-                self._ship = Ship()
-                self._bolts = []
+                self._ship = self._newShip()
+                if counters: counters.count('bolts_destroyed', len(self._bolts))
+                self._bolts.clear()
+            if probe: probe.end('ship')
             if not (not self._bolts):
+                live = len(self._bolts)
+                if probe: probe.begin('bolts')
                 self._moveBolts()
+                if probe: probe.end('bolts')
+                if probe: probe.begin('collisions')
                 self._detectCollision()
+                if probe: probe.end('collisions')
+                if probe: probe.begin('bolts')
+                self._removeOffscreenBolts()
+                if probe: probe.end('bolts')
+                if counters: counters.count('bolts_destroyed', live-len(self._bolts))
 
     
     # DRAW METHOD TO DRAW THE SHIP, ALIENS, DEFENSIVE LINE AND BOLTS
@@ -152,56 +401,77 @@ class Wave(object):
         """
         Draws the shapes in the view provided
         
+        Everything is drawn where it is after the last update, so the bolts, the ship
+        and the aliens always line up with each other.
+        
         Parameter view: the game view, used in drawing
         Precondition: instance of GView and Invaders
         """
+        probe = self._probe
+        if probe: probe.begin('Wave.draw')
         if not (self._ship is None):
             self._ship.draw(view)
-        self._dline.draw(view)
+        if not (self._dline is None):
+            self._dline.draw(view)
         
-        for row in range(len(self._aliens)):
-            for col in range(len(self._aliens[row])):
-                if not(self._aliens[row][col] is None):
-                    self._aliens[row][col].draw(view)
-        
-        for x in range(len(self._bolts)):
-            self._bolts[x].draw(view)
+        self._aliens.draw(view)
+        self._drawBolts(view)
+        if probe: probe.end('Wave.draw')
         
     
-    def _createAlienWave(self):
+    def _drawBolts(self, view):
         """
-        Returns: Created alien wave when the game begins
+        Draws the laser bolts, using Bolt sprites from the pool
         
-        This is a helper method that creates a wave of aliens. It does this by
-        filling the _aliens 2d list with alien objects. It draws ALIEN_ROWS rows
-        of aliens with ALIENS_IN_ROW many aliens in each row.
+        Parameter view: the game view, used in drawing
+        Precondition: instance of GView and Invaders
+        """
+        if self._pool is None:
+            return
+        
+        for sprite in self._boltsprites:
+            self._pool.release(sprite)
+        del self._boltsprites[:]
         
-        Each row is an element of _aliens list and each row will be a list of
-        Alien object. 
+        xs = self._bolts.getX().tolist()
+        ys = self._bolts.getY().tolist()
+        player = self._bolts.isPlayer().tolist()
+        for x in range(len(xs)):
+            direction = 'up' if player[x] else 'down'
+            sprite = self._pool.acquire(xs[x], ys[x], direction)
+            self._boltsprites.append(sprite)
+            sprite.draw(view)
+    
+    
+    # HELPER METHODS TO CREATE THE MODELS
+    def _newShip(self):
         """
-        x_pos = ALIEN_H_SEP + (ALIEN_WIDTH//2)
-        y_pos = GAME_HEIGHT - (ALIEN_CEILING + (ALIEN_ROWS*ALIEN_HEIGHT) + ((ALIEN_ROWS-1)*ALIEN_V_SEP))
-        init_x = x_pos
-        list = []
+        Returns a player ship, drawable or headless depending on the wave
         
-        for row in range(ALIEN_ROWS):
-            list.append([])
-            
-            if row % 6 == 0 or row % 6 == 1:
-                picture = 0
-            elif row % 6 == 2 or row % 6 == 3:
-                picture = 1
-            else:
-                picture = 2
-                
-            for col in range(ALIENS_IN_ROW):
-                alien = Alien(x_pos, y_pos, ALIEN_IMAGES[picture])
-                list[row].append(alien)
-                x_pos = x_pos + ALIEN_H_SEP + ALIEN_WIDTH
-            y_pos = y_pos + ALIEN_V_SEP + ALIEN_HEIGHT
-            x_pos = init_x
+        The last ship destroyed is reused, back at the center, if there is one.
+        """
+        if not (self._wreck is None):
+            ship = self._wreck
+            self._wreck = None
+            ship.setShipX(GAME_WIDTH/2)
+            return ship
+        if self._headless:
+            return ShipBody()
+        return Ship()
+    
+    
+    def _createAlienWave(self):
+        """
+        Returns: Created alien wave when the game begins
         
-        return list
+        This is a helper method that creates a wave of aliens, with ALIEN_ROWS rows
+        of aliens and ALIENS_IN_ROW many aliens in each row. The positions of the
+        aliens are stored in the arrays of a Formation; the Alien sprites are only
+        made if this wave is drawn.
+        """
+        if self._headless:
+            return Formation(ALIEN_ROWS, ALIENS_IN_ROW)
+        return Formation(ALIEN_ROWS, ALIENS_IN_ROW, Alien)
     
     
     def _moveAliens(self, dt):
@@ -226,21 +496,15 @@ class Wave(object):
             self._time = 0
             
             
-    def _moveAlienToRight(self):     # USE GETTERS/SETTERS FOR ALIEN X AND Y
+    def _moveAlienToRight(self):
         """
         Moves the aliens to the right
         """
-        rightalien = self._rightmostAlien()
-        if GAME_WIDTH - rightalien.getAlienX() <= (ALIEN_H_SEP + ALIEN_WIDTH/2):
+        if GAME_WIDTH - self._aliens.rightmostX() <= (ALIEN_H_SEP + ALIEN_WIDTH/2):
             self._moveAlienDown()
             self._direction = 'left'
         else:
-            for row in range(len(self._aliens)):
-                for alien in range(len(self._aliens[row])):
-                    if not(self._aliens[row][alien] is None):
-                        x = self._aliens[row][alien].getAlienX()
-                        x = x + ALIEN_H_WALK
-                        self._aliens[row][alien].setAlienX(x)
+            self._aliens.march(ALIEN_H_WALK, 0)
         self._step +=1
         
         
@@ -248,226 +512,207 @@ class Wave(object):
         """
         Moves the aliens to the left
         """
-        leftalien = self._leftmostAlien()
-        if leftalien.getAlienX() <= (ALIEN_H_WALK + ALIEN_WIDTH/2):  
+        if self._aliens.leftmostX() <= (ALIEN_H_WALK + ALIEN_WIDTH/2):  
             self._moveAlienDown()
             self._direction = 'right'
         else:
-            for row in range(len(self._aliens)):
-                for alien in range(len(self._aliens[row])):
-                    if not(self._aliens[row][alien] is None):
-                        x = self._aliens[row][alien].getAlienX()
-                        x = x - ALIEN_H_WALK
-                        self._aliens[row][alien].setAlienX(x)
+            self._aliens.march(-ALIEN_H_WALK, 0)
         self._step += 1
-            
-    
-    def _rightmostAlien(self):
-        """
-        Returns the right most alien in the wave
-        """
-        x = 0
-        for row in range(len(self._aliens)):
-            for col in range(len(self._aliens[row])):
-                if not(self._aliens[row][col] is None) and self._aliens[row][col].getAlienX() > x:
-                    alien = self._aliens[row][col]
-                    x = alien.getAlienX()
-        return alien
-    
-     
-    def _leftmostAlien(self):
-        """
-        Returns the left most alien in the wave
-        """
-        x = GAME_WIDTH
-        for row in range(len(self._aliens)):
-            for col in range(len(self._aliens[row])):
-                if not(self._aliens[row][col] is None) and self._aliens[row][col].getAlienX() < x:
-                    alien = self._aliens[row][col]
-                    x = alien.getAlienX()
-        return alien
      
      
     def _moveAlienDown(self):    
         """
         Moves aliens down
         """
-        for row in range(len(self._aliens)):
-            for alien in range(len(self._aliens[row])):
-                if not(self._aliens[row][alien] is None):
-                    y = self._aliens[row][alien].getAlienY()
-                    y = y - ALIEN_V_WALK
-                    self._aliens[row][alien].setAlienY(y)
+        self._aliens.march(0, -ALIEN_V_WALK)
         
     
     def _createPlayerBolts(self, input):
         """
         Creates a laser bolt when the player presses a fire key (spacebar)
         
-        This methods create a Bolt object when a fire command is detected. The
-        Bolt object has the same x position as the ship and it will be placed
-        right in front of the ship's nose. These Bolt objects are stored in the
-        _bolts attribute.
+        This methods create a bolt when a fire command is detected. The bolt has
+        the same x position as the ship and it will be placed right in front of 
+        the ship's nose. The bolts are stored in the _bolts attribute.
         
         Parameter input: the user input, used to control the game
         Precondition: Instance of GInput and attribute of Invaders
         """
         if input.is_key_down('spacebar') and self._previouskeys == 0 and self._allowPlayerFire():
-            obj = Bolt(self._ship.getShipX(), (self._ship.getShipY()+SHIP_HEIGHT/2),
-                       BOLT_WIDTH, BOLT_HEIGHT, 'black', 'up')
-            self._bolts.append(obj)
+            self._bolts.spawn(self._ship.getShipX(), (self._ship.getShipY()+SHIP_HEIGHT/2),
+                              BOLT_SPEED)
+            counters = metrics.COUNTERS
+            if counters: counters.count('bolts_created')
         self._previouskeys = input.key_count
         
         
-    def _createAlienBolts(self, alien):
+    def _createAlienBolts(self, row, col):
         """
         Creates a laser bolt to be fired by aliens
         
-        This method creates a Bolt object to be fired by an alien and add it to
-        the _bolts list.
+        This method creates a bolt to be fired by an alien and adds it to _bolts.
         
-        Parameter alien: alien that will fire the bolt
-        Precondition: alien is an Alien object from the 2D list _aliens.
+        Parameter row: the row of the alien that will fire the bolt
+        Precondition: row is an int, a valid row of the formation _aliens
+        
+        Parameter col: the column of the alien that will fire the bolt
+        Precondition: col is an int, a valid column of the formation _aliens
         """
-        obj = Bolt(alien.getAlienX(), (alien.getAlienY()-ALIEN_HEIGHT/2), BOLT_WIDTH,
-                   BOLT_HEIGHT, 'green', 'down')
-        self._bolts.append(obj)
+        self._bolts.spawn(self._aliens.getAlienX(row, col),
+                          (self._aliens.getAlienY(row, col)-ALIEN_HEIGHT/2), -BOLT_SPEED)
+        counters = metrics.COUNTERS
+        if counters: counters.count('bolts_created')
         
         
     def _allowPlayerFire(self):
         """
         Returns True if player can fire, False otherwise
         """
-        fire = True
-        
-        for x in range(len(self._bolts)):
-            if self._bolts[x].isPlayerBolt():
-                fire = False
-                
-        return fire
+        return not self._bolts.hasPlayerBolt()
         
     
     def _fireAlienBolt(self):
         """
         Picks aliens from wave to fire and fires bolt randomly
         """
-        random_col = self._randomNonEmptyColumn()
+        random_col = self._randomColumn()
         
         #bottommost element in random col
-        alien = self._bottomMostAlien(random_col)
-        if not(alien is None):
-            self._createAlienBolts(alien)
+        row = self._bottomMostAlien(random_col)
+        if not(row is None):
+            self._createAlienBolts(row, random_col)
         self._step = 0
-        self._firespeed = random.randint(1, BOLT_RATE)
-    
-    
-    def _randomNonEmptyColumn(self):
-        """
-        Returns a random nonempty column in aliens wave
-        """
-        #determine non-empty columns
-        row = 0
-        col = 0
-        nonEmptyCols = []
-        emptyCol = True
-        while col < len(self._aliens[row]):
-            if not (self._aliens[row][col] is None):
-                emptyCol = False
-            row = row + 1
-            if row == len(self._aliens):
-                row = 0
-                nonEmptyCols.append(col)
-                col = col + 1
-                
-        return nonEmptyCols[random.randint(0,len(nonEmptyCols)-1)] #pick a random nonempty col
+        self._firespeed = self._randint(1, BOLT_RATE)
+    
+    
+    def _fireAlienVolley(self):
+        """
+        Fires HELL_BOLTS_PER_FRAME bolts from the bottom aliens of random columns
+        
+        This is the extra fire of the bullet-hell difficulty. The columns are all
+        drawn from _random at once, and all of the bolts are added to _bolts at once.
+        
+        Precondition: at least one alien is alive
+        """
+        xs = []
+        ys = []
+        count = self._aliens.getLiveColumnCount()
+        for index in self._random.integers(0, count, HELL_BOLTS_PER_FRAME).tolist():
+            col = self._aliens.getLiveColumn(index)
+            row = self._bottomMostAlien(col)
+            xs.append(self._aliens.getAlienX(row, col))
+            ys.append(self._aliens.getAlienY(row, col)-ALIEN_HEIGHT/2)
+        self._bolts.spawnMany(xs, ys, -BOLT_SPEED)
+        counters = metrics.COUNTERS
+        if counters: counters.count('bolts_created', len(xs))
+    
+    
+    def _randomColumn(self):
+        """
+        Returns a random column in aliens wave
+        
+        Every column can be picked, even one whose aliens are all destroyed, in which
+        case no alien fires (see _fireAlienBolt).  So the aliens fire less often as
+        the wave thins out.
+        """
+        return self._randint(0, self._aliens.getCols()-1) #pick a random col
+    
+    
+    def _randint(self, low, high):
+        """
+        Returns a random int in the range [low, high], using the generator of this wave
+        
+        This is the same as random.randint, except that it does not use the module
+        random (which is shared with every other wave).
+        
+        Parameter low: the smallest int to return
+        Precondition: low is an int
+        
+        Parameter high: the largest int to return
+        Precondition: high is an int >= low
+        """
+        return int(self._random.integers(low, high+1))
     
     
     def _bottomMostAlien(self, col):
         """
-        Returns the bottom most alien object in the column
+        Returns the row of the bottom most alien in the column, or None if it is empty
         
         Parameter col: column in which the bottommost alien needs to be found
-        Precondition: col is a valid col number within the aliens 2D list
+        Precondition: col is a valid col number within the aliens formation
         """
-        alien = None
-        min_y = GAME_HEIGHT
-        for row in range(len(self._aliens)):
-            if not(self._aliens[row][col] is None) and self._aliens[row][col].getAlienY() < min_y:
-                min_y = self._aliens[row][col].getAlienY()
-                alien = self._aliens[row][col]
-        
-        return alien
+        return self._aliens.bottomRow(col)
     
         
     def _moveBolts(self):
         """
-        Move bolts across the screen and delete them when they go off screen
+        Move bolts across the screen
+        
+        The bolts remember where they were, so the collisions can be checked along
+        the whole way they moved (see ProjectileSystem).
         """
-        x = 0
-        while x < len(self._bolts):
-            y = self._bolts[x].getBoltY()
-            y += self._bolts[x].getVelocity()
-            self._bolts[x].setBoltY(y)
-            
-            #delete bolt when they go off screen, above or below
-            if self._bolts[x].getBoltY() > GAME_HEIGHT or self._bolts[x].getBoltY() <= 0:
-                del self._bolts[x]
-            else:
-                x = x+1
+        self._bolts.move()
+    
+    
+    def _removeOffscreenBolts(self):
+        """
+        Delete bolts when they go off screen, above or below
+        
+        This is done after the collisions are checked, so a bolt that hits something
+        on its way off the screen still counts.
+        """
+        self._bolts.cull(0, GAME_HEIGHT)
                 
     
     # HELPER METHODS FOR COLLISION DETECTION
     def _detectCollision(self):
-        x = 0
-        condition = True
-        while x < len(self._bolts) and condition == True and not(self._ship is None):
-            if self._detectAlienCollision(self._bolts[x]) == True:
-                del self._bolts[x]
-            else:
-                self._detectShipCollision(self._bolts[x])
-            x = x+1
+        """
+        Detects collisions between the laser bolts and the aliens or the ship
+        
+        Player bolts are checked against the alien formation, and removed when they
+        hit an alien. Then the alien bolts are checked against the ship, all at once.
+        Both checks cover the whole way each bolt moved this frame, so a fast bolt
+        cannot pass through an alien or the ship between frames.
+        """
+        self._detectAlienCollision()
+        if not (self._ship is None):
+            self._detectShipCollision()
     
     
-    def _detectAlienCollision(self, bolt):
+    def _detectAlienCollision(self):
         """
-        Returns: True if detects collision between aliens in the wave and laser bolt by player
-        
-        This method detects collision between aliens and the laser bolt passed
-        as argument. If there is collision, this method sets the alien that had
-        collided to None, deletes the bolt and returns True. It returns False
-        otherwise.
+        Returns: True if detects collision between aliens in the wave and laser bolts by player
         
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
+        This method detects collision between aliens and the player bolts. Each
+        alien that is hit is destroyed, along with the bolt that hit it. This
+        method returns True if any alien was hit, and False otherwise.
         """
-        collision = False
-        for row in range(len(self._aliens)):
-            for col in range(len(self._aliens[row])):
-                if collision == False and not(self._aliens[row][col] is None) and self._aliens[row][col].collides(bolt):
-                    self._aliens[row][col] = None
-                    collision = True
-        return collision
+        counters = metrics.COUNTERS
+        if counters: counters.count('alien_collision_tests', self._bolts.getPlayerCount())
+        return self._bolts.collideFormation(self._aliens) > 0
     
     
-    def _detectShipCollision(self, bolt):
+    def _detectShipCollision(self):
         """
         Returns: True if detects collision between ship and laser bolt by aliens
         
-        This method detects collision between the ship and the laser bolt passed
-        as argument. If there is collision, this method sets the ship that had
-        collided to None, deletes the bolt and returns true. It returns False
-        otherwise.
+        This method tests every alien bolt against the ship in one array operation.
+        If there is collision, this method sets the ship that had collided to None 
+        and returns true. It returns False otherwise.
         
-        Parameter bolt: The laser bolt to check
-        Precondition: bolt is of class Bolt
+        Precondition: the ship is not None
         """
-        collision = False
-        if self._ship.collides(bolt):
+        counters = metrics.COUNTERS
+        if counters:
+            counters.count('ship_collision_tests',
+                           len(self._bolts)-self._bolts.getPlayerCount())
+        if self._bolts.collideBox(self._ship.getShipX(), self._ship.getShipY(),
+                                  SHIP_WIDTH, SHIP_HEIGHT, False):
+            self._wreck = self._ship
             self._ship = None
-            del bolt
-            collision = True
             self._lives -= 1
-        return collision
+            return True
+        return False
     
     
     def _isGameOver(self):
@@ -478,15 +723,8 @@ class Wave(object):
         dips below the defense line. If either of the cases happen, this method
         returns True. It returns False otherwise. 
         """
-        emptywave = True
-        dipped = False
-        
-        for row in range(len(self._aliens)):
-            for col in range(len(self._aliens[row])):
-                if not (self._aliens[row][col] is None):
-                    emptywave = False
-                    if self._aliens[row][col].getAlienY() <= DEFENSE_LINE:
-                        dipped = True
+        emptywave = self._aliens.isEmpty()
+        dipped = not emptywave and self._aliens.lowestY() <= DEFENSE_LINE
         
         if emptywave:
             self._won = True